@@ -0,0 +1,59 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from cv_reviewer.crew import AgentPool, CVReviewCrew, clear_config_cache
+
+# Measure the per-request cost of setting up the CV review crew (config files, agents and tasks),
+# without running it, so no LLM calls are made
+
+inputs = {
+    "jd_text": "Backend engineer with Python, FastAPI and PostgreSQL experience.",
+    "cv_text": "Software engineer with five years of Python experience building web APIs."
+}
+
+def time_setup(runs, cached):
+    """
+    Builds the crew `runs` times.
+    :param runs: Number of crews to build.
+    :param cached: Reuse parsed config and pooled agents (True) or read and build everything each time (False).
+    :return: The durations in milliseconds.
+    """
+    pool = AgentPool(max_idle=1 if cached else 0)
+    durations = []
+    for _ in range(runs):
+        if not cached:
+            clear_config_cache()
+        start = time.perf_counter()
+        cv_crew = CVReviewCrew(inputs=inputs, agent_pool=pool)
+        cv_crew.create_tasks()
+        durations.append((time.perf_counter() - start) * 1000)
+        cv_crew.release()
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CV review crew setup with and without caching")
+    parser.add_argument("--runs", type=int, default=50, help="Crews built per mode")
+    args = parser.parse_args()
+
+    # Agents create their LLM client when they are built; no request is sent
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    results = {}
+    for mode, cached in (("uncached", False), ("cached", True)):
+        print(f"Building {args.runs} crews ({mode})...")
+        # The first run of each mode also warms up imports and is left out
+        results[mode] = time_setup(args.runs + 1, cached)[1:]
+
+    print("\n=== CREW SETUP PER REQUEST ===\n")
+    for mode, durations in results.items():
+        print(f"{mode:>9}: mean {statistics.mean(durations):.2f} ms, median {statistics.median(durations):.2f} ms")
+    speedup = statistics.mean(results["uncached"]) / statistics.mean(results["cached"])
+    print(f"\nSpeedup: {speedup:.1f}x")
+
+if __name__ == "__main__":
+    main()
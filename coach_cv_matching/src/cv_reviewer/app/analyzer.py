@@ -1,19 +1,27 @@
+import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO
 from cv_reviewer.tools.file_parser import FileParser
-from cv_reviewer.crew import CVReviewCrew
+from cv_reviewer.crew import CVReviewCrew, JD_INDEPENDENT_TASKS
+from cv_reviewer.tools.relevance import format_prescore, get_embedder, prescore_relevance
 
-def analyze_cv(cv_filename: str, job_description: str):
+def analyze_cv(cv_filename: str, job_description: str, content_hash: str = None,
+               output_dir: str = "./cache/output", on_task_complete=None):
     """
     Parse and analyze a CV file using FileParser and CVReviewCrew.
     Automatically save analysis outputs to files.
 
     :param cv_filename: The original filename of the uploaded CV.
     :param job_description: The job description provided by the user (optional).
+    :param content_hash: SHA-256 of the uploaded bytes, if already known; a previously parsed CV is then not read again.
+    :param output_dir: Folder the task outputs are saved to (one per job, so concurrent analyses don't overwrite each other).
+    :param on_task_complete: Optional function called with (task_name, output) once each report is saved.
     :return: A dictionary containing task outputs.
     """
-    # Parse the CV using FileParser
-    file_parser = FileParser(cv_filename)
+    # Parse the CV using FileParser (served from the parse cache for a CV seen before)
+    file_parser = FileParser(cv_filename, digest=content_hash)
     cv_text = file_parser.parse()
 
     # Initialize Crew inputs
@@ -21,19 +29,176 @@ def analyze_cv(cv_filename: str, job_description: str):
         "jd_text": job_description or "",  # Allow job_description to be empty
         "cv_text": cv_text,
     }
-    cv_crew = CVReviewCrew(inputs=inputs)
-    result = cv_crew.crew().kickoff(inputs=inputs)
-
     # Ensure the output directory exists
-    output_dir = "./cache/output"
     os.makedirs(output_dir, exist_ok=True)
 
-    # Iterate over Crew task outputs and save them as individual files
-    for task_name, task_output in cv_crew.task_outputs.items():
-        # Create a safe filename for each task output
-        file_name = f"{task_name}.md"
-        file_path = os.path.join(output_dir, file_name)
+    def save_task_output(task_name, task_output):
+        """
+        Saves a task output as soon as the task finishes, so partial reports can be downloaded.
+        :param task_name: The name of the task.
+        :param task_output: The output of the task.
+        """
+        file_path = os.path.join(output_dir, f"{task_name}.md")
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(task_output)
+        if on_task_complete is not None:
+            on_task_complete(task_name, task_output)
+
+    # Score the CV against the job description locally first; the relevance task only gets the best matching
+    # sections and the skills overlap, and the score itself is available before any LLM call
+    if inputs["jd_text"].strip():
+        relevance_context = format_prescore(prescore_relevance(cv_text, inputs["jd_text"]))
+        save_task_output("prescore", relevance_context)
+    else:
+        relevance_context = ""
+    inputs["relevance_context"] = relevance_context
+
+    cv_crew = CVReviewCrew(inputs=inputs, on_task_complete=save_task_output)
+    try:
+        result = cv_crew.crew().kickoff(inputs=inputs)
+    finally:
+        cv_crew.release()
 
     return result
+
+RELEVANCE_SCORE_PATTERN = re.compile(r"Relevance score:\s*\**\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+def job_title(job_description, index):
+    """
+    Names a job description for the ranking: its title if given, otherwise its first line.
+    :param job_description: A job description text, or a dictionary with 'text' and optionally 'title'.
+    :param index: Position of the job description in the request, starting at 1.
+    :return: (title, text).
+    """
+    if isinstance(job_description, dict):
+        text = job_description.get("text", "")
+        title = job_description.get("title") or ""
+    else:
+        text, title = job_description, ""
+    if not title:
+        first_line = next((line.strip() for line in text.splitlines() if line.strip()), f"Job {index}")
+        title = first_line if len(first_line) <= 80 else first_line[:77] + "..."
+    return title, text
+
+def format_ranking(ranking):
+    """
+    Formats ranked job matches as a markdown table.
+    :param ranking: List of match dictionaries, best match first.
+    :return: The markdown table.
+    """
+    lines = [
+        "| Rank | Job | Score | Pre-score | Matched skills | Missing skills |",
+        "|---|---|---|---|---|---|"
+    ]
+    for rank, match in enumerate(ranking, start=1):
+        llm_score = "-" if match["llm_score"] is None else f"{match['llm_score']:g}"
+        lines.append(
+            f"| {rank} | {match['title']} | {llm_score} | {match['prescore']} | "
+            f"{', '.join(match['matched_skills'][:8])} | {', '.join(match['missing_skills'][:8])} |"
+        )
+    return "\n".join(lines)
+
+def rank_matches(matches):
+    """
+    Orders job matches by the LLM relevance score, falling back to the local pre-score when it is missing.
+    :param matches: List of match dictionaries.
+    :return: New list, best match first.
+    """
+    return sorted(
+        matches,
+        key=lambda match: (match["llm_score"] if match["llm_score"] is not None else match["prescore"],
+                           match["prescore"]),
+        reverse=True
+    )
+
+def match_cv(cv_filename: str, job_descriptions: list, content_hash: str = None,
+             output_dir: str = "./cache/output", on_task_complete=None, max_concurrency: int = None):
+    """
+    Match one CV against many job descriptions.
+    The job description independent analyses (structure, language, power) run once; only the job description
+    analysis and the relevance analysis run for every job description. At most max_concurrency crews run at a time.
+
+    :param cv_filename: The original filename of the uploaded CV.
+    :param job_descriptions: Job description texts, or dictionaries with 'text' and optionally 'title'.
+    :param content_hash: SHA-256 of the uploaded bytes, if already known; a previously parsed CV is then not read again.
+    :param output_dir: Folder the reports, the per-job relevance analyses and the ranking are saved to.
+    :param on_task_complete: Optional function called with (task_name, output) once each report is saved, and with
+                             (task_name, ranking, "ranking") each time a job description has been scored.
+    :param max_concurrency: Crews running at the same time; defaults to CV_MATCH_CONCURRENCY.
+    :return: The ranking as a markdown table, best match first.
+    """
+    if not job_descriptions:
+        raise ValueError("At least one job description is required.")
+    max_concurrency = max_concurrency or int(os.getenv("CV_MATCH_CONCURRENCY", "4"))
+
+    file_parser = FileParser(cv_filename, digest=content_hash)
+    cv_text = file_parser.parse()
+    os.makedirs(output_dir, exist_ok=True)
+
+    def save_task_output(task_name, task_output):
+        file_path = os.path.join(output_dir, f"{task_name}.md")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(task_output)
+        if on_task_complete is not None:
+            on_task_complete(task_name, task_output)
+
+    def run_analysis(task_name):
+        inputs = {"jd_text": "", "cv_text": cv_text, "relevance_context": ""}
+        cv_crew = CVReviewCrew(inputs=inputs, on_task_complete=save_task_output)
+        try:
+            cv_crew.analysis_crew(task_name).kickoff(inputs=inputs)
+        finally:
+            cv_crew.release()
+
+    # One embedder for the whole ranking, so the pre-scores stay comparable if MiniLM finishes loading meanwhile
+    embedder = get_embedder()
+
+    def run_relevance(index, title, jd_text):
+        # The local pre-score is both the relevance task's context and the fallback ranking score
+        prescore = prescore_relevance(cv_text, jd_text, embedder=embedder)
+        inputs = {"jd_text": jd_text, "cv_text": cv_text, "relevance_context": format_prescore(prescore)}
+        cv_crew = CVReviewCrew(inputs=inputs)
+        try:
+            cv_crew.relevance_crew().kickoff(inputs=inputs)
+        finally:
+            cv_crew.release()
+        relevance = cv_crew.task_outputs.get("relevance", "")
+        save_task_output(f"relevance_{index}", relevance)
+        score = RELEVANCE_SCORE_PATTERN.search(relevance)
+        return {
+            "index": index,
+            "title": title,
+            "llm_score": min(float(score.group(1)), 100.0) if score else None,
+            "prescore": prescore["score"],
+            "matched_skills": prescore["matched_skills"],
+            "missing_skills": prescore["missing_skills"],
+            "seconds": cv_crew.task_timings.get("relevance", {}).get("finished")
+        }
+
+    matches, failures = [], []
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="cv-match") as pool:
+        # The shared analyses are submitted first, so they don't wait behind every job description
+        shared = [pool.submit(run_analysis, task_name) for task_name in JD_INDEPENDENT_TASKS]
+        futures = {
+            pool.submit(run_relevance, index, *job_title(job_description, index)): index
+            for index, job_description in enumerate(job_descriptions, start=1)
+        }
+        for future in as_completed(futures):
+            try:
+                matches.append(future.result())
+            except Exception as e:
+                failures.append({"index": futures[future], "message": str(e)})
+                continue
+            if on_task_complete is not None:
+                on_task_complete("ranking", rank_matches(matches), "ranking")
+        for future in shared:
+            future.result()
+
+    if not matches:
+        raise Exception(f"Every job description failed: {failures[0]['message']}")
+    ranking = rank_matches(matches)
+    with open(os.path.join(output_dir, "ranking.json"), "w", encoding="utf-8") as f:
+        json.dump({"ranking": ranking, "failures": failures}, f, indent=2)
+    table = format_ranking(ranking)
+    save_task_output("ranking", table)
+    return table
@@ -1,23 +1,57 @@
 from fastapi import FastAPI, UploadFile, Form, File
-from fastapi.responses import Response, JSONResponse, FileResponse, HTMLResponse
+from fastapi.responses import Response, JSONResponse, FileResponse, HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from cv_reviewer.app.analyzer import analyze_cv
+from starlette.concurrency import run_in_threadpool
+from cv_reviewer.app.analyzer import analyze_cv, match_cv
+from cv_reviewer.app.job_queue import get_job_queue
+from cv_reviewer.app.job_store import get_job_store
+from cv_reviewer.app.uploads import UploadRejected, UploadSizeLimit, save_upload
+from cv_reviewer.tools.relevance import load_embedder_in_background
+import json
 import os
 
-# Directory for saving intermediate reports
-OUTPUT_DIR = "./cache/output"
-UPLOAD_DIR = "./cache/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Every analysis is a job with its own folder for the upload and the reports, deleted after CV_JOB_TTL_SECONDS
+job_store = get_job_store()
+# Analyses run on a worker pool (CV_JOB_WORKERS), outside of the request that submitted them; their status and
+# events are kept in the job folders, so every API worker process can answer for every job
+job_queue = get_job_queue()
 
 app = FastAPI()
 
+@app.on_event("startup")
+def load_embedder():
+    # The MiniLM download and warm-up run in the background; pre-scoring uses hashing embeddings until then
+    load_embedder_in_background()
+
+@app.on_event("shutdown")
+def shutdown_job_queue():
+    job_queue.shutdown()
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="src/cv_reviewer/app/static"), name="static")
 
 # Template support
 templates = Jinja2Templates(directory="src/cv_reviewer/app/templates")
 
+# Oversized uploads are refused before (or, for chunked requests, while) their body is received
+app.add_middleware(UploadSizeLimit)
+
+async def _store_upload(cv_file):
+    """
+    Validates an uploaded CV and saves it in a new job folder, streaming it from the spooled upload in blocks.
+    :param cv_file: The uploaded CV file.
+    :return: (job ID, path of the saved CV, SHA-256 of its content).
+    :raises UploadRejected: If the upload is too large, empty, or not a PDF or DOCX.
+    """
+    job_id = job_store.create()
+    try:
+        upload, file_path = await run_in_threadpool(save_upload, cv_file.file, job_store.upload_prefix(job_id))
+    except UploadRejected:
+        job_store.delete(job_id)
+        raise
+    return job_id, file_path, upload.sha256
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
     return templates.TemplateResponse("index.html", {"request": {}})
@@ -28,33 +62,128 @@ async def analyze_endpoint(
     job_description: str = Form(None)
 ):
     """
-    Analyze a CV and optional job description.
+    Queue the analysis of a CV and optional job description.
     
     :param cv_file: The uploaded CV file.
     :param job_description: The optional job description text.
-    :return: JSON response with a message and the result summary.
+    :return: JSON response with the job ID; progress is available from /api/jobs/{job_id} and /api/jobs/{job_id}/events.
+    """
+    # The file type comes from the content, not from the client's filename
+    try:
+        job_id, file_path, digest = await _store_upload(cv_file)
+    except UploadRejected as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=e.status_code)
+
+    def analyze(on_task_complete):
+        try:
+            # The hash of the upload lets a re-uploaded CV skip parsing
+            return analyze_cv(file_path, job_description, content_hash=digest,
+                              output_dir=job_store.output_dir(job_id), on_task_complete=on_task_complete)
+        finally:
+            # The text is in the parse cache by now, so the upload itself is not kept
+            os.remove(file_path)
+
+    job_queue.submit(job_id, analyze)
+    return JSONResponse(content={"status": "queued", "job_id": job_id}, status_code=202)
+
+@app.post("/api/match/")
+async def match_endpoint(
+    cv_file: UploadFile,
+    job_descriptions: str = Form(...)
+):
+    """
+    Queue the matching of one CV against many job descriptions.
+
+    :param cv_file: The uploaded CV file.
+    :param job_descriptions: JSON list of job descriptions, each a string or an object with "text" and optionally "title".
+    :return: JSON response with the job ID; "ranking" events on /api/jobs/{job_id}/events carry the ranking so far
+             every time a job description has been scored.
     """
-    # Save the uploaded file to the uploads directory
-    file_path = os.path.join(UPLOAD_DIR, cv_file.filename)
-    with open(file_path, "wb") as f:
-        content = await cv_file.read()
-        f.write(content)
     try:
-        # Analyze the CV
-        result = analyze_cv(file_path, job_description)
-        return JSONResponse(content={"status": "success", "result": result})
-    except Exception as e:
-        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+        descriptions = json.loads(job_descriptions)
+    except json.JSONDecodeError:
+        descriptions = None
+    max_descriptions = int(os.getenv("CV_MATCH_MAX_JDS", "50"))
+    if not isinstance(descriptions, list) or not descriptions:
+        return JSONResponse(content={"status": "error", "message": "job_descriptions must be a non-empty JSON list"},
+                            status_code=400)
+    if len(descriptions) > max_descriptions:
+        return JSONResponse(content={"status": "error",
+                                     "message": f"At most {max_descriptions} job descriptions can be matched at once"},
+                            status_code=400)
+
+    try:
+        job_id, file_path, digest = await _store_upload(cv_file)
+    except UploadRejected as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=e.status_code)
+
+    def match(on_task_complete):
+        try:
+            return match_cv(file_path, descriptions, content_hash=digest,
+                            output_dir=job_store.output_dir(job_id), on_task_complete=on_task_complete)
+        finally:
+            os.remove(file_path)
+
+    job_queue.submit(job_id, match)
+    return JSONResponse(content={"status": "queued", "job_id": job_id}, status_code=202)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Poll the progress of an analysis.
+
+    :param job_id: The job ID returned by /api/analyze/.
+    :return: The job status, the tasks completed so far and, once done, the result or error message.
+    """
+    status = job_queue.status(job_id)
+    if status is None:
+        return JSONResponse(content={"status": "error", "message": f"Job {job_id} not found"}, status_code=404)
+    return JSONResponse(content=status)
+
+def _sse_event(event, data):
+    """
+    Format one server-sent event.
+    :param event: The event name.
+    :param data: The event payload, sent as JSON.
+    :return: The formatted event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream the progress of an analysis as server-sent events: "status" when it starts running, "task" with the
+    output of each task as it completes, "ranking" with the ranking so far (CV matching only), then "done" with
+    the full report or "error".
+
+    :param job_id: The job ID returned by /api/analyze/.
+    :return: The event stream.
+    """
+    if job_queue.status(job_id) is None:
+        return JSONResponse(content={"status": "error", "message": f"Job {job_id} not found"}, status_code=404)
+
+    async def events():
+        async for event in job_queue.events(job_id):
+            # A comment line keeps proxies from closing the connection while a long task runs
+            yield ": keep-alive\n\n" if event is None else _sse_event(*event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-@app.get("/api/{task_name}")
-async def get_task_output(task_name: str):
+@app.get("/api/jobs/{job_id}/{task_name}")
+async def get_task_output(job_id: str, task_name: str):
     """
-    Retrieve a saved report by task name.
+    Retrieve a saved report of a job by task name. Reports are available as soon as their task completes.
 
+    :param job_id: The job ID returned by /api/analyze/.
     :param task_name: The name of the task (e.g., 'structure', 'relevance').
     :return: The saved report file.
     """
-    file_path = os.path.join(OUTPUT_DIR, f"{task_name}.md")
-    if os.path.exists(file_path):
+    file_path = job_store.report_path(job_id, task_name)
+    if file_path is not None:
         return FileResponse(file_path, media_type="text/markdown", filename=f"{task_name}.md")
-    return JSONResponse(content={"status": "error", "message": f"{task_name} not found"}, status_code=404)
+    return JSONResponse(content={"status": "error", "message": f"{task_name} not found for job {job_id}"},
+                        status_code=404)
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+from cv_reviewer.app.job_store import get_job_store
+
+
+class JobQueue:
+    """
+    Runs CV analyses on a worker pool. The status and progress events of every job are kept in its job store folder,
+    not in memory, so any worker process serving the API can report on a job, whichever process runs it.
+    """
+
+    def __init__(self, max_workers=2, store=None):
+        """
+        Initializes the queue.
+        :param max_workers: Number of analyses running at the same time; further jobs wait in the queue.
+        :param store: JobStore holding the jobs; defaults to the shared store.
+        """
+        self.store = store if store is not None else get_job_store()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cv-analysis")
+        # Summary of every job of this process that hasn't finished yet, so shutdown() can end them
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_id, analyze):
+        """
+        Queues an analysis.
+        :param job_id: The job ID, created by the job store.
+        :param analyze: Function running the analysis. It is called with a progress callback taking
+                        (task_name, output) and optionally the event name ("task" by default), and returns
+                        the final report.
+        """
+        summary = self._summary(job_id, "queued")
+        with self._lock:
+            self._jobs[job_id] = summary
+            self.store.save_status(job_id, summary)
+        self._pool.submit(self._run, job_id, analyze)
+
+    @staticmethod
+    def _summary(job_id, status, completed_tasks=(), ranking=None, result=None, message=None):
+        return {
+            "job_id": job_id,
+            "status": status,
+            "completed_tasks": list(completed_tasks),
+            "ranking": ranking,
+            "result": result,
+            "message": message
+        }
+
+    def _publish(self, job_id, event, data, **changes):
+        """
+        Records an event of a job and its updated summary. Nothing is recorded once the job has finished,
+        e.g., for an analysis still running when shutdown() ended its job.
+        """
+        with self._lock:
+            summary = self._jobs.get(job_id)
+            if summary is None:
+                return
+            summary.update(changes)
+            self.store.append_event(job_id, event, data)
+            self.store.save_status(job_id, summary)
+            if event in ("done", "error"):
+                del self._jobs[job_id]
+
+    def _run(self, job_id, analyze):
+        def publish(event, data, **changes):
+            self._publish(job_id, event, data, **changes)
+
+        with self._lock:
+            summary = self._jobs.get(job_id)
+        if summary is None:
+            return
+        publish("status", {"status": "running"}, status="running")
+
+        def on_task_complete(task_name, output, event="task"):
+            if event == "ranking":
+                publish(event, {"task": task_name, "output": output}, ranking=output)
+            else:
+                publish(event, {"task": task_name, "output": output},
+                        completed_tasks=summary["completed_tasks"] + [task_name])
+
+        try:
+            result = str(analyze(on_task_complete))
+            publish("done", {"job_id": job_id, "result": result}, status="done", result=result)
+        except Exception as e:
+            publish("error", {"job_id": job_id, "message": str(e)}, status="error", message=str(e))
+
+    def status(self, job_id):
+        """
+        Returns the state of a job.
+        :param job_id: The job ID.
+        :return: Dictionary with the status, the names of the completed tasks, the latest ranking (CV matching
+                 jobs only), and the result or error message once finished; None if the job is unknown.
+        """
+        return self.store.load_status(job_id)
+
+    async def events(self, job_id, keepalive_seconds=15, poll_interval=0.25):
+        """
+        Yields the events of a job from the start until it finishes. Events that already happened are
+        replayed first, so a client connecting late still sees every completed task. Waiting for new events
+        doesn't hold a thread, so long-running streams don't use up the server's threadpool.
+        :param job_id: The job ID.
+        :param keepalive_seconds: A None is yielded after this long without events, so the caller can
+                                  keep the connection alive.
+        :param poll_interval: Seconds between two reads of the job's event log.
+        :return: Async generator of (event name, data) tuples, or None for a keep-alive.
+        """
+        offset = 0
+        idle = 0.0
+        while True:
+            if self.store.load_status(job_id) is None:
+                return
+            events, offset = self.store.read_events(job_id, offset)
+            for event in events:
+                yield event
+                if event[0] in ("done", "error"):
+                    return
+            if events:
+                idle = 0.0
+            elif idle >= keepalive_seconds:
+                yield None
+                idle = 0.0
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+
+    def shutdown(self, message="Service restarted"):
+        """
+        Stops the worker pool. Jobs of this process that are still queued or running end with an error, so
+        their clients get a final event instead of waiting for a job nothing will finish.
+        :param message: Error message given to the unfinished jobs.
+        """
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            self._publish(job_id, "error", {"job_id": job_id, "message": message}, status="error", message=message)
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Returns the process-wide job queue, sized by CV_JOB_WORKERS, keeping its jobs in the shared job store.
+    """
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = JobQueue(max_workers=int(os.getenv("CV_JOB_WORKERS", "2")))
+        return _shared_queue
@@ -0,0 +1,186 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+TASK_NAME_PATTERN = re.compile(r"^[a-z0-9_]+$")
+
+
+class JobStore:
+    """One directory per analysis job holding its upload and task reports, removed after a TTL"""
+
+    def __init__(self, root_dir="./cache/jobs", ttl_seconds=24 * 3600, cleanup_interval=300):
+        """
+        Initializes the store.
+        :param root_dir: Directory under which every job gets its own folder.
+        :param ttl_seconds: Jobs older than this are deleted, together with their reports.
+        :param cleanup_interval: Minimum number of seconds between two scans for expired jobs.
+        """
+        self.root_dir = root_dir
+        self.ttl_seconds = ttl_seconds
+        self.cleanup_interval = cleanup_interval
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    def create(self):
+        """
+        Creates a new job with an empty output folder.
+        :return: The job ID.
+        """
+        self.cleanup()
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.output_dir(job_id))
+        return job_id
+
+    def job_dir(self, job_id):
+        """
+        Returns the folder of a job.
+        :param job_id: The job ID.
+        :return: Path of the job folder.
+        :raises ValueError: If the job ID is malformed (it is used in a path, so nothing else is accepted).
+        """
+        if not JOB_ID_PATTERN.match(job_id or ""):
+            raise ValueError(f"Invalid job ID '{job_id}'.")
+        return os.path.join(self.root_dir, job_id)
+
+    def exists(self, job_id):
+        try:
+            return os.path.isdir(self.job_dir(job_id))
+        except ValueError:
+            return False
+
+    def output_dir(self, job_id):
+        """
+        Returns the folder the task reports of a job are written to.
+        :param job_id: The job ID.
+        :return: Path of the output folder.
+        """
+        return os.path.join(self.job_dir(job_id), "output")
+
+    def upload_prefix(self, job_id):
+        """
+        Returns where the uploaded CV of a job is saved, without extension (added once the file type is known).
+        :param job_id: The job ID.
+        :return: Path of the uploaded file without extension.
+        """
+        return os.path.join(self.job_dir(job_id), "cv")
+
+    def delete(self, job_id):
+        """
+        Deletes a job and everything in its folder.
+        :param job_id: The job ID.
+        """
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def report_path(self, job_id, task_name):
+        """
+        Returns the report of one task of a job.
+        :param job_id: The job ID.
+        :param task_name: The name of the task (e.g., 'structure', 'report', 'relevance_2').
+        :return: Path of the report, or None if the job or the report does not exist.
+        """
+        if not TASK_NAME_PATTERN.match(task_name or "") or not self.exists(job_id):
+            return None
+        path = os.path.join(self.output_dir(job_id), f"{task_name}.md")
+        return path if os.path.exists(path) else None
+
+    def save_status(self, job_id, status):
+        """
+        Saves the status of a job, replacing the previous one in a single step so readers never see half of it.
+        :param job_id: The job ID.
+        :param status: JSON-serializable status dictionary.
+        """
+        path = os.path.join(self.job_dir(job_id), "status.json")
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(status, f)
+        os.replace(temp_path, path)
+
+    def load_status(self, job_id):
+        """
+        Loads the status of a job, whichever worker process runs it.
+        :param job_id: The job ID.
+        :return: The status dictionary, or None if the job does not exist.
+        """
+        try:
+            with open(os.path.join(self.job_dir(job_id), "status.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return None
+
+    def append_event(self, job_id, event, data):
+        """
+        Appends a progress event to the event log of a job. Only the worker running the job writes to it.
+        :param job_id: The job ID.
+        :param event: The event name.
+        :param data: JSON-serializable event payload.
+        """
+        with open(os.path.join(self.job_dir(job_id), "events.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps([event, data]) + "\n")
+
+    def read_events(self, job_id, offset=0):
+        """
+        Reads the events appended to the event log of a job since an earlier read.
+        :param job_id: The job ID.
+        :param offset: Byte offset returned by the previous read (0 to read from the start).
+        :return: (list of (event name, data) tuples, offset to pass to the next read).
+        """
+        try:
+            with open(os.path.join(self.job_dir(job_id), "events.jsonl"), "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except (ValueError, OSError):
+            return [], offset
+        # A line still being written is left for the next read
+        complete = data[:data.rfind(b"\n") + 1]
+        events = [tuple(json.loads(line)) for line in complete.decode("utf-8").splitlines()]
+        return events, offset + len(complete)
+
+    def cleanup(self, force=False):
+        """
+        Deletes jobs older than the TTL. Runs at most once per cleanup interval unless forced.
+        :param force: Scan even if the last scan was recent.
+        :return: The number of jobs deleted.
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_cleanup < self.cleanup_interval:
+                return 0
+            self._last_cleanup = now
+        if not os.path.isdir(self.root_dir):
+            return 0
+
+        removed = 0
+        for job_id in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, job_id)
+            try:
+                expired = JOB_ID_PATTERN.match(job_id) and now - os.path.getmtime(path) > self.ttl_seconds
+            except FileNotFoundError:
+                # Removed by another worker sharing the directory
+                continue
+            if expired:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_job_store():
+    """
+    Returns the process-wide job store, configured by CV_JOB_DIR and CV_JOB_TTL_SECONDS.
+    """
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = JobStore(
+                root_dir=os.getenv("CV_JOB_DIR", "./cache/jobs"),
+                ttl_seconds=int(os.getenv("CV_JOB_TTL_SECONDS", str(24 * 3600)))
+            )
+        return _shared_store
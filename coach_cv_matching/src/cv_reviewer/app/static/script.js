@@ -24,7 +24,7 @@ document.getElementById('upload-form').addEventListener('submit', async (event)
     analyzeButton.disabled = true; // Disable the analyze button during processing
 
     try {
-        // Send POST request to the analyze API endpoint
+        // Send POST request to the analyze API endpoint; it only queues the analysis
         const response = await fetch('/api/analyze/', {
             method: 'POST',
             body: formData,
@@ -36,7 +36,10 @@ document.getElementById('upload-form').addEventListener('submit', async (event)
             throw new Error(errorData.message || 'Failed to analyze the CV');
         }
 
-        const data = await response.json(); // Parse JSON response
+        const job = await response.json(); // Parse JSON response with the job ID
+
+        // Follow the progress of the job until the full report is ready
+        const data = await followJob(job.job_id, analyzingContainer);
 
         // Hide the analyzing overlay
         analyzingContainer.style.display = 'none';
@@ -51,6 +54,39 @@ document.getElementById('upload-form').addEventListener('submit', async (event)
     }
 });
 
+// Function to follow a queued analysis over server-sent events, showing each task as it completes
+function followJob(jobId, analyzingContainer) {
+    const progressList = document.createElement('ul'); // Completed tasks so far
+    analyzingContainer.querySelector('p').textContent = 'Analyzing... Please wait.';
+    analyzingContainer.appendChild(progressList);
+
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`/api/jobs/${jobId}/events`);
+
+        source.addEventListener('task', (event) => {
+            const data = JSON.parse(event.data);
+            const item = document.createElement('li');
+            item.innerHTML = `<a href="/api/jobs/${jobId}/${data.task}" download="${data.task}.md">${data.task}</a> ready`;
+            progressList.appendChild(item);
+        });
+
+        source.addEventListener('done', (event) => {
+            source.close();
+            progressList.remove();
+            const data = JSON.parse(event.data);
+            resolve({ status: 'success', job_id: data.job_id, result: data.result });
+        });
+
+        source.addEventListener('error', (event) => {
+            source.close();
+            progressList.remove();
+            // Server-side failures carry a message; otherwise the connection itself was lost
+            const message = event.data ? JSON.parse(event.data).message : 'Lost connection to the server';
+            reject(new Error(message));
+        });
+    });
+}
+
 // Function to display the results in a modal
 function displayResultModal(data) {
     const resultModal = document.getElementById('result-modal'); // Modal container
@@ -68,11 +104,11 @@ function displayResultModal(data) {
             <div class="markdown-content">${markdownContent}</div>
             <p>Download your reports:</p>
             <ul>
-                <li><a href="/api/structure" download="structure.md">Structure Report</a></li>
-                <li><a href="/api/relevance" download="relevance.md">Relevance Report</a></li>
-                <li><a href="/api/language" download="language.md">Language Report</a></li>
-                <li><a href="/api/power" download="power.md">Power Report</a></li>
-                <li><a href="/api/report" download="full_report.md">Full Report</a></li>
+                <li><a href="/api/jobs/${data.job_id}/structure" download="structure.md">Structure Report</a></li>
+                <li><a href="/api/jobs/${data.job_id}/relevance" download="relevance.md">Relevance Report</a></li>
+                <li><a href="/api/jobs/${data.job_id}/language" download="language.md">Language Report</a></li>
+                <li><a href="/api/jobs/${data.job_id}/power" download="power.md">Power Report</a></li>
+                <li><a href="/api/jobs/${data.job_id}/report" download="full_report.md">Full Report</a></li>
             </ul>
         `;
         resultModal.innerHTML = reportHTML; // Insert report HTML into modal
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import zipfile
+from typing import NamedTuple
+
+# Uploads are copied in blocks of this size, so a large file never sits in memory at once
+CHUNK_SIZE = 1024 * 1024
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class UploadRejected(Exception):
+    """An upload that is refused before any parsing, with the HTTP status to answer with"""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadInfo(NamedTuple):
+    """What was learned about an accepted upload"""
+    kind: str
+    size: int
+    sha256: str
+
+
+def max_upload_bytes():
+    """
+    Returns the largest accepted upload, from CV_PARSE_MAX_FILE_MB (the limit FileParser enforces as well).
+    """
+    return int(float(os.getenv("CV_PARSE_MAX_FILE_MB", "10")) * 1024 * 1024)
+
+
+def detect_file_type(stream):
+    """
+    Identifies a CV from its content rather than its filename.
+    :param stream: Seekable binary stream, left at its start.
+    :return: "pdf" or "docx".
+    :raises UploadRejected: If the content is neither a PDF nor a Word document.
+    """
+    stream.seek(0)
+    header = stream.read(len(PDF_MAGIC))
+    stream.seek(0)
+    if header.startswith(PDF_MAGIC):
+        return "pdf"
+    if header.startswith(ZIP_MAGIC):
+        # Any zip file starts like a DOCX; only the central directory is read to tell them apart
+        try:
+            with zipfile.ZipFile(stream) as archive:
+                is_docx = "word/document.xml" in archive.namelist()
+        except zipfile.BadZipFile:
+            is_docx = False
+        finally:
+            stream.seek(0)
+        if is_docx:
+            return "docx"
+    raise UploadRejected("Unsupported file format. Only PDF and DOCX are supported.", 415)
+
+
+def check_upload(stream, max_bytes=None):
+    """
+    Validates an upload in place, without copying it.
+    :param stream: Seekable binary stream of the upload (e.g., UploadFile.file, which is already spooled to disk).
+    :param max_bytes: Largest accepted size; defaults to max_upload_bytes().
+    :return: (kind, size) of the upload; the stream is left at its start.
+    :raises UploadRejected: If the upload is too large, empty, or not a PDF or DOCX.
+    """
+    max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    if size > max_bytes:
+        raise UploadRejected(f"The file exceeds the maximum size of {max_bytes // (1024 * 1024)} MB.", 413)
+    if size == 0:
+        raise UploadRejected("The uploaded file is empty.", 400)
+    return detect_file_type(stream), size
+
+
+def save_upload(stream, path_prefix, max_bytes=None):
+    """
+    Validates an upload and copies it to disk block by block, hashing it on the way.
+    :param stream: Seekable binary stream of the upload.
+    :param path_prefix: Destination path without extension; the detected type is appended (e.g., '.pdf').
+    :param max_bytes: Largest accepted size; defaults to max_upload_bytes().
+    :return: (UploadInfo, path of the saved file).
+    :raises UploadRejected: If the upload is too large, empty, or not a PDF or DOCX.
+    """
+    kind, size = check_upload(stream, max_bytes)
+    path = f"{path_prefix}.{kind}"
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        for block in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            digest.update(block)
+            f.write(block)
+    stream.seek(0)
+    return UploadInfo(kind, size, digest.hexdigest()), path
+
+
+class UploadSizeLimit:
+    """
+    ASGI middleware answering 413 to request bodies over the upload limit (plus room for the form fields).
+    A request declaring a larger Content-Length is refused before its body is received; one without it
+    (chunked transfer encoding) is counted as its body streams in and cut off once it passes the limit,
+    so it is never spooled to disk in full.
+    """
+
+    def __init__(self, app, overhead=1024 * 1024):
+        """
+        :param app: The ASGI application to protect.
+        :param overhead: Bytes allowed on top of max_upload_bytes() for the job description and multipart framing.
+        """
+        self.app = app
+        self.overhead = overhead
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_upload_bytes() + self.overhead
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send)
+            return
+
+        state = {"received": 0, "too_large": False, "started": False}
+
+        async def limited_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > limit:
+                    state["too_large"] = True
+                    raise UploadRejected("The upload is too large.", 413)
+            return message
+
+        async def guarded_send(message):
+            # Whatever the application answers to the interrupted body is replaced by the 413
+            if state["too_large"]:
+                return
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not state["too_large"]:
+                raise
+        if state["too_large"] and not state["started"]:
+            await self._reject(send)
+
+    @staticmethod
+    async def _reject(send):
+        body = json.dumps({"status": "error", "message": "The upload is too large."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii"))]
+        })
+        await send({"type": "http.response.body", "body": body})
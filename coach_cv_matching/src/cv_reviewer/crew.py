@@ -1,6 +1,114 @@
 from crewai import Agent, Task, Crew, Process
 from crewai.project import CrewBase, agent, crew, task
+import os
+import threading
+import time
 import yaml
+from cv_reviewer.tools.relevance import format_prescore, prescore_relevance
+
+# Resolved from this file, so the crew works whatever the current directory is
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+AGENT_NAMES = ('cv_analyzer', 'jd_processor', 'report_generator')
+# Analyses that run at the same time; each gets its own copy of the CV analyzer, as an agent executes one task at a time
+CONCURRENT_ANALYSES = ('structure', 'language', 'power', 'relevance')
+# Analyses that only look at the CV, by task name and task config
+JD_INDEPENDENT_TASKS = {
+    'structure': 'analyze_cv_structure',
+    'language': 'analyze_cv_language',
+    'power': 'analyze_cv_power'
+}
+
+_config_cache = {}
+_config_lock = threading.Lock()
+
+def load_config(file_name):
+    """
+    Loads a YAML file from the config folder. It is parsed once per process and again only when the file changes.
+    :param file_name: Name of the file in the config folder (e.g., 'agents.yaml').
+    :return: The parsed configuration, shared between callers, so it must not be modified.
+    """
+    path = os.path.join(CONFIG_DIR, file_name)
+    mtime = os.path.getmtime(path)
+    with _config_lock:
+        cached = _config_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    with open(path, 'r') as config_file:
+        config = yaml.safe_load(config_file)
+    with _config_lock:
+        _config_cache[path] = (mtime, config)
+    return config
+
+def clear_config_cache():
+    """Forgets every parsed configuration file"""
+    with _config_lock:
+        _config_cache.clear()
+
+def build_agents(agents_config):
+    """
+    Creates the agents of the crew, plus one CV analyzer for each of the concurrent analyses.
+    :param agents_config: The parsed agents.yaml.
+    :return: Dictionary of agent name to Agent; the analyzer copies are named 'cv_analyzer:<analysis>'.
+    """
+    names = [(name, name) for name in AGENT_NAMES]
+    names += [(f'cv_analyzer:{analysis}', 'cv_analyzer') for analysis in CONCURRENT_ANALYSES]
+    return {
+        name: Agent(
+            config=agents_config[config_name],
+            verbose=True,
+            allow_delegation=False
+        )
+        for name, config_name in names
+    }
+
+class AgentPool:
+    """Agents of finished analyses, kept so the next analysis doesn't build its agents (and their LLM clients) again"""
+
+    def __init__(self, max_idle=4):
+        """
+        Initializes the pool.
+        :param max_idle: Largest number of idle agent sets kept; 0 builds new agents for every analysis.
+        """
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes an idle set of agents, or builds one. A set is only used by one crew at a time.
+        :return: (agents config, dictionary of agent name to Agent).
+        """
+        agents_config = load_config('agents.yaml')
+        with self._lock:
+            while self._idle:
+                idle_config, agents = self._idle.pop()
+                # Agents built from an older agents.yaml are dropped
+                if idle_config is agents_config:
+                    return agents_config, agents
+        return agents_config, build_agents(agents_config)
+
+    def release(self, agents_config, agents):
+        """
+        Returns a set of agents once its crew has finished.
+        :param agents_config: The config the agents were built from.
+        :param agents: Dictionary of agent name to Agent.
+        """
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((agents_config, agents))
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def get_agent_pool():
+    """
+    Returns the process-wide agent pool, sized by CV_AGENT_POOL_SIZE.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = AgentPool(max_idle=int(os.getenv("CV_AGENT_POOL_SIZE", "4")))
+        return _shared_pool
 
 def has_job_description(inputs) -> bool:
     """Check if a job description is provided"""
@@ -9,79 +117,104 @@ def has_job_description(inputs) -> bool:
 class CVReviewCrew:
     """Crew to review CVs and generate feedback reports"""
 
-    def __init__(self, inputs):
+    def __init__(self, inputs, on_task_complete=None, agent_pool=None):
+        """
+        Initializes the crew with its inputs, the cached agent and task configuration and a set of pooled agents.
+        Call release() once the crew has finished, so the agents can be reused.
+        :param inputs: The crew inputs (cv_text, jd_text and optionally relevance_context).
+        :param on_task_complete: Optional function called with (task_name, output) as soon as each reported task finishes.
+        :param agent_pool: AgentPool to take the agents from; defaults to the shared pool.
+        """
         self.inputs = inputs
-        with open('./src/cv_reviewer/config/agents.yaml', 'r') as agents_file:
-            self.agents_config = yaml.safe_load(agents_file)
-        with open('./src/cv_reviewer/config/tasks.yaml', 'r') as tasks_file:
-            self.tasks_config = yaml.safe_load(tasks_file)
+        # With a job description, the relevance task works from the local pre-scoring instead of the full CV;
+        # inputs that don't carry it yet get it added here
+        if "relevance_context" not in inputs:
+            inputs["relevance_context"] = format_prescore(
+                prescore_relevance(inputs["cv_text"], inputs["jd_text"])
+            ) if has_job_description(inputs) else ""
+        self.on_task_complete = on_task_complete
+        self.agent_pool = agent_pool if agent_pool is not None else get_agent_pool()
+        self.tasks_config = load_config('tasks.yaml')
         
         self.task_outputs = {}
+        self.task_timings = {}
+        self.task_dependencies = {}
+        self.started_at = None
+        self._timing_lock = threading.Lock()
 
-        """Create agents for the crew"""
-        self.cv_analyzer = Agent(
-            config=self.agents_config['cv_analyzer'],
-            verbose=True,
-            allow_delegation=False
-        )
-            
-        self.jd_processor = Agent(
-            config=self.agents_config['jd_processor'],
-            verbose=True,
-            allow_delegation=False
-        )
-            
-        self.report_generator = Agent(
-            config=self.agents_config['report_generator'],
-            verbose=True,
-            allow_delegation=False
-        )
+        # Agents come from the pool instead of being built for every analysis
+        self.agents_config, self._agents = self.agent_pool.acquire()
+        self.cv_analyzer = self._agents['cv_analyzer']
+        self.jd_processor = self._agents['jd_processor']
+        self.report_generator = self._agents['report_generator']
+        self.analyzers = {analysis: self._agents[f'cv_analyzer:{analysis}'] for analysis in CONCURRENT_ANALYSES}
+
+    def release(self):
+        """Returns the agents to the pool. The crew must not be used afterwards."""
+        if self._agents is not None:
+            self.agent_pool.release(self.agents_config, self._agents)
+            self._agents = None
     
     def create_tasks(self):
-        """Create and organize tasks for the crew."""
+        """
+        Create and organize tasks for the crew.
+        The job description (or industry) analysis runs first. Structure, language, power and the relevance analysis
+        that needs it then run asynchronously, each on its own agent, and the report waits for all of them, which
+        leaves 3 LLM calls on the critical path instead of 6. The synchronous analysis comes first because CrewAI
+        waits for pending asynchronous tasks before it starts a synchronous one.
+        """
         jd_text = self.inputs.get("jd_text", "").strip()
 
+        structure = Task(
+            config=self.tasks_config['analyze_cv_structure'],
+            agent=self.analyzers['structure'],
+            async_execution=True,
+            callback=self.task_callback('structure')
+        )
+
+        language = Task(
+            config=self.tasks_config['analyze_cv_language'],
+            agent=self.analyzers['language'],
+            async_execution=True,
+            callback=self.task_callback('language')
+        )
+
+        power = Task(
+            config=self.tasks_config['analyze_cv_power'],
+            agent=self.analyzers['power'],
+            async_execution=True,
+            callback=self.task_callback('power')
+        )
+
         if jd_text:
+            choice_name = 'job_description'
             choice = Task(
                 config=self.tasks_config['analyze_job_description'],
-                agent=self.jd_processor
+                agent=self.jd_processor,
+                callback=self.task_callback(choice_name, store_output=False)
             )
             relevance = Task(
                 config=self.tasks_config['analyze_cv_relevance_w_jd'],
-                agent=self.cv_analyzer,
+                agent=self.analyzers['relevance'],
                 context=[choice],
+                async_execution=True,
                 callback=self.task_callback('relevance')
             )
         else:
+            choice_name = 'industry'
             choice = Task(
                 config=self.tasks_config['infer_industry_from_cv'],
-                agent=self.cv_analyzer
+                agent=self.cv_analyzer,
+                callback=self.task_callback(choice_name, store_output=False)
             )
             relevance = Task(
                 config=self.tasks_config['analyze_cv_relevance_wo_jd'],
-                agent=self.cv_analyzer,
+                agent=self.analyzers['relevance'],
                 context=[choice],
+                async_execution=True,
                 callback=self.task_callback('relevance')
             )
 
-        structure = Task(
-            config=self.tasks_config['analyze_cv_structure'],
-            agent=self.cv_analyzer,
-            callback=self.task_callback('structure')
-        )
-
-        language = Task(
-            config=self.tasks_config['analyze_cv_language'],
-            agent=self.cv_analyzer,
-            callback=self.task_callback('language')
-        )
-
-        power = Task(
-            config=self.tasks_config['analyze_cv_power'],
-            agent=self.cv_analyzer,
-            callback=self.task_callback('power')
-        )
-
         feedback = Task(
             config=self.tasks_config['generate_feedback_report'],
             agent=self.report_generator,
@@ -89,12 +222,22 @@ class CVReviewCrew:
             callback=self.task_callback('report')
         )
 
-        self.tasks_list = [choice, structure, relevance, language, power, feedback]
-    
-    def task_callback(self, task_name):
+        # A task starts as soon as the tasks it waits for have finished; used for the timing breakdown
+        self.task_dependencies = {
+            choice_name: [],
+            'structure': [choice_name],
+            'language': [choice_name],
+            'power': [choice_name],
+            'relevance': [choice_name],
+            'report': ['structure', 'relevance', 'language', 'power']
+        }
+        self.tasks_list = [choice, structure, language, power, relevance, feedback]
+
+    def task_callback(self, task_name, store_output=True):
         """
         Creates a callback function that includes the task name.
         :param task_name: The name of the task being executed.
+        :param store_output: Whether the output is kept in task_outputs (intermediate tasks only record timings).
         :return: A callback function.
         """
         def callback(output):
@@ -102,18 +245,97 @@ class CVReviewCrew:
             Callback function to handle task output.
             :param output: The output of the task.
             """
+            self._record_timing(task_name)
             # Store the output with the task name
-            self.task_outputs[task_name] = output.raw_output
+            if store_output:
+                self.task_outputs[task_name] = output.raw_output
+                if self.on_task_complete is not None:
+                    self.on_task_complete(task_name, output.raw_output)
 
         return callback
 
+    def _record_timing(self, task_name):
+        """
+        Records when a task finished. Its start is when its last dependency finished (or the kickoff).
+        :param task_name: The name of the finished task.
+        """
+        finished = time.perf_counter()
+        with self._timing_lock:
+            if self.started_at is None:
+                self.started_at = finished
+            started = max(
+                [self.started_at] + [
+                    self.started_at + self.task_timings[name]["finished"]
+                    for name in self.task_dependencies.get(task_name, [])
+                    if name in self.task_timings
+                ]
+            )
+            self.task_timings[task_name] = {
+                "started": round(started - self.started_at, 3),
+                "finished": round(finished - self.started_at, 3),
+                "seconds": round(finished - started, 3)
+            }
+
+    def timing_report(self):
+        """
+        Formats the timing breakdown of the last run.
+        :return: One line per task with its start, end and duration in seconds, plus the total.
+        """
+        lines = [f"{'task':<16}{'start':>9}{'end':>9}{'seconds':>9}"]
+        for name, timing in sorted(self.task_timings.items(), key=lambda item: item[1]["finished"]):
+            lines.append(f"{name:<16}{timing['started']:>9.1f}{timing['finished']:>9.1f}{timing['seconds']:>9.1f}")
+        total = max((timing["finished"] for timing in self.task_timings.values()), default=0.0)
+        lines.append(f"{'total':<16}{'':>9}{total:>9.1f}")
+        return "\n".join(lines)
+
     @crew
     def crew(self) -> Crew:
-        """Creates the CV review crew"""
+        """Creates the CV review crew (call it right before kickoff, timings are measured from here)"""
         self.create_tasks()
+        return self._start_crew(self.tasks_list)
+
+    def analysis_crew(self, task_name):
+        """
+        Creates a crew running a single analysis that doesn't depend on the job description. When one CV is
+        matched against many job descriptions, these run once instead of once per job description.
+        :param task_name: 'structure', 'language' or 'power'.
+        :return: The crew.
+        """
+        analysis = Task(
+            config=self.tasks_config[JD_INDEPENDENT_TASKS[task_name]],
+            agent=self.cv_analyzer,
+            callback=self.task_callback(task_name)
+        )
+        self.task_dependencies = {task_name: []}
+        return self._start_crew([analysis])
+
+    def relevance_crew(self):
+        """
+        Creates a crew analyzing the job description of the inputs and the relevance of the CV to it, without the
+        job description independent analyses and the report.
+        :return: The crew.
+        """
+        choice = Task(
+            config=self.tasks_config['analyze_job_description'],
+            agent=self.jd_processor,
+            callback=self.task_callback('job_description', store_output=False)
+        )
+        relevance = Task(
+            config=self.tasks_config['analyze_cv_relevance_w_jd'],
+            agent=self.cv_analyzer,
+            context=[choice],
+            callback=self.task_callback('relevance')
+        )
+        self.task_dependencies = {'job_description': [], 'relevance': ['job_description']}
+        return self._start_crew([choice, relevance])
+
+    def _start_crew(self, tasks):
+        self.task_outputs = {}
+        self.task_timings = {}
+        self.started_at = time.perf_counter()
         return Crew(
-            agents=[self.cv_analyzer, self.jd_processor, self.report_generator],
-            tasks=self.tasks_list,
+            agents=list(self._agents.values()),
+            tasks=tasks,
             process=Process.sequential,
             verbose=2
         )
@@ -18,4 +18,10 @@ def run():
         'cv_text': cv_text
     }
     cv_crew = CVReviewCrew(inputs=inputs)
-    cv_crew.crew().kickoff(inputs=inputs)
+    try:
+        cv_crew.crew().kickoff(inputs=inputs)
+    finally:
+        cv_crew.release()
+
+    # Show how long each task took and how they overlapped
+    print(cv_crew.timing_report())
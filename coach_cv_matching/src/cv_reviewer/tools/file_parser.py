@@ -1,64 +1,137 @@
 from pypdf import PdfReader
 from docx import Document
+from typing import NamedTuple
 import os
+from cv_reviewer.tools.parse_cache import file_content_hash, get_parse_cache
+
+
+class TextChunk(NamedTuple):
+    """A page (PDF) or paragraph (DOCX) of extracted text and where it sits in the full text"""
+    index: int
+    start: int
+    end: int
+    text: str
+
 
 class FileParser:
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache=None, digest=None, max_pages=None, max_bytes=None):
         """
         Initializes the FileParser with the path to the file.
         :param file_path: Path to the file to be parsed.
+        :param cache: ParseCache for extracted text; defaults to the shared cache.
+        :param digest: SHA-256 of the file content, if the caller already computed it.
+        :param max_pages: Largest number of PDF pages accepted (defaults to CV_PARSE_MAX_PAGES).
+        :param max_bytes: Largest file size accepted, in bytes (defaults to CV_PARSE_MAX_FILE_MB).
         """
         self.file_path = file_path
+        self.cache = cache if cache is not None else get_parse_cache()
+        self.digest = digest
+        self.cache_hit = False
+        self.max_pages = max_pages if max_pages is not None else int(os.getenv("CV_PARSE_MAX_PAGES", "50"))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.getenv("CV_PARSE_MAX_FILE_MB", "10")) * 1024 * 1024)
 
-    def parse(self):
+    def _check_file(self):
         """
-        Parses the file based on its extension and extracts the content.
-        :return: Extracted text content from the file.
-        :raises ValueError: If the file format is unsupported.
-        :raises Exception: If the file cannot be processed (e.g., corrupted file).
+        Validates the file before anything is extracted.
+        :return: The file extension ("pdf" or "docx").
+        :raises FileNotFoundError: If the file does not exist.
+        :raises ValueError: If the file format is unsupported or the file is too large.
         """
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"The file '{self.file_path}' does not exist.")
-        
+
         if self.file_path.endswith(".pdf"):
-            return self._parse_pdf()
+            extension = "pdf"
         elif self.file_path.endswith(".docx"):
-            return self._parse_docx()
+            extension = "docx"
         else:
             raise ValueError("Unsupported file format. Only PDF and DOCX are supported.")
 
+        if os.path.getsize(self.file_path) > self.max_bytes:
+            raise ValueError(f"The file exceeds the maximum size of {self.max_bytes // (1024 * 1024)} MB.")
+        return extension
+
+    def parse(self):
+        """
+        Parses the file based on its extension and extracts the content.
+        :return: Extracted text content from the file.
+        :raises ValueError: If the file format is unsupported or the file exceeds the limits.
+        :raises Exception: If the file cannot be processed (e.g., corrupted file).
+        """
+        extension = self._check_file()
+
+        # The same CV is uploaded again and again, so its text is looked up by content first
+        if self.digest is None:
+            self.digest = file_content_hash(self.file_path)
+        text = self.cache.get(self.digest, extension)
+        if text is not None:
+            self.cache_hit = True
+            return text
+
+        # Joined once at the end instead of growing a string page by page
+        text = "".join(chunk.text for chunk in self._iter_chunks(extension))
+        self.cache.put(self.digest, extension, text)
+        return text
+
+    def iter_chunks(self):
+        """
+        Extracts the file page by page (PDF) or paragraph by paragraph (DOCX), without building the full text.
+        :return: Generator of TextChunk; start/end are offsets into the text parse() returns.
+        :raises ValueError: If the file format is unsupported or the file exceeds the limits.
+        :raises Exception: If the file cannot be processed (e.g., corrupted file).
+        """
+        return self._iter_chunks(self._check_file())
+
+    def _iter_chunks(self, extension):
+        pieces = self._parse_pdf() if extension == "pdf" else self._parse_docx()
+        offset = 0
+        for index, piece in pieces:
+            yield TextChunk(index, offset, offset + len(piece), piece)
+            offset += len(piece)
+
     def _parse_pdf(self):
         """
         Parses a PDF file and extracts its text.
-        :return: Extracted text content from the PDF file.
-        :raises Exception: If the PDF file is corrupted or cannot be read.
+        :return: Generator of (page number, page text) for every page with text.
+        :raises ValueError: If the PDF has more pages than allowed.
+        :raises Exception: If the PDF file is corrupted, cannot be read, or has no text.
         """
-        text = ""
         try:
             reader = PdfReader(self.file_path)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
+            page_count = len(reader.pages)
         except Exception as e:
             raise Exception(f"Failed to parse PDF file: {str(e)}")
-        if not text.strip():
+        if page_count > self.max_pages:
+            raise ValueError(f"The PDF file has {page_count} pages; at most {self.max_pages} are supported.")
+
+        has_text = False
+        for number in range(page_count):
+            try:
+                page_text = reader.pages[number].extract_text()
+            except Exception as e:
+                raise Exception(f"Failed to parse PDF file: {str(e)}")
+            if page_text:
+                has_text = has_text or bool(page_text.strip())
+                yield number, page_text
+        if not has_text:
             raise Exception("The PDF file is empty or does not contain readable text.")
-        return text
 
     def _parse_docx(self):
         """
         Parses a DOCX file and extracts its text.
-        :return: Extracted text content from the DOCX file.
-        :raises Exception: If the DOCX file cannot be processed.
+        :return: Generator of (paragraph number, paragraph text followed by a newline).
+        :raises Exception: If the DOCX file cannot be processed or has no text.
         """
-        text = ""
         try:
             doc = Document(self.file_path)
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            paragraphs = doc.paragraphs
         except Exception as e:
             raise Exception(f"Failed to parse DOCX file: {str(e)}")
-        if not text.strip():
+
+        has_text = False
+        for number, paragraph in enumerate(paragraphs):
+            has_text = has_text or bool(paragraph.text.strip())
+            yield number, paragraph.text + "\n"
+        if not has_text:
             raise Exception("The DOCX file is empty or does not contain readable text.")
-        return text
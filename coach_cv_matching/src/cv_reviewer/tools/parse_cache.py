@@ -0,0 +1,147 @@
+import hashlib
+import os
+import threading
+
+# Bump when text extraction changes, so text extracted by the old code is not reused
+PARSER_VERSION = "1"
+
+
+def content_hash(data):
+    """
+    Computes the cache key of a file's content.
+    :param data: The raw bytes of the file.
+    :return: Hex SHA-256 digest of the bytes.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_content_hash(file_path, block_size=1024 * 1024):
+    """
+    Computes the cache key of a file without loading it into memory at once.
+    :param file_path: Path to the file.
+    :param block_size: Bytes read per step.
+    :return: Hex SHA-256 digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Extracted CV text on disk, keyed by the SHA-256 of the uploaded bytes"""
+
+    def __init__(self, cache_dir="./cache/parsed", max_bytes=256 * 1024 * 1024):
+        """
+        Initializes the cache.
+        :param cache_dir: Directory holding one text file per parsed document.
+        :param max_bytes: Total size of cached text; least recently used entries are evicted beyond it.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest, extension):
+        name = f"{digest}.{extension.lstrip('.')}.v{PARSER_VERSION}.txt"
+        return os.path.join(self.cache_dir, digest[:2], name)
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".txt"):
+                    yield os.path.join(root, name)
+
+    def _current_size(self):
+        # Summed from disk once, then kept up to date as entries are added and evicted
+        if self._total_bytes is None:
+            self._total_bytes = sum(os.path.getsize(path) for path in self._entries())
+        return self._total_bytes
+
+    def get(self, digest, extension):
+        """
+        Looks up previously extracted text.
+        :param digest: SHA-256 of the file content.
+        :param extension: File extension (".pdf" or ".docx").
+        :return: The cached text, or None on a miss.
+        """
+        if self.max_bytes <= 0:
+            return None
+        path = self._path(digest, extension)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            # The modification time doubles as the last access time for eviction
+            os.utime(path)
+            self.hits += 1
+            return text
+
+    def put(self, digest, extension, text):
+        """
+        Stores extracted text and evicts the least recently used entries if the cache is too large.
+        :param digest: SHA-256 of the file content.
+        :param extension: File extension (".pdf" or ".docx").
+        :param text: The extracted text.
+        """
+        if self.max_bytes <= 0:
+            return
+        path = self._path(digest, extension)
+        with self._lock:
+            total = self._current_size()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            self._total_bytes = total - previous + os.path.getsize(path)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=os.path.getmtime)
+        for path in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                # Another worker sharing the directory evicted it first
+                continue
+            self._total_bytes -= size
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes": self._current_size(),
+                "max_bytes": self.max_bytes
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """
+    Returns the process-wide parse cache, configured by CV_PARSE_CACHE_DIR and CV_PARSE_CACHE_MAX_MB
+    (0 disables caching).
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ParseCache(
+                cache_dir=os.getenv("CV_PARSE_CACHE_DIR", "./cache/parsed"),
+                max_bytes=int(float(os.getenv("CV_PARSE_CACHE_MAX_MB", "256")) * 1024 * 1024)
+            )
+        return _shared_cache
@@ -0,0 +1,257 @@
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+
+# Words that say nothing about a candidate's skills, left out of the skills overlap
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+each etc for from has have having he her his how i if in including into is it its more most must my
+no not of on one or other our out over own per plus role roles she should so some such than that the
+their them then there these they this those through to under up us using very was we well were what
+when where which while who will with within work working would year years you your
+ability able background candidate candidates company experience experienced field fields good great ideal
+job join least looking new preferred position related required requirements responsibilities responsible
+results skills strong summary team teams wish
+""".split())
+
+
+def split_sections(text, max_chars=400):
+    """
+    Splits a CV or job description into sections of consecutive lines.
+    A blank line, a heading (a short line ending with ':' or in upper case) or reaching max_chars starts a new section.
+    :param text: The text to split.
+    :param max_chars: Largest section length, in characters (a single longer line is kept whole).
+    :return: List of non-empty sections.
+    """
+    sections, current = [], ""
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        is_heading = bool(line) and len(line) < 60 and (line.endswith(":") or line.isupper())
+        if current and (not line or is_heading or len(current) + len(line) + 1 > max_chars):
+            sections.append(current)
+            current = ""
+        if line:
+            current = f"{current} {line}".strip()
+    if current:
+        sections.append(current)
+    return sections
+
+
+def tokenize(text):
+    """
+    Lower-cases text and splits it into words, keeping technical terms such as 'c++', 'node.js' or 'ci-cd'.
+    :param text: The text to tokenize.
+    :return: List of tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class HashingEmbedder:
+    """Bag-of-words vectors built with feature hashing: no model to load, and identical in every process"""
+
+    name = "hashing"
+
+    def __init__(self, dimensions=1024):
+        """
+        Initializes the embedder.
+        :param dimensions: Length of the vectors.
+        """
+        self.dimensions = dimensions
+
+    def embed(self, texts):
+        """
+        Embeds texts.
+        :param texts: List of strings.
+        :return: Array of shape (len(texts), dimensions) with L2-normalized rows.
+        """
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = [token for token in tokenize(text) if token not in STOPWORDS]
+            # Word pairs capture phrases such as 'machine learning' that single words miss
+            features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+            for feature in features:
+                vectors[row, zlib.crc32(feature.encode("utf-8")) % self.dimensions] += 1.0
+        return normalize_rows(vectors)
+
+
+class MiniLMEmbedder:
+    """all-MiniLM-L6-v2 sentence embeddings, run on the CPU with ONNX Runtime (through chromadb, a CrewAI dependency)"""
+
+    name = "minilm"
+
+    def __init__(self):
+        """
+        Loads the model, downloading it the first time.
+        :raises ImportError: If chromadb is not installed.
+        :raises Exception: If the model cannot be downloaded.
+        """
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+        self._model = ONNXMiniLM_L6_V2()
+        # The model is only fetched on the first call, so a missing model fails here rather than mid-analysis
+        self._model(["warm up"])
+
+    def embed(self, texts):
+        """
+        Embeds texts.
+        :param texts: List of strings.
+        :return: Array of shape (len(texts), 384) with L2-normalized rows.
+        """
+        return normalize_rows(np.asarray(self._model(list(texts)), dtype=np.float32))
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+_shared_embedder = None
+_hashing_embedder = HashingEmbedder()
+_loader = None
+_shared_lock = threading.Lock()
+
+
+def _load_minilm():
+    global _shared_embedder
+    try:
+        embedder = MiniLMEmbedder()
+    except Exception as e:
+        logger.warning("Falling back to hashing embeddings, MiniLM is unavailable: %s", e)
+        embedder = _hashing_embedder
+    with _shared_lock:
+        _shared_embedder = embedder
+
+
+def load_embedder_in_background():
+    """
+    Starts loading the embedder selected by CV_PRESCORE_EMBEDDER on a background thread, once per process.
+    Call it at startup, so the MiniLM download and warm-up don't happen during a request.
+    :return: The loading thread, or None if there is nothing left to load.
+    """
+    global _loader, _shared_embedder
+    with _shared_lock:
+        if _shared_embedder is not None or _loader is not None:
+            return None
+        if os.getenv("CV_PRESCORE_EMBEDDER", "minilm") == "hashing":
+            _shared_embedder = _hashing_embedder
+            return None
+        _loader = threading.Thread(target=_load_minilm, name="minilm-loader", daemon=True)
+        _loader.start()
+        return _loader
+
+
+def get_embedder():
+    """
+    Returns the process-wide embedder selected by CV_PRESCORE_EMBEDDER ('minilm' or 'hashing').
+    Never waits for the model: until MiniLM is loaded (or if it cannot be, e.g., no network for the first
+    download), hashing embeddings are returned. The first call starts loading it if startup didn't.
+    """
+    load_embedder_in_background()
+    with _shared_lock:
+        return _shared_embedder if _shared_embedder is not None else _hashing_embedder
+
+
+def skills_overlap(cv_text, jd_text, max_terms=25):
+    """
+    Compares the most frequent terms of the job description with the terms of the CV.
+    :param cv_text: Text of the CV.
+    :param jd_text: Text of the job description.
+    :param max_terms: Number of job description terms compared.
+    :return: (matched terms, missing terms), each ordered by frequency in the job description.
+    """
+    cv_terms = set(tokenize(cv_text))
+    jd_counts = Counter(
+        token for token in tokenize(jd_text)
+        if token not in STOPWORDS and (len(token) > 2 or not token.isalpha())
+    )
+    terms = [term for term, _ in jd_counts.most_common(max_terms)]
+    matched = [term for term in terms if term in cv_terms]
+    missing = [term for term in terms if term not in cv_terms]
+    return matched, missing
+
+
+def prescore_relevance(cv_text, jd_text, embedder=None, top_k=3):
+    """
+    Scores how well a CV matches a job description without calling an LLM.
+    Both texts are split into sections and embedded; the similarity of every job description section with every
+    CV section is computed as one matrix product.
+    :param cv_text: Text of the CV.
+    :param jd_text: Text of the job description.
+    :param embedder: Object with an embed(texts) method returning normalized rows; defaults to get_embedder().
+    :param top_k: Number of best matching (job description, CV) section pairs returned, each with a different CV section.
+    :return: Dictionary with the score (0-100), its 'coverage' and 'skills' components, the top section pairs,
+             and the matched and missing job description terms.
+    """
+    embedder = embedder if embedder is not None else get_embedder()
+    jd_sections = split_sections(jd_text)
+    cv_sections = split_sections(cv_text)
+    matched, missing = skills_overlap(cv_text, jd_text)
+    skills = len(matched) / max(len(matched) + len(missing), 1)
+    if not jd_sections or not cv_sections:
+        return {"score": 0.0, "coverage": 0.0, "skills": round(100 * skills, 1), "pairs": [],
+                "matched_skills": matched, "missing_skills": missing, "embedder": embedder.name}
+
+    vectors = embedder.embed(jd_sections + cv_sections)
+    # Rows are normalized, so the product holds the cosine similarity of every (JD section, CV section) pair
+    similarity = vectors[:len(jd_sections)] @ vectors[len(jd_sections):].T
+    best_cv_section = similarity.argmax(axis=1)
+    best_similarity = similarity.max(axis=1)
+    # How well each requirement is covered by the CV section closest to it, averaged over the requirements
+    coverage = float(np.clip(best_similarity, 0.0, 1.0).mean())
+
+    # Each CV section is sent once, paired with the requirement it matches best
+    pairs, used = [], set()
+    for row in np.argsort(-best_similarity):
+        if len(pairs) == top_k:
+            break
+        if best_cv_section[row] in used:
+            continue
+        used.add(best_cv_section[row])
+        pairs.append({
+            "jd_section": jd_sections[row],
+            "cv_section": cv_sections[best_cv_section[row]],
+            "similarity": round(float(best_similarity[row]), 3)
+        })
+    return {
+        "score": round(100 * (coverage + skills) / 2, 1),
+        "coverage": round(100 * coverage, 1),
+        "skills": round(100 * skills, 1),
+        "pairs": pairs,
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "embedder": embedder.name
+    }
+
+
+def format_prescore(prescore):
+    """
+    Formats a pre-score as markdown for the relevance task and the saved report.
+    :param prescore: Result of prescore_relevance().
+    :return: The markdown text.
+    """
+    lines = [
+        f"Pre-computed relevance score: {prescore['score']}/100 "
+        f"(requirement coverage {prescore['coverage']}, skills overlap {prescore['skills']})",
+        "",
+        "| Job description term | In CV |",
+        "|---|---|"
+    ]
+    lines += [f"| {term} | yes |" for term in prescore["matched_skills"]]
+    lines += [f"| {term} | no |" for term in prescore["missing_skills"]]
+    lines += ["", "Best matching sections of the CV:"]
+    for number, pair in enumerate(prescore["pairs"], start=1):
+        # The job description itself is analyzed by another task, so only the start of the requirement is repeated
+        requirement = pair["jd_section"] if len(pair["jd_section"]) <= 100 else pair["jd_section"][:100] + "..."
+        lines += [
+            "",
+            f"{number}. Similarity {pair['similarity']} with \"{requirement}\"",
+            f"   {pair['cv_section']}"
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,113 @@
+import os
+import threading
+from functools import partial
+import pytest
+from cv_reviewer.app import analyzer
+from cv_reviewer.tools.parse_cache import ParseCache
+from cv_reviewer.tools.relevance import HashingEmbedder, prescore_relevance
+
+# Fake crew recording which crews run, so matching can be tested without LLM calls
+class FakeCrew:
+    runs = []
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, inputs, on_task_complete=None, agent_pool=None):
+        self.inputs = inputs
+        self.on_task_complete = on_task_complete
+        self.task_outputs = {}
+        self.task_timings = {}
+
+    def analysis_crew(self, task_name):
+        self.kind = task_name
+        return self
+
+    def relevance_crew(self):
+        self.kind = "relevance"
+        return self
+
+    def kickoff(self, inputs):
+        with FakeCrew.lock:
+            FakeCrew.runs.append(self.kind)
+            FakeCrew.active += 1
+            FakeCrew.peak = max(FakeCrew.peak, FakeCrew.active)
+        threading.Event().wait(0.05)
+        if self.kind == "relevance":
+            # The job description decides the score the fake LLM gives
+            score = inputs["jd_text"].split("score=")[1].split()[0]
+            self.task_outputs["relevance"] = f"Good fit.\nRelevance score: {score}/100"
+        else:
+            self.on_task_complete(self.kind, f"{self.kind} output")
+        with FakeCrew.lock:
+            FakeCrew.active -= 1
+
+    def release(self):
+        pass
+
+@pytest.fixture
+def fake_crew(monkeypatch, tmp_path):
+    """
+    Replaces the crew, the parse cache and the embedder used by the analyzer with offline versions.
+    :return: The fake crew class.
+    """
+    FakeCrew.runs, FakeCrew.active, FakeCrew.peak = [], 0, 0
+    monkeypatch.setattr(analyzer, "CVReviewCrew", FakeCrew)
+    monkeypatch.setattr(analyzer, "prescore_relevance", partial(prescore_relevance, embedder=HashingEmbedder()))
+    monkeypatch.setattr("cv_reviewer.tools.file_parser.get_parse_cache",
+                        lambda: ParseCache(cache_dir=str(tmp_path / "parsed")))
+    return FakeCrew
+
+# Helper function to construct file paths
+def get_test_file(file_name):
+    """
+    Retrieves the absolute path of a test file located in the 'data' directory.
+    :param file_name: Name of the test file.
+    :return: Absolute path of the test file.
+    """
+    return os.path.join(os.path.dirname(__file__), "data", file_name)
+
+# Test that shared analyses run once and relevance runs per job description
+def test_match_cv_runs_shared_analyses_once(fake_crew, tmp_path):
+    """
+    Tests that structure, language and power run once however many job descriptions there are.
+    """
+    job_descriptions = [f"Python developer score={score}" for score in (40, 90, 65, 10, 75)]
+    analyzer.match_cv(get_test_file("sample_cv.docx"), job_descriptions, output_dir=str(tmp_path / "out"),
+                      max_concurrency=2)
+
+    assert sorted(fake_crew.runs) == sorted(["structure", "language", "power"] + ["relevance"] * 5)
+    assert fake_crew.peak <= 2
+
+# Test the ranking
+def test_match_cv_ranks_by_score(fake_crew, tmp_path):
+    """
+    Tests that job descriptions are ranked by their relevance score and that rankings are streamed as they arrive.
+    """
+    job_descriptions = [
+        {"title": "Data engineer", "text": "Spark pipelines score=55"},
+        {"title": "Backend engineer", "text": "Python APIs score=80"},
+        "Frontend engineer\nReact score=20"
+    ]
+    rankings = []
+
+    def on_task_complete(task_name, output, event="task"):
+        if event == "ranking":
+            rankings.append(output)
+
+    table = analyzer.match_cv(get_test_file("sample_cv.docx"), job_descriptions, output_dir=str(tmp_path),
+                              on_task_complete=on_task_complete)
+
+    assert [len(ranking) for ranking in rankings] == [1, 2, 3]
+    assert [match["title"] for match in rankings[-1]] == ["Backend engineer", "Data engineer", "Frontend engineer"]
+    assert table.splitlines()[2].startswith("| 1 | Backend engineer | 80 |")
+    assert os.path.exists(os.path.join(tmp_path, "relevance_2.md"))
+    assert os.path.exists(os.path.join(tmp_path, "ranking.md"))
+
+# Test that job descriptions are required
+def test_match_cv_requires_job_descriptions(tmp_path):
+    """
+    Tests that matching without job descriptions is rejected.
+    """
+    with pytest.raises(ValueError):
+        analyzer.match_cv(get_test_file("sample_cv.docx"), [], output_dir=str(tmp_path))
@@ -1,4 +1,6 @@
+import json
 import os
+import time
 import pytest
 from fastapi.testclient import TestClient
 from cv_reviewer.app.api import app
@@ -15,6 +17,21 @@ def get_test_file(file_name):
     current_dir = os.path.dirname(__file__)
     return os.path.join(current_dir, "data", file_name)
 
+def wait_for_job(job_id, timeout=900):
+    """
+    Polls a queued analysis until it finishes.
+    :param job_id: The job ID returned by /api/analyze/.
+    :param timeout: Seconds to wait before giving up.
+    :return: The final job status.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/api/jobs/{job_id}").json()
+        if status["status"] in ("done", "error"):
+            return status
+        time.sleep(1)
+    raise TimeoutError(f"Job {job_id} did not finish in {timeout} seconds")
+
 def test_analyze_with_jd():
     """
     Test analyzing a CV with a provided job description.
@@ -28,12 +45,12 @@ def test_analyze_with_jd():
 
         response = client.post("/api/analyze/", files=files, data=data)
 
-    # Verify response status and structure
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
-    json_response = response.json()
+    # Verify the job is queued, then wait for its result
+    assert response.status_code == 202, f"Expected status code 202, got {response.status_code}"
+    json_response = wait_for_job(response.json()["job_id"])
 
-    assert "result" in json_response.keys(), "Response does not contain 'result'."
-    assert json_response["status"] == "success", f"Expected status 'success', got {json_response['status']}"
+    assert json_response["result"], "Job does not contain a 'result'."
+    assert json_response["status"] == "done", f"Expected status 'done', got {json_response['status']}"
 
 def test_analyze_without_jd():
     """
@@ -47,12 +64,12 @@ def test_analyze_without_jd():
 
         response = client.post("/api/analyze/", files=files, data=data)
 
-    # Verify response status and structure
-    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
-    json_response = response.json()
+    # Verify the job is queued, then wait for its result
+    assert response.status_code == 202, f"Expected status code 202, got {response.status_code}"
+    json_response = wait_for_job(response.json()["job_id"])
 
-    assert "result" in json_response.keys(), "Response does not contain 'result'."
-    assert json_response["status"] == "success", f"Expected status 'success', got {json_response['status']}"
+    assert json_response["result"], "Job does not contain a 'result'."
+    assert json_response["status"] == "done", f"Expected status 'done', got {json_response['status']}"
 
 def test_no_cv_uploaded():
     """
@@ -66,12 +83,33 @@ def test_no_cv_uploaded():
     json_response = response.json()
     assert json_response["detail"][0]["msg"] == "Field required"
 
+def test_analyze_rejects_renamed_file():
+    """
+    Test that a file with a .pdf name but other content is rejected before any analysis.
+    """
+    files = {"cv_file": ("cv.pdf", b"just some text", "application/pdf")}
+    response = client.post("/api/analyze/", files=files, data={"job_description": ""})
+    assert response.status_code == 415
+
+@pytest.fixture(scope="module")
+def analyzed_job_id():
+    """
+    Analyzes the sample CV once and returns the job ID of the analysis.
+    :return: The job ID.
+    """
+    with open(get_test_file("sample_cv.pdf"), "rb") as cv_file:
+        response = client.post("/api/analyze/", files={"cv_file": cv_file}, data={"job_description": ""})
+    assert response.status_code == 202, f"Expected status code 202, got {response.status_code}"
+    job_id = response.json()["job_id"]
+    assert wait_for_job(job_id)["status"] == "done"
+    return job_id
+
 @pytest.mark.parametrize("task_name", ["structure", "relevance", "language", "power", "report"])
-def test_download_reports(task_name):
+def test_download_reports(analyzed_job_id, task_name):
     """
     Test downloading the output files for various tasks.
     """
-    response = client.get(f"/api/{task_name}")
+    response = client.get(f"/api/jobs/{analyzed_job_id}/{task_name}")
     
     # Verify the response status and content type
     assert response.status_code == 200, f"Failed to download {task_name}.md"
@@ -80,3 +118,73 @@ def test_download_reports(task_name):
     
     # Verify file content is returned
     assert response.content, f"The content of {task_name}.md is empty"
+
+@pytest.mark.parametrize("job_id", ["0" * 32, "..", "not-a-job"])
+def test_download_unknown_job(job_id):
+    """
+    Test that reports of unknown or malformed job IDs are not found.
+    """
+    response = client.get(f"/api/jobs/{job_id}/report")
+    assert response.status_code == 404
+
+def test_analyze_streams_task_progress(monkeypatch):
+    """
+    Test that a queued analysis reports every task over server-sent events before the final result.
+    """
+    def fake_analyze_cv(cv_filename, job_description, content_hash=None, output_dir=None, on_task_complete=None):
+        for task_name in ["structure", "language", "power", "relevance", "report"]:
+            on_task_complete(task_name, f"{task_name} output")
+        return "full report"
+
+    monkeypatch.setattr("cv_reviewer.app.api.analyze_cv", fake_analyze_cv)
+    with open(get_test_file("sample_cv.pdf"), "rb") as cv_file:
+        response = client.post("/api/analyze/", files={"cv_file": cv_file}, data={"job_description": ""})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    events = []
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as stream:
+        for line in stream.iter_lines():
+            if line.startswith("data: "):
+                events.append(json.loads(line[len("data: "):]))
+
+    tasks = [event["task"] for event in events if "task" in event]
+    assert tasks == ["structure", "language", "power", "relevance", "report"]
+    assert events[-1]["result"] == "full report"
+    assert wait_for_job(job_id)["completed_tasks"] == tasks
+
+def test_match_streams_rankings(monkeypatch):
+    """
+    Test that matching a CV against several job descriptions streams rankings as they arrive.
+    """
+    def fake_match_cv(cv_filename, job_descriptions, content_hash=None, output_dir=None, on_task_complete=None):
+        ranking = []
+        for index, text in enumerate(job_descriptions, start=1):
+            ranking.append({"index": index, "title": text})
+            on_task_complete("ranking", list(ranking), "ranking")
+        return "| Rank | Job |"
+
+    monkeypatch.setattr("cv_reviewer.app.api.match_cv", fake_match_cv)
+    with open(get_test_file("sample_cv.pdf"), "rb") as cv_file:
+        response = client.post("/api/match/", files={"cv_file": cv_file},
+                               data={"job_descriptions": json.dumps(["Backend engineer", "Data engineer"])})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    rankings = []
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as stream:
+        for line in stream.iter_lines():
+            if line.startswith("data: ") and "output" in line:
+                rankings.append(json.loads(line[len("data: "):])["output"])
+
+    assert [len(ranking) for ranking in rankings] == [1, 2]
+    assert wait_for_job(job_id)["ranking"][-1]["title"] == "Data engineer"
+
+@pytest.mark.parametrize("job_descriptions", ["not json", "[]", json.dumps({"text": "one"})])
+def test_match_rejects_invalid_job_descriptions(job_descriptions):
+    """
+    Test that the job descriptions must be a non-empty JSON list.
+    """
+    with open(get_test_file("sample_cv.pdf"), "rb") as cv_file:
+        response = client.post("/api/match/", files={"cv_file": cv_file}, data={"job_descriptions": job_descriptions})
+    assert response.status_code == 400
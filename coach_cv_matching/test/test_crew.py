@@ -1,5 +1,11 @@
 import os
-from cv_reviewer.crew import CVReviewCrew
+import threading
+import time
+from importlib.metadata import version
+import crewai
+import pytest
+from cv_reviewer import crew as crew_module
+from cv_reviewer.crew import AgentPool, CVReviewCrew, load_config
 from cv_reviewer.tools.file_parser import FileParser
 
 def get_test_file(file_name):
@@ -66,6 +72,10 @@ def test_crew_with_jd():
     # Ensure result is not empty
     assert result, "Crew execution with JD did not produce any results."
 
+    # Every task is timed, and the report only starts once the analyses it depends on are done
+    assert set(cv_crew.task_timings) == {"job_description", "structure", "relevance", "language", "power", "report"}
+    assert cv_crew.task_timings["report"]["started"] >= cv_crew.task_timings["relevance"]["finished"]
+
 def test_crew_without_jd():
     """
     Tests the execution of CVReviewCrew without a provided Job Description.
@@ -92,3 +102,85 @@ def test_crew_without_jd():
 
     # Ensure result is not empty
     assert result, "Crew execution without JD did not produce any results."
+
+def test_load_config_cached_until_modified(tmp_path, monkeypatch):
+    """
+    Tests that a config file is parsed once and reloaded only after it changes.
+    """
+    monkeypatch.setattr(crew_module, "CONFIG_DIR", str(tmp_path))
+    config_path = tmp_path / "agents.yaml"
+    config_path.write_text("cv_analyzer:\n  role: first\n", encoding="utf-8")
+
+    first = load_config("agents.yaml")
+    assert load_config("agents.yaml") is first
+
+    config_path.write_text("cv_analyzer:\n  role: second\n", encoding="utf-8")
+    mtime = os.path.getmtime(config_path) + 10
+    os.utime(config_path, (mtime, mtime))
+    assert load_config("agents.yaml")["cv_analyzer"]["role"] == "second"
+
+def test_agent_pool_reuses_agents(monkeypatch):
+    """
+    Tests that released agents are handed to the next crew, and that busy agents are never shared.
+    """
+    monkeypatch.setattr(crew_module, "build_agents", lambda agents_config: {"id": object()})
+    pool = AgentPool(max_idle=1)
+
+    config, first = pool.acquire()
+    _, second = pool.acquire()
+    assert first is not second
+
+    pool.release(config, first)
+    pool.release(config, second)
+    assert pool.acquire()[1] is first
+    assert pool.acquire()[1] is not second
+
+def test_concurrent_tasks_get_their_own_agents():
+    """
+    Tests that the analyses running at the same time never share an agent, and that they come after the
+    synchronous analysis, which CrewAI would otherwise only start once they have finished.
+    """
+    inputs = {"jd_text": "Python developer", "cv_text": "Python developer", "relevance_context": ""}
+    cv_crew = CVReviewCrew(inputs=inputs, agent_pool=AgentPool(max_idle=0))
+    cv_crew.create_tasks()
+
+    choice, *concurrent, report = cv_crew.tasks_list
+    assert not choice.async_execution and not report.async_execution
+    assert all(task.async_execution for task in concurrent)
+    assert len({id(task.agent) for task in concurrent}) == len(concurrent)
+
+@pytest.mark.skipif(not version("crewai").startswith("0."), reason="the crew targets the pinned crewai 0.x")
+def test_analyses_overlap_in_kickoff(monkeypatch):
+    """
+    Tests on the installed CrewAI that the analyses really run at the same time, each on its own agent,
+    and that the recorded timings match when each task actually ran.
+    """
+    delay = 0.3
+    runs = {}
+    lock = threading.Lock()
+
+    def execute_task(agent, task, context=None, tools=None):
+        started = time.perf_counter()
+        time.sleep(delay)
+        with lock:
+            runs[id(task)] = (id(agent), started, time.perf_counter())
+        return "done"
+    monkeypatch.setattr(crewai.Agent, "execute_task", execute_task)
+
+    inputs = {"jd_text": "Python developer", "cv_text": "Python developer", "relevance_context": ""}
+    cv_crew = CVReviewCrew(inputs=inputs, agent_pool=AgentPool(max_idle=0))
+    cv_crew.create_tasks()
+    crew_instance = cv_crew._start_crew(cv_crew.tasks_list)
+    kickoff = time.perf_counter()
+    crew_instance.kickoff(inputs=inputs)
+    elapsed = time.perf_counter() - kickoff
+
+    names = ["job_description", "structure", "language", "power", "relevance", "report"]
+    runs = {name: runs[id(task)] for name, task in zip(names, cv_crew.tasks_list)}
+    concurrent = [runs[name] for name in ("structure", "language", "power", "relevance")]
+    # 3 calls on the critical path: the job description, the analyses together, then the report
+    assert elapsed < 4 * delay
+    assert max(started for _, started, _ in concurrent) < min(finished for _, _, finished in concurrent)
+    assert len({agent for agent, _, _ in concurrent}) == len(concurrent)
+    for name, (_, started, _) in runs.items():
+        assert abs(cv_crew.task_timings[name]["started"] - (started - cv_crew.started_at)) < 0.1
@@ -1,6 +1,7 @@
 import os
 import pytest
 from cv_reviewer.tools.file_parser import FileParser
+from cv_reviewer.tools.parse_cache import ParseCache, content_hash
 
 # Helper function to construct file paths
 def get_test_file(file_name):
@@ -91,3 +92,95 @@ def test_parse_empty_docx():
     parser = FileParser(file_path)
     with pytest.raises(Exception, match="The DOCX file is empty or does not contain readable text."):
         parser.parse()
+
+# Test that a re-uploaded file is served from the parse cache
+def test_parse_cache_hit(tmp_path, monkeypatch):
+    """
+    Tests that parsing the same content twice extracts the text only once.
+    """
+    cache = ParseCache(cache_dir=str(tmp_path))
+    file_path = get_test_file("sample_cv.pdf")
+    first = FileParser(file_path, cache=cache).parse()
+
+    # Any further extraction would fail, so the second parse must come from the cache
+    monkeypatch.setattr("cv_reviewer.tools.file_parser.PdfReader", None)
+    parser = FileParser(file_path, cache=cache)
+    assert parser.parse() == first
+    assert parser.cache_hit
+    assert cache.stats()["hits"] == 1
+
+# Test that the cache key is the file content, not its name
+def test_parse_cache_keyed_by_content(tmp_path):
+    """
+    Tests that a copy of a file under another name is a cache hit.
+    """
+    cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    copy_path = tmp_path / "renamed_cv.docx"
+    with open(get_test_file("sample_cv.docx"), "rb") as f:
+        data = f.read()
+    copy_path.write_bytes(data)
+
+    FileParser(get_test_file("sample_cv.docx"), cache=cache).parse()
+    parser = FileParser(str(copy_path), cache=cache, digest=content_hash(data))
+    parser.parse()
+    assert parser.cache_hit
+
+# Test that failures are not cached
+def test_parse_cache_skips_failures(tmp_path):
+    """
+    Tests that a corrupted file keeps raising instead of being cached.
+    """
+    cache = ParseCache(cache_dir=str(tmp_path))
+    for _ in range(2):
+        with pytest.raises(Exception, match="Failed to parse PDF file"):
+            FileParser(get_test_file("corrupted_file.pdf"), cache=cache).parse()
+    assert cache.stats()["bytes"] == 0
+
+# Test size-bounded eviction
+def test_parse_cache_evicts_least_recently_used(tmp_path):
+    """
+    Tests that the cache stays under its size limit by dropping the oldest entries.
+    """
+    cache = ParseCache(cache_dir=str(tmp_path), max_bytes=250)
+    cache.put("a" * 64, "pdf", "x" * 100)
+    cache.put("b" * 64, "pdf", "y" * 100)
+    old_time = os.path.getmtime(cache._path("a" * 64, "pdf")) - 10
+    os.utime(cache._path("b" * 64, "pdf"), (old_time, old_time))
+    cache.put("c" * 64, "pdf", "z" * 100)
+
+    assert cache.get("a" * 64, "pdf") == "x" * 100
+    assert cache.get("b" * 64, "pdf") is None
+    assert cache.stats()["bytes"] <= 250
+
+# Test that chunks line up with the parsed text
+@pytest.mark.parametrize("file_name", ["sample_cv.pdf", "sample_cv.docx"])
+def test_iter_chunks_offsets(tmp_path, file_name):
+    """
+    Tests that every chunk's offsets point at its text in the output of parse().
+    :param file_name: Name of the test file.
+    """
+    parser = FileParser(get_test_file(file_name), cache=ParseCache(cache_dir=str(tmp_path)))
+    text = parser.parse()
+    chunks = list(parser.iter_chunks())
+
+    assert "".join(chunk.text for chunk in chunks) == text
+    for chunk in chunks:
+        assert text[chunk.start:chunk.end] == chunk.text
+
+# Test the page limit
+def test_parse_pdf_page_limit(tmp_path):
+    """
+    Tests that a PDF with more pages than allowed is rejected before extraction.
+    """
+    parser = FileParser(get_test_file("sample_cv.pdf"), cache=ParseCache(cache_dir=str(tmp_path)), max_pages=0)
+    with pytest.raises(ValueError, match="at most 0 are supported"):
+        parser.parse()
+
+# Test the file size limit
+def test_parse_file_size_limit(tmp_path):
+    """
+    Tests that a file larger than allowed is rejected without being read.
+    """
+    parser = FileParser(get_test_file("sample_cv.docx"), cache=ParseCache(cache_dir=str(tmp_path)), max_bytes=10)
+    with pytest.raises(ValueError, match="maximum size"):
+        parser.parse()
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from cv_reviewer.app.job_queue import JobQueue
+from cv_reviewer.app.job_store import JobStore
+
+# Helper function to collect the events of a job
+def collect_events(queue, job_id, limit=None):
+    """
+    Reads the events of a job until it finishes, leaving out keep-alives.
+    :param queue: The JobQueue.
+    :param job_id: The job ID.
+    :param limit: Stop after this many events (None to read until the job finishes).
+    :return: List of (event name, data) tuples.
+    """
+    async def collect():
+        events = []
+        async for event in queue.events(job_id, keepalive_seconds=0.1, poll_interval=0.01):
+            if event is not None:
+                events.append(event)
+            if limit is not None and len(events) == limit:
+                break
+        return events
+    return asyncio.run(collect())
+
+# Helper function to run a job to completion
+def run_job(queue, job_id, analyze):
+    """
+    Submits a job and collects every event it publishes.
+    :param queue: The JobQueue.
+    :param job_id: The job ID.
+    :param analyze: The analysis function.
+    :return: List of (event name, data) tuples.
+    """
+    queue.submit(job_id, analyze)
+    return collect_events(queue, job_id)
+
+# Test that task progress is published as it happens
+def test_job_publishes_task_progress(tmp_path):
+    """
+    Tests that every completed task is published in order, followed by the result.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    queue = JobQueue(max_workers=1, store=store)
+    job_id = store.create()
+
+    def analyze(on_task_complete):
+        on_task_complete("structure", "structure output")
+        on_task_complete("report", "full report")
+        return "full report"
+
+    events = run_job(queue, job_id, analyze)
+    assert [name for name, _ in events] == ["status", "task", "task", "done"]
+    assert events[1][1] == {"task": "structure", "output": "structure output"}
+    assert queue.status(job_id)["status"] == "done"
+    assert queue.status(job_id)["completed_tasks"] == ["structure", "report"]
+    queue.shutdown()
+
+# Test that failures end the job with an error event
+def test_job_reports_errors(tmp_path):
+    """
+    Tests that an exception in the analysis is reported instead of being lost in the worker.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    queue = JobQueue(max_workers=1, store=store)
+    job_id = store.create()
+
+    def analyze(on_task_complete):
+        raise ValueError("Unsupported file format")
+
+    events = run_job(queue, job_id, analyze)
+    assert events[-1] == ("error", {"job_id": job_id, "message": "Unsupported file format"})
+    assert queue.status(job_id)["message"] == "Unsupported file format"
+    queue.shutdown()
+
+# Test that a late subscriber sees every event
+def test_events_are_replayed(tmp_path):
+    """
+    Tests that a client connecting while the job runs still receives the tasks completed before it connected.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    queue = JobQueue(max_workers=1, store=store)
+    job_id = store.create()
+    structure_done = threading.Event()
+    release = threading.Event()
+
+    def analyze(on_task_complete):
+        on_task_complete("structure", "structure output")
+        structure_done.set()
+        release.wait(5)
+        on_task_complete("report", "full report")
+        return "full report"
+
+    queue.submit(job_id, analyze)
+    structure_done.wait(5)
+    first = collect_events(queue, job_id, limit=2)
+    assert first[0] == ("status", {"status": "running"})
+    assert first[1][1]["task"] == "structure"
+    release.set()
+    remaining = collect_events(queue, job_id)[2:]
+    assert [name for name, _ in remaining] == ["task", "done"]
+    queue.shutdown()
+
+# Test that another worker process can follow a job
+def test_job_is_visible_to_other_workers(tmp_path):
+    """
+    Tests that a queue sharing the job store, like the one of another API worker, reports on a job it didn't run.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    running, other_worker = JobQueue(max_workers=1, store=store), JobQueue(max_workers=1, store=JobStore(str(tmp_path)))
+    job_id = store.create()
+
+    def analyze(on_task_complete):
+        on_task_complete("ranking", [{"index": 1}], "ranking")
+        return "| Rank | Job |"
+
+    running.submit(job_id, analyze)
+    events = collect_events(other_worker, job_id)
+    assert [name for name, _ in events] == ["status", "ranking", "done"]
+    assert other_worker.status(job_id)["ranking"] == [{"index": 1}]
+    assert other_worker.status(job_id)["result"] == "| Rank | Job |"
+    running.shutdown()
+    other_worker.shutdown()
+
+# Test that shutting down ends the unfinished jobs
+def test_shutdown_fails_unfinished_jobs(tmp_path):
+    """
+    Tests that jobs still running or queued when the queue shuts down end with an error event, and that an
+    analysis finishing afterwards doesn't change that.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    queue = JobQueue(max_workers=1, store=store)
+    running_id, queued_id = store.create(), store.create()
+    started = threading.Event()
+    release = threading.Event()
+
+    def analyze(on_task_complete):
+        started.set()
+        release.wait(5)
+        on_task_complete("structure", "structure output")
+        return "full report"
+
+    queue.submit(running_id, analyze)
+    queue.submit(queued_id, analyze)
+    started.wait(5)
+    queue.shutdown()
+    release.set()
+
+    for job_id in (running_id, queued_id):
+        events = collect_events(queue, job_id)
+        assert events[-1] == ("error", {"job_id": job_id, "message": "Service restarted"})
+        assert queue.status(job_id)["status"] == "error"
+    time.sleep(0.1)
+    assert queue.status(running_id)["status"] == "error"
+    assert queue.status(running_id)["completed_tasks"] == []
+
+# Test unknown jobs
+def test_unknown_job(tmp_path):
+    """
+    Tests that unknown jobs have no status and no events.
+    """
+    queue = JobQueue(max_workers=1, store=JobStore(root_dir=str(tmp_path)))
+    assert queue.status("missing") is None
+    assert queue.status("0" * 32) is None
+    assert collect_events(queue, "missing") == []
+    queue.shutdown()
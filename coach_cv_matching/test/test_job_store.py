@@ -0,0 +1,74 @@
+import os
+import time
+import pytest
+from cv_reviewer.app.job_store import JobStore
+
+# Test that every job gets its own output folder
+def test_jobs_are_isolated(tmp_path):
+    """
+    Tests that reports written by one job are not visible to another.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    first, second = store.create(), store.create()
+    assert first != second
+
+    with open(os.path.join(store.output_dir(first), "report.md"), "w", encoding="utf-8") as f:
+        f.write("first report")
+
+    assert store.report_path(first, "report") is not None
+    assert store.report_path(second, "report") is None
+
+# Test that rejected uploads leave nothing behind
+def test_delete_job(tmp_path):
+    """
+    Tests that a deleted job and its folder are gone.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    job_id = store.create()
+    assert store.upload_prefix(job_id) == os.path.join(store.job_dir(job_id), "cv")
+
+    store.delete(job_id)
+    assert not store.exists(job_id)
+
+# Test that malformed IDs and task names are rejected
+@pytest.mark.parametrize("job_id, task_name", [("..", "report"), ("0" * 32, "report"), (None, "report")])
+def test_report_path_rejects_unknown_jobs(tmp_path, job_id, task_name):
+    """
+    Tests that unknown or malformed job IDs don't resolve to a report.
+    :param job_id: The job ID requested.
+    :param task_name: The task name requested.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    assert store.report_path(job_id, task_name) is None
+    with pytest.raises(ValueError):
+        store.job_dir("../outside")
+
+# Test TTL cleanup
+def test_cleanup_removes_expired_jobs(tmp_path):
+    """
+    Tests that jobs older than the TTL are deleted and recent ones are kept.
+    """
+    store = JobStore(root_dir=str(tmp_path), ttl_seconds=60)
+    old_job, new_job = store.create(), store.create()
+    old_time = time.time() - 120
+    os.utime(store.job_dir(old_job), (old_time, old_time))
+
+    assert store.cleanup(force=True) == 1
+    assert not store.exists(old_job)
+    assert store.exists(new_job)
+
+# Test the event log
+def test_event_log_is_read_incrementally(tmp_path):
+    """
+    Tests that each read returns the events appended since the previous one, leaving out a line still being written.
+    """
+    store = JobStore(root_dir=str(tmp_path))
+    job_id = store.create()
+    store.append_event(job_id, "status", {"status": "running"})
+
+    events, offset = store.read_events(job_id)
+    assert events == [("status", {"status": "running"})]
+
+    with open(os.path.join(store.job_dir(job_id), "events.jsonl"), "a", encoding="utf-8") as f:
+        f.write('["task", {"task": "struc')
+    assert store.read_events(job_id, offset) == ([], offset)
@@ -0,0 +1,112 @@
+import os
+import threading
+from cv_reviewer.tools import relevance
+from cv_reviewer.tools.file_parser import FileParser
+from cv_reviewer.tools.parse_cache import ParseCache
+from cv_reviewer.tools.relevance import (
+    HashingEmbedder, format_prescore, prescore_relevance, skills_overlap, split_sections
+)
+
+JD_TEXT = """Backend Engineer
+
+Requirements:
+- 3+ years of Python and FastAPI
+- PostgreSQL and Redis in production
+- Docker and Kubernetes deployments
+
+Nice to have:
+Machine learning pipelines with PyTorch
+"""
+
+# Helper function to load the sample CV
+def get_sample_cv(tmp_path):
+    """
+    Parses the sample CV used by the other tests.
+    :param tmp_path: Folder for the parse cache.
+    :return: Text of the sample CV.
+    """
+    file_path = os.path.join(os.path.dirname(__file__), "data", "sample_cv.docx")
+    return FileParser(file_path, cache=ParseCache(cache_dir=str(tmp_path))).parse()
+
+# Test section splitting
+def test_split_sections_on_headings():
+    """
+    Tests that headings start new sections and that no text is lost.
+    """
+    sections = split_sections(JD_TEXT, max_chars=80)
+    assert sections[0] == "Backend Engineer"
+    assert sections[1].startswith("Requirements:")
+    assert "".join(sections).replace(" ", "") == "".join(JD_TEXT.split())
+
+# Test the skills overlap table
+def test_skills_overlap():
+    """
+    Tests that job description terms are split into those found in the CV and those missing.
+    """
+    matched, missing = skills_overlap("Python developer using FastAPI and Docker", JD_TEXT)
+    assert {"python", "fastapi", "docker"} <= set(matched)
+    assert {"postgresql", "kubernetes"} <= set(missing)
+    assert "and" not in matched + missing
+
+# Test that the score ranks a matching CV above an unrelated one
+def test_prescore_ranks_matching_cv_higher():
+    """
+    Tests that a CV covering the requirements scores higher, with the matching section paired to them.
+    """
+    embedder = HashingEmbedder()
+    matching_cv = "Experience:\nBuilt FastAPI services in Python backed by PostgreSQL and Redis.\n\n" \
+                  "Skills:\nDocker, Kubernetes, PyTorch machine learning pipelines"
+    unrelated_cv = "Experience:\nPastry chef running a bakery kitchen.\n\nSkills:\nBread, cakes, team leadership"
+
+    matching = prescore_relevance(matching_cv, JD_TEXT, embedder=embedder)
+    unrelated = prescore_relevance(unrelated_cv, JD_TEXT, embedder=embedder)
+
+    assert matching["score"] > unrelated["score"]
+    assert 0 <= unrelated["score"] <= matching["score"] <= 100
+    assert any("FastAPI" in pair["cv_section"] for pair in matching["pairs"])
+
+# Test that pre-scoring is deterministic and shrinks the relevance prompt
+def test_prescore_is_deterministic_and_compact(tmp_path):
+    """
+    Tests that the same inputs give the same score and that the relevance context is bounded.
+    """
+    cv_text = get_sample_cv(tmp_path)
+    first = prescore_relevance(cv_text, JD_TEXT, embedder=HashingEmbedder(), top_k=3)
+    second = prescore_relevance(cv_text, JD_TEXT, embedder=HashingEmbedder(), top_k=3)
+
+    assert first == second
+    assert len(first["pairs"]) <= 3
+    assert "| python |" in format_prescore(first) or "python" in first["missing_skills"]
+
+# Test empty inputs
+def test_prescore_empty_text():
+    """
+    Tests that an empty CV scores 0 instead of failing.
+    """
+    prescore = prescore_relevance("", JD_TEXT, embedder=HashingEmbedder())
+    assert prescore["score"] == 0.0
+    assert prescore["pairs"] == []
+
+# Test that the model loads without blocking requests
+def test_embedder_loads_in_background(monkeypatch):
+    """
+    Tests that hashing embeddings are returned at once while MiniLM loads, and MiniLM once it is ready.
+    """
+    release = threading.Event()
+
+    class SlowMiniLM:
+        name = "minilm"
+
+        def __init__(self):
+            release.wait(5)
+
+    monkeypatch.setattr(relevance, "MiniLMEmbedder", SlowMiniLM)
+    monkeypatch.setattr(relevance, "_shared_embedder", None)
+    monkeypatch.setattr(relevance, "_loader", None)
+    monkeypatch.setenv("CV_PRESCORE_EMBEDDER", "minilm")
+
+    loader = relevance.load_embedder_in_background()
+    assert relevance.get_embedder().name == "hashing"
+    release.set()
+    loader.join(5)
+    assert relevance.get_embedder().name == "minilm"
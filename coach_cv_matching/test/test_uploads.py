@@ -0,0 +1,136 @@
+import io
+import os
+import zipfile
+import pytest
+from cv_reviewer.app.uploads import UploadRejected, UploadSizeLimit, check_upload, detect_file_type, save_upload
+from cv_reviewer.tools.parse_cache import content_hash
+
+# Helper function to read a test file
+def read_test_file(file_name):
+    """
+    Reads a test file located in the 'data' directory.
+    :param file_name: Name of the test file.
+    :return: The file content as bytes.
+    """
+    with open(os.path.join(os.path.dirname(__file__), "data", file_name), "rb") as f:
+        return f.read()
+
+# Test file type detection from content
+@pytest.mark.parametrize("file_name, kind", [("sample_cv.pdf", "pdf"), ("sample_cv.docx", "docx")])
+def test_detect_file_type(file_name, kind):
+    """
+    Tests that PDF and DOCX files are recognized by their content.
+    :param file_name: Name of the test file.
+    :param kind: Expected file type.
+    """
+    stream = io.BytesIO(read_test_file(file_name))
+    assert detect_file_type(stream) == kind
+    assert stream.tell() == 0
+
+# Test that content that isn't a CV is rejected whatever its name
+@pytest.mark.parametrize("content", [b"plain text pretending to be a pdf", b"PK\x03\x04 not really a zip"])
+def test_detect_file_type_rejects_other_content(content):
+    """
+    Tests that non-PDF content and zip files that aren't Word documents are rejected.
+    :param content: The uploaded bytes.
+    """
+    with pytest.raises(UploadRejected) as error:
+        detect_file_type(io.BytesIO(content))
+    assert error.value.status_code == 415
+
+def test_detect_file_type_rejects_plain_zip():
+    """
+    Tests that a valid zip archive without a Word document is rejected.
+    """
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, "w") as archive:
+        archive.writestr("notes.txt", "hello")
+    with pytest.raises(UploadRejected):
+        detect_file_type(stream)
+
+# Test the size limit
+def test_check_upload_size_limits():
+    """
+    Tests that uploads over the limit and empty uploads are rejected.
+    """
+    with pytest.raises(UploadRejected) as error:
+        check_upload(io.BytesIO(read_test_file("sample_cv.pdf")), max_bytes=100)
+    assert error.value.status_code == 413
+    with pytest.raises(UploadRejected) as error:
+        check_upload(io.BytesIO(b""))
+    assert error.value.status_code == 400
+
+# Test saving an upload
+def test_save_upload(tmp_path):
+    """
+    Tests that an accepted upload is saved under its detected type with the hash of its content.
+    """
+    data = read_test_file("sample_cv.docx")
+    upload, path = save_upload(io.BytesIO(data), str(tmp_path / "cv"))
+
+    assert path == str(tmp_path / "cv.docx")
+    assert upload.kind == "docx"
+    assert upload.size == len(data)
+    assert upload.sha256 == content_hash(data)
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+# Helper function to build an app behind the upload size limit
+def make_limited_app():
+    """
+    Builds a small app behind UploadSizeLimit whose endpoint reports the size of the upload it received.
+    :return: The FastAPI app.
+    """
+    from fastapi import FastAPI, UploadFile
+
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimit, overhead=1024)
+
+    @app.post("/upload")
+    def upload(cv_file: UploadFile):
+        return {"size": len(cv_file.file.read())}
+
+    return app
+
+# Helper function to send a multipart body without a Content-Length
+def multipart_chunks(size, chunk_size=64 * 1024):
+    """
+    Yields a multipart body carrying a file of `size` bytes in chunks, so it is sent with chunked encoding.
+    :param size: Size of the file.
+    :param chunk_size: Size of every chunk.
+    """
+    yield b'--boundary\r\nContent-Disposition: form-data; name="cv_file"; filename="cv.pdf"\r\n\r\n'
+    for start in range(0, size, chunk_size):
+        yield b"0" * min(chunk_size, size - start)
+    yield b"\r\n--boundary--\r\n"
+
+# Test the size limit on chunked uploads
+def test_size_limit_applies_to_chunked_requests(monkeypatch):
+    """
+    Tests that a chunked body over the limit is cut off with 413 while one under it goes through.
+    """
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("CV_PARSE_MAX_FILE_MB", "1")
+    client = TestClient(make_limited_app())
+    headers = {"Content-Type": "multipart/form-data; boundary=boundary"}
+
+    response = client.post("/upload", content=multipart_chunks(3 * 1024 * 1024), headers=headers)
+    assert response.status_code == 413
+    assert response.json() == {"status": "error", "message": "The upload is too large."}
+
+    response = client.post("/upload", content=multipart_chunks(1000), headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"size": 1000}
+
+# Test the size limit on declared lengths
+def test_size_limit_checks_content_length(monkeypatch):
+    """
+    Tests that a declared Content-Length over the limit is refused before the body is read.
+    """
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("CV_PARSE_MAX_FILE_MB", "1")
+    client = TestClient(make_limited_app())
+    response = client.post("/upload", files={"cv_file": ("cv.pdf", b"0" * (2 * 1024 * 1024), "application/pdf")})
+    assert response.status_code == 413
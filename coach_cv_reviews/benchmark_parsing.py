@@ -0,0 +1,107 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils import file_parser
+from src.utils.parse_pool import ParsePool
+
+# Measure how many CVs per second can be parsed as the number of concurrent requests grows:
+# inline in request threads (as the API used to) versus in the worker process pool
+
+def make_pdf(pages, lines_per_page=45):
+    """
+    Builds a text PDF without any PDF library.
+
+    Args:
+        pages: Number of pages.
+        lines_per_page: Lines of text on every page.
+
+    Returns:
+        The PDF bytes.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        lines = "\n".join(
+            f"(Page {page + 1} line {line + 1}: Built REST APIs in Python and FastAPI, cut latency by 40%.) Tj T*"
+            for line in range(lines_per_page)
+        )
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td\n{lines}\nET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>"
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+def parse_inline(path):
+    """Parses a PDF in the calling thread, as the API used to."""
+    with open(path, "rb") as file_stream:
+        return file_parser.parse_pdf_text(file_stream)
+
+def run(parse, path, documents, concurrency):
+    """
+    Parses `documents` copies of a PDF from `concurrency` threads, like concurrent API requests.
+
+    Returns:
+        Documents parsed per second.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: parse(path), range(documents)))
+    return documents / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CV parsing throughput against concurrency")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per PDF")
+    parser.add_argument("--documents", type=int, default=32, help="Documents parsed per measurement")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Parse pool size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8], help="Concurrent requests")
+    args = parser.parse_args()
+
+    # The API hands the pool the path of the spooled upload, so the benchmark parses from a file too
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf:
+        pdf.write(make_pdf(args.pages))
+    pool = ParsePool(max_workers=args.workers, timeout=60)
+    pool.warm_up()
+    modes = {
+        "inline": parse_inline,
+        "pool": lambda path: pool.parse("pdf", path)
+    }
+    try:
+        # One untimed pass per mode loads the parser modules and lets every worker import them
+        for parse in modes.values():
+            run(parse, pdf.name, args.workers, args.workers)
+
+        print(f"\n=== PARSING THROUGHPUT ({args.pages}-page PDF, {args.workers} pool workers) ===\n")
+        print(f"{'concurrency':>11} | {'inline docs/s':>13} | {'pool docs/s':>11}")
+        for concurrency in args.concurrency:
+            inline = run(modes["inline"], pdf.name, args.documents, concurrency)
+            pooled = run(modes["pool"], pdf.name, args.documents, concurrency)
+            print(f"{concurrency:>11} | {inline:>13.1f} | {pooled:>11.1f}")
+    finally:
+        pool.shutdown()
+        os.unlink(pdf.name)
+
+if __name__ == "__main__":
+    main()
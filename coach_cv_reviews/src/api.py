@@ -1,12 +1,15 @@
 import os
-from io import BytesIO
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Dict
 
-from src.utils import file_parser, agent_helper
+from src.utils import file_parser, agent_helper, uploads
+from src.utils.parse_pool import ParseTimeout, ParseWorkerCrashed, get_parse_pool
+
+# PDFs with more pages are rejected before any text is extracted
+MAX_PDF_PAGES = int(os.getenv("CV_MAX_PDF_PAGES", "50"))
 
 app = FastAPI(
     title="CV Review AI Coach API",
@@ -19,22 +22,39 @@ app.add_middleware(
     allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def start_parse_pool():
+    get_parse_pool().warm_up()
+
+@app.on_event("shutdown")
+def stop_parse_pool():
+    get_parse_pool().shutdown()
+
+# Oversized uploads are refused before (or, for chunked requests, while) their body is received
+app.add_middleware(uploads.UploadSizeLimit)
+
 @app.post("/review-cv")
 def review_cv_endpoint(file: UploadFile = File(...)) -> Dict:
     """
     Accepts a CV file, parses it, runs the analysis crew, and returns a
     structured JSON object conforming to the CVReview Pydantic model.
     """
-    filename = file.filename
-    file_stream = BytesIO(file.file.read())
-    
+    # The upload is already spooled by FastAPI (in memory when small, on disk otherwise); it is validated
+    # in place before anything is read into memory
+    try:
+        upload = uploads.inspect_upload(file.file)
+    except uploads.UploadRejected as e:
+        raise HTTPException(e.status_code, str(e))
+
+    # Text extraction is CPU-bound and a malformed file can hang or crash the parser, so it runs in a
+    # worker process, which opens the upload from disk rather than being sent its bytes
     try:
-        if filename.endswith(".pdf"):
-            content = file_parser.parse_pdf_text(file_stream)
-        elif filename.endswith(".docx"):
-            content = file_parser.parse_docx_text(file_stream)
-        else:
-            raise HTTPException(400, "Unsupported file type. Please upload a .pdf or .docx file.")
+        with uploads.upload_path(file.file) as path:
+            content = get_parse_pool().parse(upload.kind, path, max_pages=MAX_PDF_PAGES)
+    except file_parser.TooManyPagesError as e:
+        raise HTTPException(413, str(e))
+    except (ParseTimeout, ParseWorkerCrashed) as e:
+        raise HTTPException(422, f"The file could not be parsed: {e}")
     except Exception as e:
         raise HTTPException(500, f"Failed to parse file: {e}")
 
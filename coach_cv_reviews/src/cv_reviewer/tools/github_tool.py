@@ -2,19 +2,21 @@ from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
 
+from src.cv_reviewer.tools.repo_analyzer import get_repo_analyzer, parse_repo_url
+
 class GithubRepoToolInput(BaseModel):
-    """Input schema for MyCustomTool."""
+    """Input schema for GithubRepoTool."""
     repo_url: str = Field(..., description="The Github Repository URL to analyze.")
 
 class GithubRepoTool(BaseTool):
     name: str = "GitHub Repository Analysis Tool"
-    description: str = "Analyzes a single GitHub repository URL to assess code quality, documentation, and developer skills. Returns a brief summary."
+    description: str = ("Analyzes a single GitHub repository URL and returns its metrics: language breakdown, "
+                        "lines of code, commit cadence, tests and README quality.")
 
     args_schema: Type[BaseModel] = GithubRepoToolInput
 
     def _run(self, repo_url: str) -> str:
-        if not repo_url or "github.com" not in repo_url:
+        if not repo_url or parse_repo_url(repo_url) is None:
             return "Invalid or missing GitHub URL provided."
-        return (f"Mock analysis for the repository at {repo_url}: "
-                "The project appears to be well-structured with a clear README file. "
-                "Contributions seem consistent, suggesting good developer habits.")
\ No newline at end of file
+        # Served from the clone cache when the repository was already analyzed for this CV
+        return get_repo_analyzer().summarize(repo_url)
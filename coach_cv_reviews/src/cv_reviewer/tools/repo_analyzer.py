@@ -0,0 +1,558 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+REPO_URL_PATTERN = re.compile(r"^https?://(?:www\.)?github\.com/([A-Za-z0-9_-]+)/([A-Za-z0-9_.-]+?)(?:\.git)?/?$")
+
+# Bump when the metrics change, so analyses computed by the old code are not reused
+ANALYZER_VERSION = "1"
+
+# Files above this size are counted as present but not read (generated code, data dumps, bundles); clones
+# don't download them at all
+MAX_BLOB_BYTES = 1024 * 1024
+
+# Code read per analysis; files past this are counted as present but left out of the lines of code
+MAX_TOTAL_BLOB_BYTES = 64 * 1024 * 1024
+
+LANGUAGES = {
+    ".py": "Python", ".ipynb": "Jupyter Notebook", ".js": "JavaScript", ".jsx": "JavaScript", ".mjs": "JavaScript",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".java": "Java", ".kt": "Kotlin", ".scala": "Scala",
+    ".go": "Go", ".rs": "Rust", ".c": "C", ".h": "C", ".cpp": "C++", ".cc": "C++", ".hpp": "C++",
+    ".cs": "C#", ".rb": "Ruby", ".php": "PHP", ".swift": "Swift", ".m": "Objective-C", ".dart": "Dart",
+    ".r": "R", ".jl": "Julia", ".lua": "Lua", ".sh": "Shell", ".sql": "SQL", ".html": "HTML",
+    ".css": "CSS", ".scss": "CSS", ".vue": "Vue", ".svelte": "Svelte",
+}
+
+TEST_PATH_PATTERN = re.compile(
+    r"(^|/)(tests?|__tests__|spec)/"
+    r"|(^|/)test_[^/]+\.py$|_test\.(py|go)$"
+    r"|\.(test|spec)\.(js|jsx|ts|tsx)$"
+    r"|(Test|Tests)\.(java|kt|cs)$"
+)
+
+
+class RepoAnalysisError(Exception):
+    """Raised when a repository cannot be fetched or read (private, deleted, unreachable, timed out)."""
+
+
+def parse_repo_url(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Extracts the owner and repository name from a GitHub repository URL.
+
+    Args:
+        url: A URL such as https://github.com/owner/repo or https://github.com/owner/repo.git.
+
+    Returns:
+        (owner, name), or None if the URL does not point at a repository.
+    """
+    match = REPO_URL_PATTERN.match((url or "").strip())
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def _git_env() -> Dict[str, str]:
+    # Never prompt for credentials: a private or missing repository must fail, not hang the worker
+    return dict(os.environ, GIT_TERMINAL_PROMPT="0", GIT_ASKPASS="true")
+
+
+def _git(args: List[str], timeout: float, cwd: Optional[str] = None) -> str:
+    try:
+        result = subprocess.run(
+            ["git", *args], cwd=cwd, env=_git_env(), capture_output=True, timeout=timeout, check=True
+        )
+    except subprocess.TimeoutExpired:
+        raise RepoAnalysisError(f"git {args[0]} timed out after {timeout:g} seconds.")
+    except subprocess.CalledProcessError as e:
+        raise RepoAnalysisError(e.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} failed.")
+    except OSError as e:
+        # No git binary, or the clone directory vanished
+        raise RepoAnalysisError(f"git could not be run: {e}")
+    return result.stdout.decode("utf-8", "replace")
+
+
+class GitFetchBackend:
+    """
+    Fetches repositories from GitHub with the git command line.
+
+    Subclasses change where a repository is fetched from by overriding remote_url(), e.g., to serve
+    local fixture repositories in tests.
+    """
+
+    def __init__(self, timeout: float = 60.0):
+        """
+        Args:
+            timeout: Seconds a single git command may take.
+        """
+        self.timeout = timeout
+
+    def remote_url(self, owner: str, name: str) -> str:
+        return f"https://github.com/{owner}/{name}.git"
+
+    def head_sha(self, owner: str, name: str) -> str:
+        """
+        Looks up the commit the default branch points at, without downloading anything else.
+        """
+        output = _git(["ls-remote", self.remote_url(owner, name), "HEAD"], self.timeout)
+        if not output.strip():
+            raise RepoAnalysisError(f"The repository {owner}/{name} is empty.")
+        return output.split()[0]
+
+    def clone(self, owner: str, name: str, path: str) -> None:
+        """
+        Creates a bare clone of the default branch at path, without the files over MAX_BLOB_BYTES.
+        """
+        # A partial clone: large blobs are never read, so they are not downloaded either (later fetches
+        # keep the same filter)
+        _git(["clone", "--bare", "--single-branch", "--quiet", f"--filter=blob:limit={MAX_BLOB_BYTES}",
+              self.remote_url(owner, name), path], self.timeout)
+
+    def update(self, path: str) -> None:
+        """
+        Brings an existing bare clone up to date with its remote.
+        """
+        # Analyses address commits by SHA, so fetching the remote HEAD's objects is enough
+        _git(["fetch", "--quiet", "origin", "HEAD"], self.timeout, cwd=path)
+
+
+class LocalFetchBackend(GitFetchBackend):
+    """Fetches repositories from <root>/<owner>/<name>, a directory of local git repositories."""
+
+    def __init__(self, root: str, timeout: float = 60.0):
+        super().__init__(timeout)
+        self.root = root
+
+    def remote_url(self, owner: str, name: str) -> str:
+        return os.path.join(self.root, owner, name)
+
+
+def language_breakdown(line_counts: Dict[str, int]) -> Dict[str, float]:
+    """
+    Turns lines of code per language into shares.
+
+    Returns:
+        Percentage of the lines of code per language, largest first.
+    """
+    total = sum(line_counts.values())
+    if not total:
+        return {}
+    return {language: round(100 * lines / total, 1) for language, lines in Counter(line_counts).most_common()}
+
+
+def commit_cadence(timestamps: List[int], now: Optional[float] = None) -> Dict:
+    """
+    Summarizes how regularly a repository receives commits.
+
+    Args:
+        timestamps: Commit times (Unix seconds) of the default branch.
+        now: Reference time for the recent activity counts; defaults to the current time.
+
+    Returns:
+        Dictionary with the number of commits, first and last commit dates, the weeks with at least one
+        commit, the average commits per active week, and the commits of the last 90 days.
+    """
+    if not timestamps:
+        return {"commits": 0, "first_commit": None, "last_commit": None, "active_weeks": 0,
+                "span_weeks": 0, "commits_per_active_week": 0.0, "commits_last_90_days": 0}
+    now = time.time() if now is None else now
+    weeks = {int(timestamp // (7 * 24 * 3600)) for timestamp in timestamps}
+    return {
+        "commits": len(timestamps),
+        "first_commit": time.strftime("%Y-%m-%d", time.gmtime(min(timestamps))),
+        "last_commit": time.strftime("%Y-%m-%d", time.gmtime(max(timestamps))),
+        "active_weeks": len(weeks),
+        "span_weeks": max(weeks) - min(weeks) + 1,
+        "commits_per_active_week": round(len(timestamps) / len(weeks), 1),
+        "commits_last_90_days": sum(1 for timestamp in timestamps if now - timestamp <= 90 * 24 * 3600),
+    }
+
+
+def readme_quality(text: Optional[str]) -> Dict:
+    """
+    Scores a README out of 5, one point each for: a substantial length, section headings, installation or
+    setup instructions, usage examples or code blocks, and links or badges.
+
+    Returns:
+        Dictionary with the score, the criteria met and the README length in words.
+    """
+    if not text:
+        return {"score": 0, "criteria": [], "words": 0}
+    lowered = text.lower()
+    checks = {
+        "substantial (150+ words)": len(text.split()) >= 150,
+        "section headings": len(re.findall(r"^#{1,6} |^=+$|^-+$", text, re.MULTILINE)) >= 2,
+        "installation or setup": bool(re.search(r"install|setup|getting started|requirements", lowered)),
+        "usage or code examples": "```" in text or bool(re.search(r"usage|example", lowered)),
+        "links or badges": bool(re.search(r"\]\(https?://|!\[", text)),
+    }
+    criteria = [name for name, met in checks.items() if met]
+    return {"score": len(criteria), "criteria": criteria, "words": len(text.split())}
+
+
+def analyze_bare_repo(path: str, sha: str, timeout: float = 60.0) -> Dict:
+    """
+    Computes the metrics of a repository at a commit, straight from a bare clone (nothing is checked out).
+
+    Args:
+        path: Path of the bare clone.
+        sha: The commit to analyze.
+        timeout: Seconds a single git command may take.
+
+    Returns:
+        Dictionary with the files, lines of code and language breakdown, commit cadence, test files and
+        README quality of the repository.
+    """
+    # Sizes come from the objects in the clone: asking for those of blobs left out of a partial clone
+    # (`ls-tree -l`, `cat-file --batch-check`) would download them. A missing blob is over MAX_BLOB_BYTES
+    sizes = {}
+    for line in _git(["cat-file", "--batch-all-objects", "--unordered", "--batch-check"], timeout, cwd=path).splitlines():
+        object_sha, kind, size = line.split()[:3]
+        if kind == "blob":
+            sizes[object_sha] = int(size)
+
+    entries = []
+    for line in _git(["ls-tree", "-r", "-z", sha], timeout, cwd=path).split("\0"):
+        if not line:
+            continue
+        meta, file_path = line.split("\t", 1)
+        _, kind, object_sha = meta.split()
+        if kind == "blob":
+            entries.append((file_path, object_sha, sizes.get(object_sha, MAX_BLOB_BYTES + 1)))
+
+    code = [(file_path, object_sha) for file_path, object_sha, size in entries
+            if os.path.splitext(file_path)[1].lower() in LANGUAGES and size <= MAX_BLOB_BYTES]
+    readme = next((entry for entry in entries if "/" not in entry[0] and entry[0].lower().startswith("readme")), None)
+
+    # All blobs are read in one git process rather than one per file, the README first so the byte cap
+    # never leaves it out
+    wanted = ([readme[1]] if readme and readme[2] <= MAX_BLOB_BYTES else []) + [object_sha for _, object_sha in code]
+    contents = _read_blobs(path, wanted, timeout)
+
+    line_counts = Counter()
+    for file_path, object_sha in code:
+        data = contents.get(object_sha, b"")
+        if b"\0" in data[:8000]:
+            continue
+        line_counts[LANGUAGES[os.path.splitext(file_path)[1].lower()]] += sum(
+            1 for line in data.splitlines() if line.strip()
+        )
+
+    timestamps = [int(value) for value in _git(["log", "--format=%ct", sha], timeout, cwd=path).split()]
+    test_files = [file_path for file_path, _, _ in entries if TEST_PATH_PATTERN.search(file_path)]
+    readme_text = contents.get(readme[1], b"").decode("utf-8", "replace") if readme else None
+    return {
+        "head_sha": sha,
+        "files": len(entries),
+        "lines_of_code": sum(line_counts.values()),
+        "languages": language_breakdown(line_counts),
+        "cadence": commit_cadence(timestamps),
+        "test_files": len(test_files),
+        "readme": readme_quality(readme_text),
+    }
+
+
+def _read_blobs(path: str, shas: List[str], timeout: float,
+                max_total_bytes: int = MAX_TOTAL_BLOB_BYTES) -> Dict[str, bytes]:
+    """
+    Reads blobs with one `git cat-file --batch`, streaming its output and stopping after max_total_bytes.
+
+    Returns:
+        The content of every blob read, by SHA; blobs past the byte cap are left out.
+    """
+    if not shas:
+        return {}
+    try:
+        process = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=path, env=_git_env(),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except OSError as e:
+        raise RepoAnalysisError(f"git could not be run: {e}")
+
+    # The SHAs are written from another thread, so git never blocks on a full output pipe while we write
+    def write_shas():
+        try:
+            process.stdin.write("\n".join(shas).encode() + b"\n")
+            process.stdin.close()
+        except OSError:
+            # git was stopped before reading everything
+            pass
+
+    timed_out = threading.Event()
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    writer = threading.Thread(target=write_shas, daemon=True)
+    timer = threading.Timer(timeout, kill)
+    writer.start()
+    timer.start()
+    blobs, total = {}, 0
+    try:
+        # Each object comes as "<sha> <type> <size>\n<content>\n", or "<sha> missing\n"
+        for _ in shas:
+            header = process.stdout.readline().split()
+            if not header:
+                break
+            if len(header) < 3:
+                continue
+            size = int(header[2])
+            if total + size > max_total_bytes:
+                break
+            content = process.stdout.read(size)
+            process.stdout.read(1)
+            if len(content) < size:
+                break
+            blobs[header[0].decode()] = content
+            total += size
+    finally:
+        timer.cancel()
+        process.kill()
+        process.wait()
+        writer.join()
+        process.stdout.close()
+    if timed_out.is_set():
+        raise RepoAnalysisError(f"git cat-file timed out after {timeout:g} seconds.")
+    return blobs
+
+
+def format_summary(url: str, analysis: Dict) -> str:
+    """
+    Formats the analysis of one repository as a short Markdown summary for the crew.
+    """
+    cadence, readme = analysis["cadence"], analysis["readme"]
+    languages = ", ".join(f"{language} {share}%" for language, share in list(analysis["languages"].items())[:5]) or "no source code found"
+    return "\n".join([
+        f"### {url}",
+        f"- Languages (by lines of code): {languages}",
+        f"- Size: {analysis['lines_of_code']} lines of code in {analysis['files']} files",
+        f"- Commits: {cadence['commits']} between {cadence['first_commit']} and {cadence['last_commit']}, "
+        f"active in {cadence['active_weeks']} of {cadence['span_weeks']} weeks "
+        f"({cadence['commits_per_active_week']} commits per active week), "
+        f"{cadence['commits_last_90_days']} in the last 90 days",
+        f"- Tests: {analysis['test_files']} test files" if analysis["test_files"] else "- Tests: none found",
+        f"- README: {readme['score']}/5" + (f" ({', '.join(readme['criteria'])})" if readme["criteria"] else " (missing or minimal)"),
+    ])
+
+
+class RepoAnalyzer:
+    """
+    Analyzes GitHub repositories from a local cache of bare clones.
+
+    Analyses are stored per repository and HEAD commit, so a repository that has not changed since it was
+    last seen costs a single `git ls-remote`; a changed one is fetched incrementally into its existing clone.
+    Only the analysis of the latest commit is kept, and the least recently used repositories are dropped
+    from the cache once it holds more than max_repos of them.
+    """
+
+    def __init__(self, cache_dir: str = "./cache/repos", backend: Optional[GitFetchBackend] = None,
+                 max_workers: int = 4, max_repos: int = 200):
+        """
+        Args:
+            cache_dir: Directory holding the bare clones and the stored analyses.
+            backend: Where repositories are fetched from; defaults to GitHub.
+            max_workers: Number of repositories analyzed at the same time.
+            max_repos: Number of repositories kept in the cache.
+        """
+        self.cache_dir = cache_dir
+        self.backend = backend if backend is not None else GitFetchBackend()
+        self.max_workers = max_workers
+        self.max_repos = max_repos
+        # Lock of every repository being analyzed, with the number of threads using it; dropped when unused
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    @contextmanager
+    def _lock(self, key: str) -> Iterator[None]:
+        with self._locks_lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    def _analysis_path(self, key: str, sha: str) -> str:
+        return os.path.join(self.cache_dir, "analyses", key, f"{sha}.v{ANALYZER_VERSION}.json")
+
+    def _clone_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "clones", f"{key}.git")
+
+    def _read_analysis(self, path: str) -> Optional[Dict]:
+        """
+        Loads a stored analysis, or returns None if there is none; a corrupt one is removed.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            raise RepoAnalysisError(f"The cached analysis could not be read: {e}")
+
+    def _touch(self, key: str) -> None:
+        """Marks a repository as recently used; the clone's modification time orders evictions."""
+        try:
+            os.utime(self._clone_path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used clones, and their analyses, beyond max_repos.
+        """
+        clones_dir = os.path.join(self.cache_dir, "clones")
+        try:
+            names = [name for name in os.listdir(clones_dir) if name.endswith(".git")]
+        except OSError:
+            return
+        clones = []
+        for name in names:
+            try:
+                clones.append((os.path.getmtime(os.path.join(clones_dir, name)), name[:-len(".git")]))
+            except OSError:
+                continue
+        clones.sort()
+        for _, key in clones[:max(len(clones) - self.max_repos, 0)]:
+            with self._locks_lock:
+                # A repository being analyzed is kept; it is recent anyway
+                if key in self._locks:
+                    continue
+                shutil.rmtree(self._clone_path(key), ignore_errors=True)
+                shutil.rmtree(os.path.join(self.cache_dir, "analyses", key), ignore_errors=True)
+
+    def _store_analysis(self, key: str, analysis_path: str, analysis: Dict) -> None:
+        os.makedirs(os.path.dirname(analysis_path), exist_ok=True)
+        tmp_path = f"{analysis_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(analysis, f)
+        os.replace(tmp_path, analysis_path)
+        # The analyses of older commits will not be asked for again
+        for name in os.listdir(os.path.dirname(analysis_path)):
+            if name != os.path.basename(analysis_path) and name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(os.path.dirname(analysis_path), name))
+                except OSError:
+                    pass
+
+    def _sync_clone(self, owner: str, name: str, path: str) -> None:
+        if os.path.isdir(path):
+            self.backend.update(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Cloned next to its final place and renamed, so an interrupted clone is never mistaken for a cached one
+        tmp_path = tempfile.mkdtemp(prefix=f"{os.path.basename(path)}.", dir=os.path.dirname(path))
+        try:
+            self.backend.clone(owner, name, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process finished the same clone first
+            if not os.path.isdir(path):
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def analyze(self, url: str) -> Dict:
+        """
+        Returns the metrics of a repository, computing them only if its HEAD commit has not been analyzed yet.
+
+        Args:
+            url: The GitHub repository URL.
+
+        Returns:
+            The analysis (see analyze_bare_repo()).
+
+        Raises:
+            RepoAnalysisError: If the URL is not a repository, the repository cannot be fetched or read, or the
+                cache cannot be used.
+        """
+        parsed = parse_repo_url(url)
+        if parsed is None:
+            raise RepoAnalysisError(f"{url} is not a GitHub repository URL.")
+        owner, name = parsed
+        key = f"{owner.lower()}__{name.lower()}"
+
+        sha = self.backend.head_sha(owner, name)
+        analysis_path = self._analysis_path(key, sha)
+        analysis = self._read_analysis(analysis_path)
+        if analysis is not None:
+            self._touch(key)
+            return analysis
+
+        try:
+            with self._lock(key):
+                analysis = self._read_analysis(analysis_path)
+                if analysis is not None:
+                    return analysis
+                clone_path = self._clone_path(key)
+                self._sync_clone(owner, name, clone_path)
+                self._touch(key)
+                analysis = analyze_bare_repo(clone_path, sha, self.backend.timeout)
+                self._store_analysis(key, analysis_path, analysis)
+        except OSError as e:
+            # e.g., a full disk or an unwritable cache directory
+            raise RepoAnalysisError(f"The repository cache could not be used: {e}")
+        self._evict()
+        return analysis
+
+    def summarize(self, url: str) -> str:
+        """
+        Returns the Markdown summary of a repository, or a one-line note if it cannot be analyzed.
+        """
+        try:
+            return format_summary(url, self.analyze(url))
+        except RepoAnalysisError as e:
+            return f"### {url}\n- Could not be analyzed: {e}"
+
+    def summarize_all(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Summarizes several repositories concurrently.
+
+        Args:
+            urls: GitHub repository URLs, e.g., from file_parser.find_github_urls().
+
+        Returns:
+            The summary of every URL, in the order given.
+        """
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self.summarize, urls)))
+
+
+_shared_analyzer = None
+_shared_lock = threading.Lock()
+
+def get_repo_analyzer() -> RepoAnalyzer:
+    """
+    Returns the process-wide repository analyzer, configured by CV_REPO_CACHE_DIR (default ./cache/repos),
+    CV_REPO_CACHE_MAX_REPOS (default 200), CV_REPO_WORKERS (default 4) and CV_REPO_GIT_TIMEOUT_SECONDS
+    (default 60).
+    """
+    global _shared_analyzer
+    with _shared_lock:
+        if _shared_analyzer is None:
+            _shared_analyzer = RepoAnalyzer(
+                cache_dir=os.getenv("CV_REPO_CACHE_DIR", "./cache/repos"),
+                backend=GitFetchBackend(timeout=float(os.getenv("CV_REPO_GIT_TIMEOUT_SECONDS", "60"))),
+                max_workers=int(os.getenv("CV_REPO_WORKERS", "4")),
+                max_repos=int(os.getenv("CV_REPO_CACHE_MAX_REPOS", "200"))
+            )
+        return _shared_analyzer
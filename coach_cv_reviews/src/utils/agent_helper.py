@@ -1,5 +1,6 @@
 from typing import List
 from src.cv_reviewer.crew import CvReviewAiCrew
+from src.cv_reviewer.tools.repo_analyzer import get_repo_analyzer
 
 def run_cv_review_crew(cv_text: str, github_urls: List[str]) -> str:
     """
@@ -15,9 +16,17 @@ def run_cv_review_crew(cv_text: str, github_urls: List[str]) -> str:
     Raises:
         Exception: If the crew fails to execute.
     """
+    # The repositories are analyzed up front and concurrently, so the agent reads their summaries
+    # instead of calling its tool once per URL. The review goes on without them if the analysis fails
+    try:
+        repo_summaries = get_repo_analyzer().summarize_all(github_urls)
+    except Exception as e:
+        print(f"Error during repository analysis: {e}")
+        repo_summaries = {url: f"### {url}\n- Could not be analyzed: {e}" for url in github_urls}
     inputs = {
         "cv_text": cv_text,
-        "github_urls": github_urls
+        "github_urls": github_urls,
+        "repo_summaries": "\n\n".join(repo_summaries.values()) or "No GitHub repositories were provided."
     }
 
     try:
@@ -1,11 +1,14 @@
 import re
-from typing import List, IO
+from typing import List, IO, Optional
 from io import BytesIO
 
 # File parsing libraries
 import docx
 import pypdf 
 
+class TooManyPagesError(ValueError):
+    """Raised when a PDF has more pages than the caller accepts."""
+
 def parse_docx_text(file_stream: IO[bytes]) -> str:
     """
     Parses text content from a .docx file stream.
@@ -13,12 +16,15 @@ def parse_docx_text(file_stream: IO[bytes]) -> str:
     document = docx.Document(file_stream)
     return "\n".join([para.text for para in document.paragraphs])
 
-def parse_pdf_text(file_stream: IO[bytes]) -> str:
+def parse_pdf_text(file_stream: IO[bytes], max_pages: Optional[int] = None) -> str:
     """
     Parses text content from a .pdf file stream.
+    Raises TooManyPagesError, before extracting anything, if the PDF has more than max_pages pages.
     """
     # Use the full namespace for the class
     pdf_reader = pypdf.PdfReader(file_stream)
+    if max_pages is not None and len(pdf_reader.pages) > max_pages:
+        raise TooManyPagesError(f"The PDF has {len(pdf_reader.pages)} pages; at most {max_pages} are supported.")
     return "\n".join([page.extract_text() for page in pdf_reader.pages])
 
 def find_github_urls(text: str) -> List[str]:
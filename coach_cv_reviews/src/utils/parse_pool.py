@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Optional
+
+from src.utils import file_parser
+
+
+class ParseTimeout(Exception):
+    """Raised when a document takes longer than the pool timeout to parse; its worker is killed."""
+
+class ParseWorkerCrashed(Exception):
+    """Raised when a worker process dies while parsing a document (e.g., a segfault in a parser)."""
+
+
+def _parse(kind: str, path: str, max_pages: Optional[int]) -> str:
+    with open(path, "rb") as file_stream:
+        if kind == "pdf":
+            return file_parser.parse_pdf_text(file_stream, max_pages=max_pages)
+        if kind == "docx":
+            return file_parser.parse_docx_text(file_stream)
+    raise ValueError(f"Unsupported file type '{kind}'.")
+
+def _worker_main(conn) -> None:
+    """
+    Runs in a worker process: parses the documents sent over the pipe, one at a time, until the pipe closes.
+    """
+    while True:
+        try:
+            kind, path, max_pages = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            conn.send(("ok", _parse(kind, path, max_pages)))
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                # The exception itself could not be pickled; its message still can
+                conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """One parser process and the pipe used to talk to it."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ParsePool:
+    """
+    Parses CVs in separate processes, so text extraction neither holds the API's GIL nor can take the API down.
+
+    Each document goes to one worker process. A worker that exceeds the timeout is killed, and one that dies
+    (e.g., a parser crash on a malformed file) only fails its own document; both are replaced by a fresh
+    process for the next document, while other documents keep being parsed by the other workers.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 30.0, start_method: str = "spawn"):
+        """
+        Args:
+            max_workers: Number of documents parsed at the same time; further requests wait for a free worker.
+            timeout: Seconds a single document may take to parse.
+            start_method: multiprocessing start method; "spawn" keeps workers independent of the API's threads.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._closed = False
+
+    def _checkout(self) -> _Worker:
+        try:
+            worker = self._idle.get_nowait()
+            if worker.alive():
+                return worker
+            self._discard(worker)
+        except queue.Empty:
+            pass
+        worker = _Worker(self._context)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _discard(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def parse(self, kind: str, path: str, max_pages: Optional[int] = None) -> str:
+        """
+        Extracts the text of a document in a worker process.
+
+        Only the path crosses the pipe; the worker opens and reads the file itself.
+
+        Args:
+            kind: "pdf" or "docx", as detected by uploads.inspect_upload().
+            path: Path of the document on disk, e.g. from uploads.upload_path().
+            max_pages: Largest accepted number of PDF pages (None for no limit).
+
+        Returns:
+            The extracted text.
+
+        Raises:
+            ParseTimeout: If parsing took longer than the pool timeout.
+            ParseWorkerCrashed: If the worker process died while parsing.
+            Exception: Whatever the parser raised for the document (e.g., file_parser.TooManyPagesError).
+        """
+        if self._closed:
+            raise RuntimeError("The parse pool is shut down.")
+        with self._slots:
+            worker = self._checkout()
+            try:
+                worker.conn.send((kind, path, max_pages))
+                if not worker.conn.poll(self.timeout):
+                    self._discard(worker)
+                    raise ParseTimeout(f"Parsing the file took longer than {self.timeout:g} seconds.")
+                status, result = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(timeout=1)
+                exit_code = worker.process.exitcode
+                self._discard(worker)
+                raise ParseWorkerCrashed(f"The parser process exited unexpectedly (exit code {exit_code}).")
+            self._idle.put(worker)
+        if status == "error":
+            raise result
+        return result
+
+    def warm_up(self) -> None:
+        """Starts every worker up front, so the first requests do not pay for process start-up and imports."""
+        with self._lock:
+            missing = self.max_workers - len(self._workers)
+        for _ in range(missing):
+            worker = _Worker(self._context)
+            with self._lock:
+                self._workers.add(worker)
+            self._idle.put(worker)
+
+    def shutdown(self) -> None:
+        """Stops every worker process."""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, set()
+        for worker in workers:
+            worker.kill()
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+def get_parse_pool() -> ParsePool:
+    """
+    Returns the process-wide parse pool, sized by CV_PARSE_WORKERS (default 2) with a per-document
+    timeout of CV_PARSE_TIMEOUT_SECONDS (default 30).
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = ParsePool(
+                max_workers=int(os.getenv("CV_PARSE_WORKERS", "2")),
+                timeout=float(os.getenv("CV_PARSE_TIMEOUT_SECONDS", "30"))
+            )
+        return _shared_pool
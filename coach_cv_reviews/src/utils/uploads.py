@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from typing import IO, Iterator, NamedTuple
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class UploadRejected(Exception):
+    """
+    Raised for an upload that is refused before parsing; carries the HTTP status to answer with.
+    """
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadInfo(NamedTuple):
+    kind: str
+    size: int
+
+
+def max_upload_bytes() -> int:
+    """
+    Returns the largest accepted upload in bytes, from CV_MAX_UPLOAD_MB (default 10).
+    """
+    return int(float(os.getenv("CV_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+
+
+def detect_file_type(file_stream: IO[bytes]) -> str:
+    """
+    Identifies a CV from its magic bytes rather than its filename.
+
+    Args:
+        file_stream: A seekable binary stream, left at its start.
+
+    Returns:
+        "pdf" or "docx".
+
+    Raises:
+        UploadRejected: If the content is neither a PDF nor a Word document.
+    """
+    file_stream.seek(0)
+    header = file_stream.read(len(PDF_MAGIC))
+    file_stream.seek(0)
+    if header.startswith(PDF_MAGIC):
+        return "pdf"
+    if header.startswith(ZIP_MAGIC):
+        # Every zip archive starts like a DOCX; reading the central directory tells them apart
+        try:
+            with zipfile.ZipFile(file_stream) as archive:
+                is_docx = "word/document.xml" in archive.namelist()
+        except zipfile.BadZipFile:
+            is_docx = False
+        finally:
+            file_stream.seek(0)
+        if is_docx:
+            return "docx"
+    raise UploadRejected("Unsupported file type. Please upload a .pdf or .docx file.", 415)
+
+
+def inspect_upload(file_stream: IO[bytes], max_bytes: int = None) -> UploadInfo:
+    """
+    Validates an upload in place, so the parsers can read the same stream without a copy.
+
+    Args:
+        file_stream: The seekable upload stream (FastAPI's UploadFile.file, already spooled to disk when large).
+        max_bytes: The largest accepted size; defaults to max_upload_bytes().
+
+    Returns:
+        The detected file type and size; the stream is left at its start.
+
+    Raises:
+        UploadRejected: If the upload is too large, empty, or not a PDF or DOCX.
+    """
+    max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+    size = file_stream.seek(0, os.SEEK_END)
+    file_stream.seek(0)
+    if size > max_bytes:
+        raise UploadRejected(f"The file exceeds the maximum size of {max_bytes // (1024 * 1024)} MB.", 413)
+    if size == 0:
+        raise UploadRejected("The uploaded file is empty.", 400)
+    return UploadInfo(detect_file_type(file_stream), size)
+
+
+@contextmanager
+def upload_path(file_stream: IO[bytes]) -> Iterator[str]:
+    """
+    Gives a path on disk holding the upload, so another process can open it instead of being sent its bytes.
+
+    A stream already backed by a named file is used as it is; otherwise its content is copied once, in
+    chunks, to a temporary file that is removed when the block exits.
+
+    Args:
+        file_stream: A seekable binary stream, such as UploadFile.file.
+
+    Yields:
+        The path of a file with the content of the stream.
+    """
+    name = getattr(file_stream, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        file_stream.flush()
+        yield name
+        return
+
+    file_stream.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="cv-upload-", delete=False) as copy:
+        shutil.copyfileobj(file_stream, copy)
+    try:
+        yield copy.name
+    finally:
+        os.unlink(copy.name)
+
+
+class UploadSizeLimit:
+    """
+    ASGI middleware answering 413 to request bodies over the upload limit (plus room for the multipart framing).
+
+    A request declaring a larger Content-Length is refused before its body is received. One without a
+    Content-Length (chunked transfer encoding) is counted as its body streams in and cut off once it passes
+    the limit, so it is never spooled in full either.
+    """
+
+    def __init__(self, app, overhead: int = 64 * 1024):
+        """
+        Args:
+            app: The ASGI application to protect.
+            overhead: Bytes allowed on top of max_upload_bytes() for the form fields and multipart boundaries.
+        """
+        self.app = app
+        self.overhead = overhead
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_upload_bytes() + self.overhead
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send)
+            return
+
+        state = {"received": 0, "too_large": False, "started": False}
+
+        async def limited_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > limit:
+                    state["too_large"] = True
+                    raise UploadRejected("The upload is too large.", 413)
+            return message
+
+        async def guarded_send(message):
+            # Whatever the application answers to the interrupted body is replaced by the 413
+            if state["too_large"]:
+                return
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not state["too_large"]:
+                raise
+        if state["too_large"] and not state["started"]:
+            await self._reject(send)
+
+    @staticmethod
+    async def _reject(send):
+        body = json.dumps({"detail": "The upload is too large."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii"))]
+        })
+        await send({"type": "http.response.body", "body": body})
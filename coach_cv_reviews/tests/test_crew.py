@@ -64,3 +64,18 @@ def test_run_cv_review_crew_with_no_github_urls(mock_crew_output):
         assert result.pydantic.overall_score == "8.5/10"
         assert "No GitHub repositories were provided for analysis." in result.pydantic.technical_analysis
 
+
+def test_run_cv_review_crew_without_git(mock_crew_output, monkeypatch):
+    """
+    Tests that the review still runs, with a note per repository, when the repositories cannot be analyzed
+    at all (e.g., no git binary on the server).
+    """
+    monkeypatch.setenv("PATH", "")
+    github_urls = ["https://github.com/alice/demo"]
+
+    with patch('src.cv_reviewer.crew.Crew.kickoff', return_value=mock_crew_output) as mock_kickoff:
+        result = run_cv_review_crew("This is a sample CV.", github_urls)
+
+    assert result == mock_crew_output
+    inputs = mock_kickoff.call_args.kwargs["inputs"]
+    assert "Could not be analyzed" in inputs["repo_summaries"]
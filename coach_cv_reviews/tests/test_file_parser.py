@@ -76,4 +76,15 @@ def test_parse_docx_text(MockDocxDocument):
     # Assert
     expected = "Hello world.\nThis is a test."
     assert result == expected
-    MockDocxDocument.assert_called_once_with(fake_file_stream)
\ No newline at end of file
+    MockDocxDocument.assert_called_once_with(fake_file_stream)
+
+@patch('utils.file_parser.pypdf.PdfReader')
+def test_parse_pdf_text_rejects_too_many_pages(MockPdfReader):
+    """Tests that a PDF over the page limit is rejected before any page is extracted."""
+    pages = [MagicMock() for _ in range(3)]
+    MockPdfReader.return_value.pages = pages
+
+    with pytest.raises(file_parser.TooManyPagesError):
+        file_parser.parse_pdf_text(BytesIO(b"fake pdf content"), max_pages=2)
+    for page in pages:
+        page.extract_text.assert_not_called()
@@ -0,0 +1,90 @@
+import os
+import time
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from src.utils import file_parser, parse_pool
+from src.utils.parse_pool import ParsePool, ParseTimeout, ParseWorkerCrashed
+
+def make_docx(text):
+    """Builds a minimal DOCX holding one paragraph."""
+    stream = BytesIO()
+    with zipfile.ZipFile(stream, "w") as archive:
+        archive.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        archive.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'
+        ))
+        archive.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>'
+        ))
+    return stream.getvalue()
+
+def write_file(tmp_path, data, name="cv"):
+    """Writes a document to disk and returns its path, as the pool takes paths."""
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+@pytest.fixture
+def pool():
+    """A one-worker pool; fork lets the tests swap the parser function the worker runs."""
+    pool = ParsePool(max_workers=1, timeout=2, start_method="fork")
+    yield pool
+    pool.shutdown()
+
+def test_parses_docx_in_worker_process(pool, tmp_path):
+    """Tests that a document is parsed by the worker from its path and the worker is reused."""
+    first = write_file(tmp_path, make_docx("Senior Python Developer"), "first.docx")
+    second = write_file(tmp_path, make_docx("Second CV"), "second.docx")
+    assert pool.parse("docx", first) == "Senior Python Developer"
+    assert pool.parse("docx", second) == "Second CV"
+    assert len(pool._workers) == 1
+
+def test_parser_errors_are_raised_in_caller(pool, monkeypatch):
+    """Tests that an exception raised by the parser reaches the caller with its type."""
+    def too_many_pages(kind, path, max_pages):
+        raise file_parser.TooManyPagesError("The PDF has 80 pages; at most 50 are supported.")
+    monkeypatch.setattr(parse_pool, "_parse", too_many_pages)
+
+    with pytest.raises(file_parser.TooManyPagesError):
+        pool.parse("pdf", "cv.pdf", max_pages=50)
+
+def test_hanging_parser_is_killed(pool, monkeypatch):
+    """Tests that a document over the timeout fails alone and its worker is replaced."""
+    monkeypatch.setattr(parse_pool, "_parse", lambda kind, path, max_pages: time.sleep(60))
+    pool.timeout = 0.5
+
+    start = time.monotonic()
+    with pytest.raises(ParseTimeout):
+        pool.parse("pdf", "cv.pdf")
+    assert time.monotonic() - start < 5
+    assert not pool._workers
+
+    monkeypatch.setattr(parse_pool, "_parse", lambda kind, path, max_pages: "recovered")
+    assert pool.parse("pdf", "cv.pdf") == "recovered"
+
+def test_crashing_parser_does_not_take_down_caller(pool, monkeypatch):
+    """Tests that a worker dying mid-parse (e.g., a segfault) is reported and replaced."""
+    monkeypatch.setattr(parse_pool, "_parse", lambda kind, path, max_pages: os._exit(139))
+
+    with pytest.raises(ParseWorkerCrashed, match="139"):
+        pool.parse("pdf", "cv.pdf")
+
+    monkeypatch.setattr(parse_pool, "_parse", lambda kind, path, max_pages: "recovered")
+    assert pool.parse("pdf", "cv.pdf") == "recovered"
@@ -0,0 +1,175 @@
+import os
+import subprocess
+
+import pytest
+
+from src.cv_reviewer.tools import repo_analyzer
+from src.cv_reviewer.tools.repo_analyzer import LocalFetchBackend, RepoAnalyzer
+
+README = """# Demo project
+
+A small demo used to test the repository analyzer. ![build](https://example.com/badge.svg)
+
+## Installation
+
+Run `pip install -r requirements.txt`.
+
+## Usage
+
+```
+python app.py
+```
+"""
+
+def git(cwd, *args, date=None):
+    """Runs a git command in a fixture repository with a fixed identity (and commit date, if given)."""
+    env = dict(os.environ, GIT_AUTHOR_NAME="Dev", GIT_AUTHOR_EMAIL="dev@example.com",
+               GIT_COMMITTER_NAME="Dev", GIT_COMMITTER_EMAIL="dev@example.com")
+    if date:
+        env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True)
+
+def commit(repo, files, message, date):
+    """Writes files into a fixture repository and commits them."""
+    for path, content in files.items():
+        full_path = os.path.join(repo, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", message, date=date)
+
+@pytest.fixture
+def fixture_repos(tmp_path):
+    """A directory laid out like github.com, with one repository: alice/demo."""
+    repo = tmp_path / "remote" / "alice" / "demo"
+    repo.mkdir(parents=True)
+    git(repo, "init", "-q", "-b", "main")
+    commit(repo, {"README.md": README, "app.py": "import os\n\n\ndef main():\n    return os.getcwd()\n"},
+           "Initial commit", "2024-01-01T12:00:00")
+    commit(repo, {"tests/test_app.py": "from app import main\n\ndef test_main():\n    assert main()\n",
+                  "static/site.js": "console.log('hi');\n"},
+           "Add tests", "2024-01-10T12:00:00")
+    return tmp_path / "remote"
+
+@pytest.fixture
+def analyzer(fixture_repos, tmp_path):
+    return RepoAnalyzer(cache_dir=str(tmp_path / "cache"), backend=LocalFetchBackend(str(fixture_repos)))
+
+def test_parse_repo_url():
+    """Tests that only repository URLs are accepted, with '.git' and trailing slashes removed."""
+    assert repo_analyzer.parse_repo_url("https://github.com/alice/demo.git") == ("alice", "demo")
+    assert repo_analyzer.parse_repo_url("https://github.com/alice/main.repo/") == ("alice", "main.repo")
+    assert repo_analyzer.parse_repo_url("https://github.com/alice") is None
+    assert repo_analyzer.parse_repo_url("https://gitlab.com/alice/demo") is None
+
+def test_analyze_fixture_repo(analyzer):
+    """Tests the metrics computed from a bare clone of a local fixture repository."""
+    analysis = analyzer.analyze("https://github.com/alice/demo")
+
+    assert analysis["files"] == 4
+    assert analysis["lines_of_code"] == 7
+    assert list(analysis["languages"]) == ["Python", "JavaScript"]
+    assert analysis["cadence"]["commits"] == 2
+    assert analysis["cadence"]["first_commit"] == "2024-01-01"
+    assert analysis["cadence"]["active_weeks"] == 2
+    assert analysis["test_files"] == 1
+    assert analysis["readme"]["score"] == 4
+
+def test_unchanged_repo_is_served_from_cache(analyzer, fixture_repos, monkeypatch):
+    """Tests that a repository whose HEAD has not moved is not fetched or analyzed again."""
+    first = analyzer.analyze("https://github.com/alice/demo")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the cached analysis should have been used")
+    monkeypatch.setattr(repo_analyzer, "analyze_bare_repo", fail)
+    assert analyzer.analyze("https://github.com/alice/demo") == first
+
+def test_new_commit_updates_existing_clone(analyzer, fixture_repos):
+    """Tests that a new HEAD commit is fetched into the cached clone and analyzed."""
+    first = analyzer.analyze("https://github.com/alice/demo")
+    commit(fixture_repos / "alice" / "demo", {"lib.go": "package lib\n"}, "Add Go", "2024-03-01T12:00:00")
+
+    second = analyzer.analyze("https://github.com/alice/demo")
+    assert second["head_sha"] != first["head_sha"]
+    assert second["cadence"]["commits"] == 3
+    assert "Go" in second["languages"]
+
+def test_summarize_all_reports_unreachable_repos(analyzer):
+    """Tests that every URL gets a summary, in order, even when a repository cannot be fetched."""
+    summaries = analyzer.summarize_all(["https://github.com/alice/demo", "https://github.com/alice/missing"])
+
+    assert list(summaries) == ["https://github.com/alice/demo", "https://github.com/alice/missing"]
+    assert "Python" in summaries["https://github.com/alice/demo"]
+    assert "Could not be analyzed" in summaries["https://github.com/alice/missing"]
+
+def test_missing_git_binary_is_reported(analyzer, monkeypatch):
+    """Tests that a server without git gets a per-repository note instead of an exception."""
+    monkeypatch.setenv("PATH", "")
+    summaries = analyzer.summarize_all(["https://github.com/alice/demo"])
+    assert "git could not be run" in summaries["https://github.com/alice/demo"]
+
+def test_corrupt_cached_analysis_is_dropped(analyzer):
+    """Tests that an unreadable cached analysis fails as a RepoAnalysisError and is computed again next time."""
+    first = analyzer.analyze("https://github.com/alice/demo")
+    analysis_path = analyzer._analysis_path("alice__demo", first["head_sha"])
+    with open(analysis_path, "w") as f:
+        f.write('{"head_sha": ')
+
+    with pytest.raises(repo_analyzer.RepoAnalysisError):
+        analyzer.analyze("https://github.com/alice/demo")
+    assert analyzer.analyze("https://github.com/alice/demo") == first
+
+def test_blob_reads_stop_at_byte_cap(analyzer, fixture_repos, tmp_path):
+    """Tests that blobs are read up to the byte cap and the rest left out."""
+    clone = str(tmp_path / "demo.git")
+    git(tmp_path, "clone", "-q", "--bare", str(fixture_repos / "alice" / "demo"), clone)
+    shas = [line.split()[2] for line in subprocess.run(
+        ["git", "ls-tree", "-r", "HEAD"], cwd=clone, capture_output=True, text=True, check=True
+    ).stdout.splitlines()]
+
+    assert len(repo_analyzer._read_blobs(clone, shas, timeout=10)) == 4
+    blobs = repo_analyzer._read_blobs(clone, shas, timeout=10, max_total_bytes=len(README) + 10)
+    assert 0 < len(blobs) < 4
+    assert sum(len(content) for content in blobs.values()) <= len(README) + 10
+
+def test_clone_leaves_out_large_files(fixture_repos, tmp_path, monkeypatch):
+    """Tests that files over MAX_BLOB_BYTES are not downloaded, yet still counted as files."""
+    monkeypatch.setattr(repo_analyzer, "MAX_BLOB_BYTES", 1024)
+    repo = fixture_repos / "alice" / "demo"
+    commit(repo, {"data/dump.sql": "INSERT INTO t VALUES (1);\n" * 1000}, "Add data", "2024-02-01T12:00:00")
+    git(repo, "config", "uploadpack.allowFilter", "true")
+
+    class FileUrlBackend(LocalFetchBackend):
+        def remote_url(self, owner, name):
+            # Filters only apply to clones over a transport, not to plain local paths
+            return "file://" + super().remote_url(owner, name)
+
+    analyzer = RepoAnalyzer(cache_dir=str(tmp_path / "cache"), backend=FileUrlBackend(str(fixture_repos)))
+    analysis = analyzer.analyze("https://github.com/alice/demo")
+
+    assert analysis["files"] == 5
+    assert "SQL" not in analysis["languages"]
+    clone = analyzer._clone_path("alice__demo")
+    objects = subprocess.run(["git", "cat-file", "--batch-all-objects", "--batch-check"], cwd=clone,
+                             capture_output=True, text=True, check=True).stdout
+    assert all(int(line.split()[2]) <= 1024 for line in objects.splitlines() if " blob " in line)
+
+def test_least_recently_used_repos_are_evicted(fixture_repos, tmp_path):
+    """Tests that the cache keeps at most max_repos repositories and no lock of a finished analysis."""
+    for name in ("second", "third"):
+        repo = fixture_repos / "alice" / name
+        repo.mkdir()
+        git(repo, "init", "-q", "-b", "main")
+        commit(repo, {"main.py": "print('hi')\n"}, "Initial commit", "2024-01-01T12:00:00")
+    analyzer = RepoAnalyzer(cache_dir=str(tmp_path / "cache"), backend=LocalFetchBackend(str(fixture_repos)),
+                            max_repos=2)
+
+    for used_at, name in enumerate(["demo", "second", "third"], start=1):
+        analyzer.analyze(f"https://github.com/alice/{name}")
+        # Modification times order the evictions, so keep them apart on coarse filesystem clocks
+        os.utime(analyzer._clone_path(f"alice__{name}"), (used_at, used_at))
+
+    assert sorted(os.listdir(tmp_path / "cache" / "clones")) == ["alice__second.git", "alice__third.git"]
+    assert not (tmp_path / "cache" / "analyses" / "alice__demo").exists()
+    assert analyzer._locks == {}
@@ -0,0 +1,115 @@
+import os
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from utils import uploads
+
+def make_zip(names):
+    """Builds an in-memory zip archive containing the given (empty) members."""
+    stream = BytesIO()
+    with zipfile.ZipFile(stream, "w") as archive:
+        for name in names:
+            archive.writestr(name, "")
+    stream.seek(0)
+    return stream
+
+def test_detects_pdf_from_content():
+    """Tests that a PDF is recognised by its magic bytes and the stream is rewound."""
+    stream = BytesIO(b"%PDF-1.7\nrest of the file")
+    assert uploads.inspect_upload(stream) == ("pdf", 25)
+    assert stream.tell() == 0
+
+def test_detects_docx_from_content():
+    """Tests that a zip archive holding word/document.xml is accepted as a DOCX."""
+    stream = make_zip(["[Content_Types].xml", "word/document.xml"])
+    assert uploads.inspect_upload(stream).kind == "docx"
+    assert stream.tell() == 0
+
+def test_rejects_other_zip_archives():
+    """Tests that a zip archive which is not a Word document is refused with 415."""
+    with pytest.raises(uploads.UploadRejected) as excinfo:
+        uploads.inspect_upload(make_zip(["xl/workbook.xml"]))
+    assert excinfo.value.status_code == 415
+
+def test_rejects_renamed_text_file():
+    """Tests that the content decides the type, whatever the file was called."""
+    with pytest.raises(uploads.UploadRejected) as excinfo:
+        uploads.inspect_upload(BytesIO(b"plain text pretending to be a PDF"))
+    assert excinfo.value.status_code == 415
+
+def test_rejects_oversized_and_empty_uploads():
+    """Tests the size checks: 413 above the limit, 400 for an empty file."""
+    with pytest.raises(uploads.UploadRejected) as excinfo:
+        uploads.inspect_upload(BytesIO(b"%PDF-" + b"0" * 100), max_bytes=50)
+    assert excinfo.value.status_code == 413
+
+    with pytest.raises(uploads.UploadRejected) as excinfo:
+        uploads.inspect_upload(BytesIO(b""))
+    assert excinfo.value.status_code == 400
+
+def test_max_upload_bytes_from_environment(monkeypatch):
+    """Tests that CV_MAX_UPLOAD_MB sets the upload limit."""
+    monkeypatch.setenv("CV_MAX_UPLOAD_MB", "2")
+    assert uploads.max_upload_bytes() == 2 * 1024 * 1024
+
+def make_limited_app():
+    """Builds a small app behind UploadSizeLimit whose endpoint reports the size of the upload it received."""
+    from fastapi import FastAPI, File, UploadFile
+
+    app = FastAPI()
+    app.add_middleware(uploads.UploadSizeLimit, overhead=1024)
+
+    @app.post("/upload")
+    def upload(file: UploadFile = File(...)):
+        return {"size": len(file.file.read())}
+
+    return app
+
+def multipart_chunks(size, chunk_size=64 * 1024):
+    """Yields a multipart body carrying a `size`-byte file, in chunks, so it is sent without a Content-Length."""
+    yield b'--boundary\r\nContent-Disposition: form-data; name="file"; filename="cv.pdf"\r\n\r\n'
+    for start in range(0, size, chunk_size):
+        yield b"0" * min(chunk_size, size - start)
+    yield b"\r\n--boundary--\r\n"
+
+def test_size_limit_applies_to_chunked_requests(monkeypatch):
+    """Tests that a chunked body over the limit is cut off with 413 while one under it goes through."""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("CV_MAX_UPLOAD_MB", "1")
+    client = TestClient(make_limited_app())
+    headers = {"Content-Type": "multipart/form-data; boundary=boundary"}
+
+    response = client.post("/upload", content=multipart_chunks(3 * 1024 * 1024), headers=headers)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "The upload is too large."}
+
+    response = client.post("/upload", content=multipart_chunks(1000), headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"size": 1000}
+
+def test_size_limit_checks_content_length(monkeypatch):
+    """Tests that a declared Content-Length over the limit is refused before the body is read."""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("CV_MAX_UPLOAD_MB", "1")
+    client = TestClient(make_limited_app())
+    response = client.post("/upload", files={"file": ("cv.pdf", b"0" * (2 * 1024 * 1024), "application/pdf")})
+    assert response.status_code == 413
+
+def test_upload_path_copies_in_memory_uploads():
+    """Tests that an upload without a file on disk is written to a temporary file, removed afterwards."""
+    with uploads.upload_path(BytesIO(b"%PDF-1.7 content")) as path:
+        with open(path, "rb") as copy:
+            assert copy.read() == b"%PDF-1.7 content"
+    assert not os.path.exists(path)
+
+def test_upload_path_reuses_files_on_disk(tmp_path):
+    """Tests that an upload already in a named file is handed over as it is."""
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(b"%PDF-1.7 content")
+    with open(path, "rb") as stream, uploads.upload_path(stream) as given:
+        assert given == str(path)
+    assert path.exists()
@@ -1,39 +1,54 @@
 from crewai import Agent
-import os
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-
-# Load environment variables
-load_dotenv()
+import threading
+from utils.llm_client import get_crew_llm
 
 #This class defines the three specialized AI agents that power the coaching system
+#Each agent is built once per process; every crew gets its own copy, which shares the pooled LLM client
 class PitchCoachAgents:
-    def __init__(self):
-        self.llm = ChatOpenAI(temperature=0.7, api_key=os.getenv("OPENAI_API_KEY"))
-    
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, llm=None):
+        self.llm = llm or get_crew_llm()
+        self._templates = {}
+        self._templates_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide agent definitions"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _get_agent(self, name, **definition):
+        # Copies keep per-run state (crew, executor) separate when crews run concurrently
+        with self._templates_lock:
+            if name not in self._templates:
+                self._templates[name] = Agent(verbose=True, llm=self.llm, **definition)
+            template = self._templates[name]
+        return template.copy()
+
     def create_structure_coach(self):
-        return Agent(
+        return self._get_agent(
+            "structure_coach",
             role="Pitch Structure Coach",
             goal="Help founders structure compelling startup pitches",
-            backstory="Expert in startup storytelling and pitch deck structure",
-            verbose=True,
-            llm=self.llm
+            backstory="Expert in startup storytelling and pitch deck structure"
         )
-    
+
     def create_messaging_coach(self):
-        return Agent(
+        return self._get_agent(
+            "messaging_coach",
             role="Pitch Messaging Coach",
             goal="Analyze and improve pitch clarity and persuasiveness",
-            backstory="Communication expert specializing in simplifying complex concepts and crafting compelling narratives for startups",
-            verbose=True,
-            llm=self.llm
+            backstory="Communication expert specializing in simplifying complex concepts and crafting compelling narratives for startups"
         )
-        
+
     def create_qa_simulation_coach(self):
-        return Agent(
+        return self._get_agent(
+            "qa_simulation_coach",
             role="Investor Q&A Coach",
             goal="Prepare founders for tough investor questions",
-            backstory="Former VC with experience evaluating thousands of startups across various funding stages",
-            verbose=True,
-            llm=self.llm
-        )
\ No newline at end of file
+            backstory="Former VC with experience evaluating thousands of startups across various funding stages"
+        )
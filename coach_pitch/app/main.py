@@ -3,12 +3,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.responses import RedirectResponse
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from utils.coaching_flow import PitchCoachFlow
 from utils.crew_setup import PitchCoachCrew
-from utils.feedback_tracker import FeedbackTracker
+from utils.tracker_registry import TrackerRegistry
+from utils.executor import BoundedExecutor
+from utils.session_store import SessionConflictError, create_session_store
+from utils.response_cache import get_response_cache
+from utils.prefetch import ActionPrefetcher
+from utils.metrics import get_stage_metrics
 from typing import Optional, List, Dict, Any
 import time
+import json
+import asyncio
+import threading
 import os
 
 # At the end of your file, add this if not already present:
@@ -42,8 +51,55 @@ async def root():
     return RedirectResponse(url="/ui")
 
 
-# Store active coaching sessions
-active_sessions = {}
+# Store active coaching sessions, evicting idle ones (see utils/session_store.py)
+# Sessions are persisted by assigning them back after the coach changes: active_sessions[id] = session
+active_sessions = create_session_store()
+
+# Loaded feedback trackers, shared across requests and written to disk in the background
+# FEEDBACK_FSYNC=true saves (and fsyncs) on every write instead of every FEEDBACK_FLUSH_INTERVAL seconds
+# With several API workers (WEB_CONCURRENCY, read by gunicorn and uvicorn), a per-process cache would hold
+# stale copies of histories other workers write, so trackers are loaded and saved on every use instead
+tracker_registry = TrackerRegistry(
+    max_trackers=int(os.getenv("FEEDBACK_CACHE_SIZE", "256")),
+    flush_interval=float(os.getenv("FEEDBACK_FLUSH_INTERVAL", "2.0")),
+    fsync=os.getenv("FEEDBACK_FSYNC", "false").lower() == "true",
+    cache=int(os.getenv("WEB_CONCURRENCY", "1")) <= 1
+)
+
+# Worker threads for blocking crew runs and LLM calls, with a concurrency limit per endpoint
+# Each endpoint has its own threads, so analyses and batches can't take the threads coaching sessions need
+crew_executor = BoundedExecutor(
+    limits={
+        "analyze_pitch": int(os.getenv("ANALYZE_PITCH_CONCURRENCY", "4")),
+        "simulate_qa": int(os.getenv("SIMULATE_QA_CONCURRENCY", "4")),
+        "coaching": int(os.getenv("COACHING_CONCURRENCY", "8")),
+        "analyze_batch": int(os.getenv("BATCH_LLM_CONCURRENCY", "4")),
+        # Second analysis of each parallel-mode run (see PitchCoachCrew), separate so it can't deadlock
+        # behind the analyses waiting for it
+        "analysis_subtask": int(os.getenv("ANALYSIS_SUBTASK_CONCURRENCY", "4"))
+    }
+)
+
+# Largest number of pitches accepted by one /analyze_pitch_batch request
+batch_max_pitches = int(os.getenv("BATCH_MAX_PITCHES", "100"))
+
+# Default number of iterations returned per /pitch_history request
+history_page_size = int(os.getenv("PITCH_HISTORY_PAGE_SIZE", "20"))
+
+# Once a pitch is complete, its Q&A and clarity feedback are generated in the background
+# so the user's next click doesn't wait for a cold LLM call (PREFETCH_ACTIONS=false turns this off)
+prefetch_enabled = os.getenv("PREFETCH_ACTIONS", "true").lower() == "true"
+action_prefetcher = ActionPrefetcher(
+    max_workers=int(os.getenv("PREFETCH_WORKERS", "4")),
+    ttl=float(os.getenv("SESSION_TTL_SECONDS", "3600")),
+    session_exists=lambda session_id: session_id in active_sessions
+)
+
+@app.on_event("shutdown")
+def flush_feedback_history():
+    tracker_registry.close()
+    crew_executor.shutdown()
+    action_prefetcher.shutdown()
 
 class SessionRequest(BaseModel):
     user_id: str = "default"
@@ -57,6 +113,8 @@ class ActionRequest(BaseModel):
     session_id: str
     action: str  # "qa" or "feedback"
     user_id: str = "default"
+    # Ask the LLM again instead of serving the result prepared with the complete pitch
+    regenerate: bool = False
 
 class SessionResponse(BaseModel):
     session_id: str
@@ -82,16 +140,17 @@ async def start_coaching_session(request: SessionRequest):
         import uuid
         session_id = str(uuid.uuid4())
         
+        # Get the welcome message
+        welcome_message = coach.start_conversation()
+        
         # Store the session
         active_sessions[session_id] = {
             "coach": coach,
             "user_id": request.user_id,
-            "created_at": time.time()
+            "created_at": time.time(),
+            "lock": threading.Lock()
         }
         
-        # Get the welcome message
-        welcome_message = coach.start_conversation()
-        
         return {
             "session_id": session_id,
             "welcome_message": welcome_message
@@ -99,6 +158,82 @@ async def start_coaching_session(request: SessionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start session: {str(e)}")
 
+def _prefetch_actions(session_id, session):
+    """Generate the follow-up actions of a session in the background, under its lock"""
+    def save():
+        try:
+            active_sessions[session_id] = session
+        except SessionConflictError:
+            # Another worker moved the session on; the prefetched result is still served by this one
+            pass
+    action_prefetcher.start(session_id, session["coach"], lock=_session_lock(session), save=save)
+
+def _finish_pitch_if_complete(session, user_id, session_id):
+    """Once the flow reaches the summary stage, build the complete pitch and save it"""
+    coach = session["coach"]
+    is_complete = coach.current_stage == "summary"
+    complete_pitch = None
+    
+    if is_complete:
+        complete_pitch = coach._generate_complete_pitch()
+        
+        # Usually the summary call already returned both follow-ups; they are only generated
+        # in the background when it didn't (e.g., its reply couldn't be parsed)
+        if prefetch_enabled and coach.follow_ups_pending():
+            _prefetch_actions(session_id, session)
+        
+        # Save the complete pitch
+        with tracker_registry.use(user_id) as tracker:
+            tracker.add_pitch_feedback(
+                complete_pitch, 
+                "Generated through guided coaching session", 
+                None
+            )
+    
+    return is_complete, complete_pitch
+
+async def _run_action(session_id, session, action, generate, regenerate=False):
+    """Serve a follow-up action from its prefetched generation if there is one, otherwise generate it now"""
+    def run(**kwargs):
+        # Generating caches the result in the coach, so the session is saved for the other workers
+        with _session_lock(session):
+            result = generate(**kwargs)
+            active_sessions[session_id] = session
+            return result
+    
+    if regenerate:
+        return await crew_executor.run("coaching", run, regenerate=True)
+    
+    future = action_prefetcher.get(session_id, action, session["coach"])
+    if future is not None:
+        try:
+            # Shielded, so a client disconnect doesn't cancel the shared generation
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            # A prefetch cancelled by the sweeper or a new pitch falls back to a fresh generation,
+            # but a cancelled request (e.g., a client disconnect) still stops here
+            if not future.cancelled():
+                raise
+        except Exception:
+            pass
+    return await crew_executor.run("coaching", run)
+
+def _session_lock(session):
+    # Messages for one session are applied in order, even when they run on different worker threads
+    return session.setdefault("lock", threading.Lock())
+
+def _sse_event(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(events):
+    # Sync generators are iterated in the threadpool, so blocking LLM streams don't stall the event loop
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/send_message", response_model=MessageResponse)
 async def send_message(request: MessageRequest):
     """Send a message to the coach and get a response"""
@@ -111,29 +246,27 @@ async def send_message(request: MessageRequest):
         session = active_sessions[request.session_id]
         coach = session["coach"]
         
-        # Process the message
-        response = coach.process_response(request.message)
+        def respond():
+            with _session_lock(session):
+                # Process the message
+                response = coach.process_response(request.message)
+                
+                # Check if the pitch is complete
+                is_complete, complete_pitch = _finish_pitch_if_complete(session, request.user_id, request.session_id)
+                active_sessions[request.session_id] = session
+                return response, is_complete, complete_pitch
         
-        # Check if the pitch is complete
-        is_complete = coach.current_stage == "summary"
-        complete_pitch = None
-        
-        if is_complete:
-            complete_pitch = coach._generate_complete_pitch()
-            
-            # Save the complete pitch
-            tracker = FeedbackTracker(request.user_id)
-            tracker.add_pitch_feedback(
-                complete_pitch, 
-                "Generated through guided coaching session", 
-                None
-            )
+        # The LLM call runs in the worker pool so other sessions aren't blocked meanwhile
+        response, is_complete, complete_pitch = await crew_executor.run("coaching", respond)
         
         return {
             "response": response,
             "complete_pitch": complete_pitch,
             "is_pitch_complete": is_complete
         }
+    except SessionConflictError as e:
+        # Another worker answered a message of this session first; the client retries on the new state
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process message: {str(e)}")
 
@@ -151,19 +284,110 @@ async def perform_session_action(request: ActionRequest):
         
         if request.action == "qa":
             # Generate investor questions
-            result = coach.get_investor_questions()
+            result = await _run_action(request.session_id, session, "qa", coach.get_investor_questions,
+                                       regenerate=request.regenerate)
             return {"result": result, "action": "qa"}
             
         elif request.action == "feedback":
             # Generate pitch clarity feedback
-            result = coach.get_pitch_clarity_feedback()
+            result = await _run_action(request.session_id, session, "feedback", coach.get_pitch_clarity_feedback,
+                                       regenerate=request.regenerate)
             return {"result": result, "action": "feedback"}
             
         else:
             raise HTTPException(status_code=400, detail="Invalid action")
+    except SessionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to perform action: {str(e)}")
 
+@app.post("/send_message_stream")
+async def send_message_stream(request: MessageRequest):
+    """Send a message to the coach and stream the response as server-sent events
+    
+    Emits "token" events while the coach's reply is generated, then one "done" event
+    with the same complete_pitch / is_pitch_complete fields as /send_message.
+    """
+    # Check if session exists
+    if request.session_id not in active_sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    session = active_sessions[request.session_id]
+    coach = session["coach"]
+    
+    def events():
+        try:
+            with _session_lock(session):
+                for token in coach.stream_response(request.message):
+                    yield _sse_event("token", {"token": token})
+                
+                is_complete, complete_pitch = _finish_pitch_if_complete(session, request.user_id, request.session_id)
+                active_sessions[request.session_id] = session
+            yield _sse_event("done", {
+                "complete_pitch": complete_pitch,
+                "is_pitch_complete": is_complete
+            })
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Failed to process message: {str(e)}"})
+    
+    return _sse_response(events())
+
+@app.post("/session_action_stream")
+async def perform_session_action_stream(request: ActionRequest):
+    """Perform a session action, streaming the result as server-sent events"""
+    # Check if session exists
+    if request.session_id not in active_sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    session = active_sessions[request.session_id]
+    coach = session["coach"]
+    
+    if request.action == "qa":
+        stream = coach.stream_investor_questions
+    elif request.action == "feedback":
+        stream = coach.stream_pitch_clarity_feedback
+    else:
+        raise HTTPException(status_code=400, detail="Invalid action")
+    
+    # A prefetched result is sent as a single token (waiting for it if it is still being generated)
+    future = None if request.regenerate else action_prefetcher.get(request.session_id, request.action, coach)
+    
+    def events():
+        try:
+            tokens = None
+            if future is not None:
+                try:
+                    tokens = [future.result()]
+                except Exception:
+                    # The prefetched generation failed or was cancelled, so the action is generated now
+                    pass
+            if tokens is not None:
+                for token in tokens:
+                    yield _sse_event("token", {"token": token})
+            else:
+                with _session_lock(session):
+                    for token in stream(regenerate=request.regenerate):
+                        yield _sse_event("token", {"token": token})
+                    active_sessions[request.session_id] = session
+            yield _sse_event("done", {"action": request.action})
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Failed to perform action: {str(e)}"})
+    
+    return _sse_response(events())
+
+@app.delete("/session/{session_id}")
+async def end_session(session_id: str):
+    """End a coaching session and cancel its background generations"""
+    action_prefetcher.cancel(session_id)
+    if session_id not in active_sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    try:
+        del active_sessions[session_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"status": "success"}
+
 @app.get("/session_history/{session_id}")
 async def get_session_history(session_id: str):
     """Get the history of a coaching session"""
@@ -176,25 +400,35 @@ async def get_session_history(session_id: str):
         session = active_sessions[session_id]
         coach = session["coach"]
         
-        return {"history": coach.get_history()}
+        return {"history": coach.get_history(), "stage_metrics": coach.get_stage_metrics()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve history: {str(e)}")
 
 # Keep the existing endpoints for backward compatibility
-@app.post("/analyze_pitch")
-async def analyze_pitch(request: dict):
-    try:
-        crew = PitchCoachCrew()
-        result = crew.analyze_initial_pitch(request.get("pitch_content", ""))
-        result_str = str(result)
-        
-        # Track feedback
-        tracker = FeedbackTracker(request.get("user_id", "default"))
+async def _analyze_and_track(request, endpoint="analyze_pitch"):
+    """Run the pitch analysis crew in the worker pool and record the result in the user's history"""
+    crew = PitchCoachCrew(executor=crew_executor)
+    result = await crew_executor.run(
+        endpoint,
+        crew.analyze_initial_pitch,
+        request.get("pitch_content", ""),
+        request.get("mode")
+    )
+    result_str = str(result)
+    
+    # Track feedback
+    with tracker_registry.use(request.get("user_id", "default")) as tracker:
         pitch_id = tracker.add_pitch_feedback(
             request.get("pitch_content", ""), 
             result_str,
             request.get("pitch_id")
         )
+    return result_str, pitch_id
+
+@app.post("/analyze_pitch")
+async def analyze_pitch(request: dict):
+    try:
+        result_str, pitch_id = await _analyze_and_track(request)
         
         return {
             "analysis": result_str, 
@@ -204,11 +438,68 @@ async def analyze_pitch(request: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.post("/analyze_pitch_batch")
+async def analyze_pitch_batch(request: dict):
+    """Analyze many pitches at once, streaming each result as a server-sent event as soon as it is ready"""
+    pitches = request.get("pitches") or []
+    if not isinstance(pitches, list) or not pitches:
+        raise HTTPException(status_code=400, detail="pitches must be a non-empty list")
+    if len(pitches) > batch_max_pitches:
+        raise HTTPException(status_code=400, detail=f"At most {batch_max_pitches} pitches per batch")
+    
+    # Items may be plain strings; user_id and mode default to the batch's own values
+    # A malformed item is reported as that item's error event, like a failed analysis
+    items = []
+    for pitch in pitches:
+        if isinstance(pitch, str):
+            item = {"pitch_content": pitch}
+        elif isinstance(pitch, dict) and isinstance(pitch.get("pitch_content"), str):
+            item = dict(pitch)
+        else:
+            items.append((None, "Each pitch must be a string or an object with a pitch_content string"))
+            continue
+        item.setdefault("user_id", request.get("user_id", "default"))
+        item.setdefault("mode", request.get("mode"))
+        items.append((item, None))
+    
+    async def analyze(index, item, invalid):
+        if invalid:
+            return "error", {"index": index, "pitch_id": None, "error": invalid}
+        try:
+            result_str, pitch_id = await _analyze_and_track(item, endpoint="analyze_batch")
+            return "result", {"index": index, "pitch_id": pitch_id, "analysis": result_str}
+        except Exception as e:
+            return "error", {"index": index, "pitch_id": item.get("pitch_id"), "error": str(e)}
+    
+    async def events():
+        # Every pitch is queued at once; the "analyze_batch" limit caps how many run against the LLM
+        started = time.time()
+        tasks = [asyncio.ensure_future(analyze(index, *item)) for index, item in enumerate(items)]
+        counts = {"result": 0, "error": 0}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                event, data = await next_done
+                counts[event] += 1
+                yield _sse_event(event, data)
+            yield _sse_event("done", {
+                "completed": counts["result"],
+                "failed": counts["error"],
+                "elapsed_seconds": round(time.time() - started, 3)
+            })
+        finally:
+            # Stop queued analyses if the client goes away
+            for task in tasks:
+                task.cancel()
+    
+    return _sse_response(events())
+
 @app.post("/simulate_qa")
 async def simulate_investor_qa(request: dict):
     try:
-        crew = PitchCoachCrew()
-        result = crew.simulate_investor_qa(
+        crew = PitchCoachCrew(executor=crew_executor)
+        result = await crew_executor.run(
+            "simulate_qa",
+            crew.simulate_investor_qa,
             request.get("pitch_content", ""),
             request.get("industry", "technology"),
             request.get("funding_stage", "seed")
@@ -220,17 +511,34 @@ async def simulate_investor_qa(request: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Q&A simulation failed: {str(e)}")
 
+def _flag(request, name, default):
+    """Read a boolean field of a JSON body; the strings "true"/"false" are accepted as well"""
+    value = request.get(name, default)
+    if isinstance(value, str):
+        if value.strip().lower() in ("true", "1", "yes"):
+            return True
+        if value.strip().lower() in ("false", "0", "no"):
+            return False
+        raise HTTPException(status_code=422, detail=f"{name} must be true or false")
+    return bool(value)
+
 @app.post("/pitch_history")
 async def get_pitch_history(request: dict):
     try:
-        tracker = FeedbackTracker(request.get("user_id", "default"))
-        history = tracker.get_pitch_history(request.get("pitch_id", ""))
+        with tracker_registry.use(request.get("user_id", "default")) as tracker:
+            # Iterations are returned a page at a time; "next_offset" in the history points to the next page
+            history = tracker.get_history_page(
+                request.get("pitch_id", ""),
+                offset=int(request.get("offset", 0)),
+                limit=int(request.get("limit", history_page_size)),
+                newest_first=_flag(request, "newest_first", False),
+                include_content=_flag(request, "include_content", True)
+            )
+            metrics = tracker.get_improvement_metrics(request.get("pitch_id", "")) if history else None
         
         if not history:
             raise HTTPException(status_code=404, detail="Pitch history not found")
         
-        metrics = tracker.get_improvement_metrics(request.get("pitch_id", ""))
-        
         return {
             "history": history,
             "metrics": metrics,
@@ -242,10 +550,11 @@ async def get_pitch_history(request: dict):
         raise HTTPException(status_code=500, detail=f"Failed to retrieve history: {str(e)}")
 
 @app.get("/all_pitches/{user_id}")
-async def get_all_pitches(user_id: str = "default"):
+async def get_all_pitches(user_id: str = "default", summary: bool = False):
     try:
-        tracker = FeedbackTracker(user_id)
-        pitches = tracker.get_all_pitches()
+        with tracker_registry.use(user_id) as tracker:
+            # With summary=true each pitch carries its stats instead of every iteration's text
+            pitches = tracker.get_pitch_summaries() if summary else tracker.get_all_pitches()
         
         return {
             "pitches": pitches,
@@ -253,4 +562,22 @@ async def get_all_pitches(user_id: str = "default"):
             "status": "success"
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve pitches: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve pitches: {str(e)}")
+
+@app.get("/metrics")
+async def get_metrics():
+    """Latency histograms, token and cost counters, cache hits and errors for every coaching stage"""
+    return get_stage_metrics().snapshot()
+
+@app.get("/queue_metrics")
+async def get_queue_metrics():
+    """Queue depth and counters of the crew worker pool, per endpoint"""
+    return {
+        "max_workers": crew_executor.max_workers,
+        "endpoints": crew_executor.metrics()
+    }
+
+@app.get("/cache_metrics")
+async def get_cache_metrics():
+    """Hit/miss counters and estimated savings of the component feedback cache, and of prefetched actions"""
+    return dict(get_response_cache().stats(), prefetch=action_prefetcher.stats())
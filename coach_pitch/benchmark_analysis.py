@@ -0,0 +1,50 @@
+import argparse
+import statistics
+import time
+import os
+from dotenv import load_dotenv
+from utils.crew_setup import PitchCoachCrew
+
+# Load environment variables
+load_dotenv()
+
+# Compare wall-clock time of sequential and parallel pitch analysis
+sample_pitch = """
+We're building an AI-powered resume optimizer to help job seekers improve their job applications.
+Our solution analyzes resumes against job descriptions and provides tailored recommendations.
+We target recent graduates and career changers who struggle with the job application process.
+"""
+
+def time_analysis(crew, mode, runs):
+    """Run the analysis `runs` times in the given mode and return the durations in seconds"""
+    durations = []
+    for i in range(runs):
+        start = time.perf_counter()
+        crew.analyze_initial_pitch(sample_pitch, mode=mode)
+        durations.append(time.perf_counter() - start)
+        print(f"  {mode} run {i + 1}: {durations[-1]:.1f}s")
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs parallel pitch analysis")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode")
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("ERROR: OPENAI_API_KEY is not set in .env file")
+        exit(1)
+
+    crew = PitchCoachCrew()
+    results = {}
+    for mode in ("sequential", "parallel"):
+        print(f"Running {mode} analysis...")
+        results[mode] = time_analysis(crew, mode, args.runs)
+
+    print("\n=== BENCHMARK RESULTS ===\n")
+    for mode, durations in results.items():
+        print(f"{mode:<12} median {statistics.median(durations):.1f}s  min {min(durations):.1f}s  max {max(durations):.1f}s")
+    speedup = statistics.median(results["sequential"]) / statistics.median(results["parallel"])
+    print(f"\nParallel speedup: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import json
 from pprint import pprint
 import time
 import os
+from conversational_cli import iter_sse_events
 
 # CLI colors for better readability
 class Colors:
@@ -126,7 +127,8 @@ def get_pitch_history(pitch_id, user_id="cli_user"):
             f"{BASE_URL}/pitch_history",
             json={
                 "pitch_id": pitch_id,
-                "user_id": user_id
+                "user_id": user_id,
+                "newest_first": True
             }
         )
         
@@ -139,15 +141,22 @@ def get_pitch_history(pitch_id, user_id="cli_user"):
             metrics = result["metrics"]
             
             print_section("Pitch Iterations")
+            # The latest iterations come first, so long histories show their most recent page
+            total = result["history"]["total"]
+            offset = result["history"].get("offset", 0)
             for i, iteration in enumerate(iterations):
-                print(f"Iteration {i+1} ({iteration['timestamp']})")
+                print(f"Iteration {total-offset-i} ({iteration['timestamp']})")
                 print(f"Content: {iteration['pitch_content'][:100]}...")
                 print("-" * 40)
+            if result["history"].get("next_offset") is not None:
+                print(f"Showing {len(iterations)} of {result['history']['total']} iterations")
             
             if metrics:
                 print_section("Improvement Metrics")
                 print(f"Total Iterations: {metrics['iterations_count']}")
                 print(f"Last Updated: {metrics['last_updated']}")
+                print(f"Length Change: {metrics['total_length_change']:+d} characters")
+                print(f"Average Time Between Iterations: {metrics['average_seconds_between_iterations']:.0f}s")
             
             return True
         else:
@@ -189,6 +198,61 @@ def list_all_pitches(user_id="cli_user"):
         print_error(f"Error: {str(e)}")
         return False
 
+def read_batch_file(path):
+    """Read pitches from a JSONL file: one JSON object (with "pitch_content") or JSON string per line"""
+    pitches = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                pitch = json.loads(line)
+                pitches.append({"pitch_content": pitch} if isinstance(pitch, str) else pitch)
+    return pitches
+
+def analyze_batch(path, user_id="cli_user", output=None):
+    """Analyze every pitch in a JSONL file, printing results in the order they finish"""
+    pitches = read_batch_file(path)
+    print_section(f"Analyzing {len(pitches)} Pitches")
+    
+    results = [None] * len(pitches)
+    try:
+        response = requests.post(
+            f"{BASE_URL}/analyze_pitch_batch",
+            json={"pitches": pitches, "user_id": user_id},
+            stream=True,
+            timeout=3600
+        )
+        
+        if response.status_code != 200:
+            print_error(f"Error: {response.status_code}")
+            print(response.text)
+            return None
+        
+        finished = 0
+        for event, data in iter_sse_events(response):
+            if event == "result":
+                finished += 1
+                results[data["index"]] = data
+                print_success(f"[{finished}/{len(pitches)}] Pitch {data['index'] + 1} analyzed (Pitch ID: {data['pitch_id']})")
+            elif event == "error":
+                finished += 1
+                results[data["index"]] = data
+                print_error(f"[{finished}/{len(pitches)}] Pitch {data['index'] + 1} failed: {data['error']}")
+            elif event == "done":
+                print(f"\n{data['completed']} analyzed, {data['failed']} failed in {data['elapsed_seconds']:.1f}s")
+        
+        # Results are written in input order, one JSON object per line
+        if output:
+            with open(output, 'w') as f:
+                for result in results:
+                    f.write(json.dumps(result) + "\n")
+            print_success(f"Results written to {output}")
+        
+        return results
+    except Exception as e:
+        print_error(f"Error: {str(e)}")
+        return None
+
 def interactive_mode():
     """Run the CLI in interactive mode"""
     user_id = "cli_user"
@@ -256,13 +320,13 @@ def interactive_mode():
                 try:
                     response = requests.post(
                         f"{BASE_URL}/pitch_history",
-                        json={"pitch_id": load_id, "user_id": user_id}
+                        json={"pitch_id": load_id, "user_id": user_id, "newest_first": True, "limit": 1}
                     )
                     
                     if response.status_code == 200:
                         result = response.json()
                         current_pitch_id = load_id
-                        current_pitch_content = result["history"]["iterations"][-1]["pitch_content"]
+                        current_pitch_content = result["history"]["iterations"][0]["pitch_content"]
                         print_success(f"Loaded pitch {load_id}")
                     else:
                         print_error("Could not load that pitch")
@@ -288,12 +352,14 @@ def main():
     parser.add_argument("--qa", type=str, help="Simulate Q&A for a pitch")
     parser.add_argument("--history", type=str, help="Get history for a pitch ID")
     parser.add_argument("--list", action="store_true", help="List all pitches")
+    parser.add_argument("--batch", type=str, help="Analyze every pitch in a JSONL file")
+    parser.add_argument("--output", type=str, help="Write --batch results to this JSONL file")
     parser.add_argument("--user", type=str, default="cli_user", help="User ID")
     
     args = parser.parse_args()
     
     # If no arguments, run in interactive mode
-    if not args.analyze and not args.qa and not args.history and not args.list:
+    if not args.analyze and not args.qa and not args.history and not args.list and not args.batch:
         interactive_mode()
         return
     
@@ -309,6 +375,9 @@ def main():
         
     if args.list:
         list_all_pitches(args.user)
+    
+    if args.batch:
+        analyze_batch(args.batch, user_id=args.user, output=args.output)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import argparse
 import requests
 import json
 import os
@@ -138,7 +139,91 @@ def perform_action(session_id, action):
         print_error(f"Error: {str(e)}")
         return None
 
-def interactive_session():
+def iter_sse_events(response):
+    """Parse a server-sent event stream into (event, data) pairs"""
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and data:
+            yield event, json.loads("\n".join(data))
+            event, data = "message", []
+
+def print_stream(response):
+    """Print streamed tokens as they arrive and return the final event payload"""
+    for event, data in iter_sse_events(response):
+        if event == "token":
+            print(data["token"], end="", flush=True)
+        elif event == "done":
+            print()
+            return data
+        elif event == "error":
+            print_error(f"Error: {data['detail']}")
+            return None
+    return None
+
+def send_message_stream(session_id, message):
+    """Send a message to the coach and print the reply as it is generated"""
+    try:
+        response = requests.post(
+            f"{BASE_URL}/send_message_stream",
+            json={
+                "session_id": session_id,
+                "message": message,
+                "user_id": "cli_user"
+            },
+            stream=True
+        )
+        
+        if response.status_code == 200:
+            print(f"\n{Colors.BOLD}{Colors.BLUE}Coach: {Colors.ENDC}")
+            result = print_stream(response)
+            if result is None:
+                return None
+            
+            return {
+                "is_complete": result["is_pitch_complete"],
+                "complete_pitch": result["complete_pitch"]
+            }
+        else:
+            print_error(f"Error: {response.status_code}")
+            print(response.text)
+            return None
+    except Exception as e:
+        print_error(f"Error: {str(e)}")
+        return None
+
+def perform_action_stream(session_id, action):
+    """Perform a session action and print the result as it is generated"""
+    try:
+        response = requests.post(
+            f"{BASE_URL}/session_action_stream",
+            json={
+                "session_id": session_id,
+                "action": action,
+                "user_id": "cli_user"
+            },
+            stream=True
+        )
+        
+        if response.status_code == 200:
+            if action == "qa":
+                print_section("Investor Q&A Simulation")
+            else:
+                print_section("Pitch Clarity Feedback")
+            
+            return print_stream(response)
+        else:
+            print_error(f"Error: {response.status_code}")
+            print(response.text)
+            return None
+    except Exception as e:
+        print_error(f"Error: {str(e)}")
+        return None
+
+def interactive_session(stream=False):
     """Run an interactive coaching session"""
     print_header("AI Pitch Coach - Guided Coaching Session")
     
@@ -150,6 +235,10 @@ def interactive_session():
         print_error("Failed to start coaching session. Please check if the API is running.")
         return
     
+    # In streaming mode the coach's replies are printed token by token
+    send = send_message_stream if stream else send_message
+    act = perform_action_stream if stream else perform_action
+    
     # Main conversation loop
     pitch_complete = False
     while True:
@@ -164,7 +253,7 @@ def interactive_session():
         print_user(user_input)
         
         # Send message to coach
-        result = send_message(session_id, user_input)
+        result = send(session_id, user_input)
         if not result:
             continue
             
@@ -188,21 +277,25 @@ def interactive_session():
             action_choice = input(f"\n{Colors.BOLD}Choose an option (1-4): {Colors.ENDC}")
             
             if action_choice == "1":
-                perform_action(session_id, "qa")
+                act(session_id, "qa")
             elif action_choice == "2":
-                perform_action(session_id, "feedback")
+                act(session_id, "feedback")
             elif action_choice == "4":
                 print("\nThank you for using AI Pitch Coach! Goodbye!")
                 break
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="AI Pitch Coach - Guided Coaching Session")
+    parser.add_argument("--stream", action="store_true", help="Print the coach's replies as they are generated")
+    args = parser.parse_args()
+    
     # Check if the API is running
     if not check_api_running():
         print_error("ERROR: The API is not running. Please start it with 'python run_api.py' in another terminal.")
         return
     
-    interactive_session()
+    interactive_session(stream=args.stream)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
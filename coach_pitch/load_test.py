@@ -0,0 +1,160 @@
+import argparse
+import os
+import socket
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+# Drive complete coaching sessions against the pitch API and report throughput and latency
+# By default the API is started in this process with the offline fake LLM (LLM_BACKEND=fake),
+# so no OpenAI calls are made; pass --url to load-test a running server instead
+
+PITCH_ANSWERS = [
+    "We're building an AI-powered resume optimizer for job seekers (startup {n}).",
+    "Job seekers struggle to get past applicant tracking systems and rarely hear back.",
+    "Our tool rewrites resumes against each job description and explains every change.",
+    "There are 20 million active job seekers in the US; our first segment is new graduates.",
+    "Subscription at $15 per month, with university career centers buying seats.",
+    "We are the only tool trained on recruiter decisions, not just keyword matching.",
+    "1,200 beta users and a 40% increase in interview rates.",
+    "Two ex-recruiters and a machine learning engineer from a hiring platform.",
+    "We are raising $500K to reach 10,000 paying users in 12 months."
+]
+
+
+class Timings:
+    """Latencies of every request, grouped by endpoint"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, seconds, ok):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors += 1
+
+
+def post(http, base_url, timings, endpoint, payload):
+    start = time.perf_counter()
+    response = http.post(f"{base_url}{endpoint}", json=payload, timeout=600)
+    timings.add(endpoint, time.perf_counter() - start, response.status_code == 200)
+    response.raise_for_status()
+    return response.json()
+
+
+def run_session(base_url, timings, n):
+    """One full session: start, answer every stage until the pitch is complete, then both actions"""
+    http = requests.Session()
+    user_id = f"load_user_{n}"
+    session_id = post(http, base_url, timings, "/start_session", {"user_id": user_id})["session_id"]
+    for answer in PITCH_ANSWERS:
+        reply = post(http, base_url, timings, "/send_message", {
+            "session_id": session_id,
+            "message": answer.format(n=n),
+            "user_id": user_id
+        })
+        if reply["is_pitch_complete"]:
+            break
+    for action in ("qa", "feedback"):
+        post(http, base_url, timings, "/session_action", {
+            "session_id": session_id,
+            "action": action,
+            "user_id": user_id
+        })
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def print_report(timings, elapsed, sessions, memory_per_session):
+    total = sum(len(samples) for samples in timings.samples.values())
+    print("\n=== LOAD TEST RESULTS ===\n")
+    print(f"Sessions: {sessions}  Requests: {total}  Errors: {timings.errors}  Elapsed: {elapsed:.1f}s")
+    print(f"Throughput: {total / elapsed:.1f} requests/s, {sessions / elapsed:.2f} sessions/s\n")
+    print(f"{'endpoint':<18}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    everything = []
+    for endpoint, samples in sorted(timings.samples.items()):
+        everything.extend(samples)
+        print(f"{endpoint:<18}{len(samples):>7}{percentile(samples, 0.5):>8.3f}s{percentile(samples, 0.95):>8.3f}s"
+              f"{percentile(samples, 0.99):>8.3f}s{statistics.mean(samples):>8.3f}s")
+    if everything:
+        print(f"{'all':<18}{len(everything):>7}{percentile(everything, 0.5):>8.3f}s{percentile(everything, 0.95):>8.3f}s"
+              f"{percentile(everything, 0.99):>8.3f}s{statistics.mean(everything):>8.3f}s")
+    if memory_per_session is not None:
+        print(f"\nMemory per session: {memory_per_session / 1024:.1f} KiB")
+
+
+def start_local_server(args):
+    """Run the API with the fake LLM in a background thread and return its URL"""
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.latency)
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    os.environ["FAKE_LLM_RESPONSE_TOKENS"] = str(args.response_tokens)
+    import uvicorn
+    from app.main import app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def measure_memory_per_session(base_url, count):
+    """Memory the server keeps for each finished session, measured with tracemalloc (in-process only)"""
+    timings = Timings()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for n in range(count):
+        run_session(base_url, timings, f"memory_{n}")
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return grown / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test complete coaching sessions")
+    parser.add_argument("--sessions", type=int, default=50, help="Sessions to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="Sessions running at the same time")
+    parser.add_argument("--url", type=str, help="Test a running API instead of starting one with the fake LLM")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50, help="Fake LLM output rate")
+    parser.add_argument("--response-tokens", type=int, default=80, help="Fake LLM tokens per reply")
+    parser.add_argument("--memory-sessions", type=int, default=10, help="Sessions used to measure memory (0 to skip)")
+    args = parser.parse_args()
+
+    base_url = args.url or start_local_server(args)
+    print(f"Running {args.sessions} sessions, {args.concurrency} at a time, against {base_url}...")
+
+    timings = Timings()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for future in [pool.submit(run_session, base_url, timings, n) for n in range(args.sessions)]:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Session failed: {e}")
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc only sees this process, so memory is measured for the local server only
+    memory_per_session = None
+    if not args.url and args.memory_sessions > 0:
+        memory_per_session = measure_memory_per_session(base_url, args.memory_sessions)
+
+    print_report(timings, elapsed, args.sessions, memory_per_session)
+
+
+if __name__ == "__main__":
+    main()
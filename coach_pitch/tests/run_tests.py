@@ -8,8 +8,16 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import test modules
 from tests.test_coaching_flow import TestPitchCoachFlow
 from tests.test_api import TestPitchCoachAPI
-from tests.test_feedback_tracker import TestFeedbackTracker
+from tests.test_feedback_tracker import TestFeedbackTracker, TestSQLiteFeedbackStore
 from tests.test_web_interface import TestWebInterface
+from tests.test_tracker_registry import TestTrackerRegistry
+from tests.test_executor import TestBoundedExecutor
+from tests.test_crew_setup import TestPitchCoachCrew
+from tests.test_session_store import TestSessionStores
+from tests.test_response_cache import TestResponseCache
+from tests.test_prefetch import TestActionPrefetcher
+from tests.test_metrics import TestStageMetrics
+from tests.test_fake_llm import TestFakeChatModel
 
 def run_tests():
     """Run all tests for the AI Pitch Coach application"""
@@ -23,7 +31,16 @@ def run_tests():
     test_suite.addTests(loader.loadTestsFromTestCase(TestPitchCoachFlow))
     test_suite.addTests(loader.loadTestsFromTestCase(TestPitchCoachAPI))
     test_suite.addTests(loader.loadTestsFromTestCase(TestFeedbackTracker))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestSQLiteFeedbackStore))
     test_suite.addTests(loader.loadTestsFromTestCase(TestWebInterface))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestTrackerRegistry))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBoundedExecutor))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPitchCoachCrew))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestSessionStores))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestResponseCache))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestActionPrefetcher))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestStageMetrics))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestFakeChatModel))
     
     # Run the tests
     test_runner = unittest.TextTestRunner(verbosity=2)
@@ -3,12 +3,14 @@ from unittest.mock import patch, MagicMock
 import sys
 import os
 import json
+from concurrent.futures import Future
 from fastapi.testclient import TestClient
 
 # Add the parent directory to the path so we can import from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.main import app
+from utils.prefetch import ActionPrefetcher
 
 class TestPitchCoachAPI(unittest.TestCase):
     """Test cases for the AI Pitch Coach API endpoints"""
@@ -32,17 +34,21 @@ class TestPitchCoachAPI(unittest.TestCase):
         self.mock_coach_instance.get_pitch_clarity_feedback.return_value = "Clarity & Simplicity: Your pitch is clear."
         self.mock_coach_instance._generate_complete_pitch.return_value = "Completed pitch text here."
         
-        # Create a mock for the FeedbackTracker
-        self.feedback_tracker_patcher = patch('app.main.FeedbackTracker')
+        # Create a mock for the shared FeedbackTracker registry
+        self.feedback_tracker_patcher = patch('app.main.tracker_registry')
         self.mock_feedback_tracker = self.feedback_tracker_patcher.start()
         
         # Create a mock instance
         self.mock_tracker_instance = MagicMock()
-        self.mock_feedback_tracker.return_value = self.mock_tracker_instance
+        self.mock_feedback_tracker.use.return_value.__enter__.return_value = self.mock_tracker_instance
         
         # Set up mock responses
         self.mock_tracker_instance.add_pitch_feedback.return_value = "mock_pitch_id"
         
+        # Give each test its own prefetcher
+        self.prefetcher_patcher = patch('app.main.action_prefetcher', ActionPrefetcher(max_workers=2))
+        self.prefetcher = self.prefetcher_patcher.start()
+        
         # Create a mock for the CrewAI components
         self.crew_patcher = patch('app.main.PitchCoachCrew')
         self.mock_crew = self.crew_patcher.start()
@@ -60,6 +66,8 @@ class TestPitchCoachAPI(unittest.TestCase):
         self.coaching_flow_patcher.stop()
         self.feedback_tracker_patcher.stop()
         self.crew_patcher.stop()
+        self.prefetcher_patcher.stop()
+        self.prefetcher.shutdown()
     
     def test_read_root(self):
         """Test the root endpoint"""
@@ -173,6 +181,121 @@ class TestPitchCoachAPI(unittest.TestCase):
             self.assertEqual(data["result"], "1. How do you plan to acquire customers?")
             self.mock_coach_instance.get_investor_questions.assert_called_once()
     
+    def test_session_action_uses_prefetched_result(self):
+        """Test that completing the pitch prefetches the follow-up actions"""
+        with patch('app.main.active_sessions', {
+            "test_session_id": {
+                "coach": self.mock_coach_instance,
+                "user_id": "test_user",
+                "created_at": 123456789
+            }
+        }):
+            self.mock_coach_instance.current_stage = "summary"
+            self.client.post(
+                "/send_message",
+                json={
+                    "session_id": "test_session_id",
+                    "message": "Seeking $500K seed funding.",
+                    "user_id": "test_user"
+                }
+            )
+            
+            response = self.client.post(
+                "/session_action",
+                json={"session_id": "test_session_id", "action": "qa", "user_id": "test_user"}
+            )
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["result"], "1. How do you plan to acquire customers?")
+            # Generated once, by the prefetch, not again for the click
+            self.mock_coach_instance.get_investor_questions.assert_called_once()
+            self.assertEqual(self.prefetcher.stats()["hits"], 1)
+    
+    def test_session_action_falls_back_when_prefetch_is_cancelled(self):
+        """Test that a prefetch cancelled while the request waits for it is generated again"""
+        cancelled = Future()
+        cancelled.cancel()
+        with patch('app.main.active_sessions', {
+            "test_session_id": {
+                "coach": self.mock_coach_instance,
+                "user_id": "test_user",
+                "created_at": 123456789
+            }
+        }), patch.object(self.prefetcher, "get", return_value=cancelled):
+            response = self.client.post(
+                "/session_action",
+                json={"session_id": "test_session_id", "action": "qa", "user_id": "test_user"}
+            )
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["result"], "1. How do you plan to acquire customers?")
+            self.mock_coach_instance.get_investor_questions.assert_called_once()
+    
+    def test_session_action_regenerate(self):
+        """Test that regenerate bypasses prepared results"""
+        with patch('app.main.active_sessions', {
+            "test_session_id": {
+                "coach": self.mock_coach_instance,
+                "user_id": "test_user",
+                "created_at": 123456789
+            }
+        }):
+            response = self.client.post(
+                "/session_action",
+                json={"session_id": "test_session_id", "action": "feedback", "user_id": "test_user", "regenerate": True}
+            )
+            
+            self.assertEqual(response.status_code, 200)
+            self.mock_coach_instance.get_pitch_clarity_feedback.assert_called_once_with(regenerate=True)
+    
+    def test_session_action_saves_session(self):
+        """Test that an action runs under the session lock and saves the session, so other workers get its result"""
+        class RecordingSessions(dict):
+            def __init__(self, *args):
+                super().__init__(*args)
+                self.saved = []
+            
+            def __setitem__(self, session_id, session):
+                self.saved.append(session_id)
+                super().__setitem__(session_id, session)
+        
+        session = {"coach": self.mock_coach_instance, "user_id": "test_user", "created_at": 123456789}
+        sessions = RecordingSessions({"test_session_id": session})
+        lock_held = []
+        def get_investor_questions(**kwargs):
+            lock_held.append(session["lock"].locked())
+            return "1. How do you plan to acquire customers?"
+        self.mock_coach_instance.get_investor_questions.side_effect = get_investor_questions
+        
+        with patch('app.main.active_sessions', sessions):
+            response = self.client.post(
+                "/session_action",
+                json={"session_id": "test_session_id", "action": "qa", "user_id": "test_user"}
+            )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lock_held, [True])
+        self.assertEqual(sessions.saved, ["test_session_id"])
+    
+    def test_end_session_cancels_prefetch(self):
+        """Test ending a session"""
+        sessions = {
+            "test_session_id": {
+                "coach": self.mock_coach_instance,
+                "user_id": "test_user",
+                "created_at": 123456789
+            }
+        }
+        with patch('app.main.active_sessions', sessions):
+            self.prefetcher.start("test_session_id", self.mock_coach_instance)
+            
+            response = self.client.delete("/session/test_session_id")
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("test_session_id", sessions)
+            self.assertEqual(self.prefetcher.stats()["sessions"], 0)
+            self.assertEqual(self.client.delete("/session/test_session_id").status_code, 404)
+    
     def test_session_action_feedback(self):
         """Test performing a feedback action"""
         # We need to manually add a session first
@@ -199,6 +322,105 @@ class TestPitchCoachAPI(unittest.TestCase):
             self.assertEqual(data["result"], "Clarity & Simplicity: Your pitch is clear.")
             self.mock_coach_instance.get_pitch_clarity_feedback.assert_called_once()
     
+    def _parse_sse(self, body):
+        """Split a server-sent event stream into (event, data) pairs"""
+        events = []
+        for block in body.strip().split("\n\n"):
+            lines = block.split("\n")
+            event = lines[0][len("event: "):]
+            data = json.loads(lines[1][len("data: "):])
+            events.append((event, data))
+        return events
+    
+    def test_send_message_stream(self):
+        """Test streaming the coach's reply as server-sent events"""
+        with patch('app.main.active_sessions', {
+            "test_session_id": {
+                "coach": self.mock_coach_instance,
+                "user_id": "test_user",
+                "created_at": 123456789
+            }
+        }):
+            self.mock_coach_instance.current_stage = "summary"
+            self.mock_coach_instance.stream_response.return_value = iter(["Great ", "start!"])
+            
+            response = self.client.post(
+                "/send_message_stream",
+                json={
+                    "session_id": "test_session_id",
+                    "message": "Seeking $500K seed funding.",
+                    "user_id": "test_user"
+                }
+            )
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+            events = self._parse_sse(response.text)
+            
+            self.assertEqual(events[0], ("token", {"token": "Great "}))
+            self.assertEqual(events[1], ("token", {"token": "start!"}))
+            self.assertEqual(events[2], ("done", {
+                "complete_pitch": "Completed pitch text here.",
+                "is_pitch_complete": True
+            }))
+            self.mock_tracker_instance.add_pitch_feedback.assert_called_once()
+    
+    def test_session_action_stream(self):
+        """Test streaming investor questions"""
+        with patch('app.main.active_sessions', {
+            "test_session_id": {
+                "coach": self.mock_coach_instance,
+                "user_id": "test_user",
+                "created_at": 123456789
+            }
+        }):
+            self.mock_coach_instance.stream_investor_questions.return_value = iter(["1. How ", "big?"])
+            
+            response = self.client.post(
+                "/session_action_stream",
+                json={
+                    "session_id": "test_session_id",
+                    "action": "qa",
+                    "user_id": "test_user"
+                }
+            )
+            
+            self.assertEqual(response.status_code, 200)
+            events = self._parse_sse(response.text)
+            
+            self.assertEqual("".join(data["token"] for event, data in events if event == "token"), "1. How big?")
+            self.assertEqual(events[-1], ("done", {"action": "qa"}))
+    
+    def test_session_action_stream_falls_back_when_prefetch_fails(self):
+        """Test that a failed prefetch is streamed from a fresh generation instead"""
+        failed = Future()
+        failed.set_exception(RuntimeError("LLM unavailable"))
+        with patch('app.main.active_sessions', {
+            "test_session_id": {
+                "coach": self.mock_coach_instance,
+                "user_id": "test_user",
+                "created_at": 123456789
+            }
+        }), patch.object(self.prefetcher, "get", return_value=failed):
+            self.mock_coach_instance.stream_investor_questions.return_value = iter(["1. How ", "big?"])
+            
+            response = self.client.post(
+                "/session_action_stream",
+                json={"session_id": "test_session_id", "action": "qa", "user_id": "test_user"}
+            )
+            
+            events = self._parse_sse(response.text)
+            self.assertEqual("".join(data["token"] for event, data in events if event == "token"), "1. How big?")
+            self.assertEqual(events[-1], ("done", {"action": "qa"}))
+    
+    def test_session_action_stream_unknown_session(self):
+        """Test streaming an action for a session that does not exist"""
+        response = self.client.post(
+            "/session_action_stream",
+            json={"session_id": "missing", "action": "qa", "user_id": "test_user"}
+        )
+        self.assertEqual(response.status_code, 404)
+    
     def test_analyze_pitch(self):
         """Test the analyze_pitch endpoint"""
         response = self.client.post(
@@ -215,9 +437,140 @@ class TestPitchCoachAPI(unittest.TestCase):
         self.assertEqual(data["status"], "success")
         self.assertEqual(data["pitch_id"], "mock_pitch_id")
         self.mock_crew_instance.analyze_initial_pitch.assert_called_once_with(
-            "We're building an AI-powered resume optimizer."
+            "We're building an AI-powered resume optimizer.",
+            None
+        )
+    
+    def test_analyze_pitch_batch(self):
+        """Test that every pitch of a batch is analyzed, tracked and streamed back"""
+        self.mock_crew_instance.analyze_initial_pitch.side_effect = lambda pitch, mode: f"Analysis of {pitch}"
+        
+        response = self.client.post(
+            "/analyze_pitch_batch",
+            json={
+                "pitches": ["Pitch A", {"pitch_content": "Pitch B", "pitch_id": "7"}],
+                "user_id": "cohort"
+            }
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in response.text.strip().split("\n\n")
+        ]
+        results = {data["index"]: data for event, data in events if event == "result"}
+        self.assertEqual(results[0]["analysis"], "Analysis of Pitch A")
+        self.assertEqual(results[1]["analysis"], "Analysis of Pitch B")
+        self.assertEqual(events[-1], ("done", {"completed": 2, "failed": 0, "elapsed_seconds": events[-1][1]["elapsed_seconds"]}))
+        self.mock_feedback_tracker.use.assert_called_with("cohort")
+        self.mock_tracker_instance.add_pitch_feedback.assert_any_call("Pitch B", "Analysis of Pitch B", "7")
+    
+    def test_analyze_pitch_batch_reports_failures(self):
+        """Test that a failing pitch is reported without stopping the rest of the batch"""
+        def analyze(pitch, mode):
+            if pitch == "Bad":
+                raise RuntimeError("LLM unavailable")
+            return "Fine"
+        self.mock_crew_instance.analyze_initial_pitch.side_effect = analyze
+        
+        response = self.client.post("/analyze_pitch_batch", json={"pitches": ["Good", "Bad"]})
+        
+        self.assertIn('event: error\ndata: {"index": 1, "pitch_id": null, "error": "LLM unavailable"}', response.text)
+        self.assertIn('"completed": 1, "failed": 1', response.text)
+    
+    def test_analyze_pitch_batch_reports_invalid_items(self):
+        """Test that items that aren't pitches get an error event instead of failing the batch"""
+        self.mock_crew_instance.analyze_initial_pitch.return_value = "Fine"
+        
+        response = self.client.post("/analyze_pitch_batch", json={"pitches": ["Good", 42, {"pitch_id": "7"}]})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('event: error\ndata: {"index": 1, "pitch_id": null', response.text)
+        self.assertIn('event: error\ndata: {"index": 2, "pitch_id": null', response.text)
+        self.assertIn('"completed": 1, "failed": 2', response.text)
+    
+    def test_analyze_pitch_batch_rejects_empty(self):
+        """Test that an empty batch is rejected"""
+        response = self.client.post("/analyze_pitch_batch", json={"pitches": []})
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_pitch_history_is_paged(self):
+        """Test that the history endpoint passes paging options to the tracker"""
+        self.mock_tracker_instance.get_history_page.return_value = {
+            "pitch_id": "1",
+            "created_at": "2025-01-01T00:00:00",
+            "iterations": [],
+            "total": 0,
+            "offset": 10,
+            "limit": 5,
+            "next_offset": None
+        }
+        self.mock_tracker_instance.get_improvement_metrics.return_value = None
+        
+        response = self.client.post(
+            "/pitch_history",
+            json={"pitch_id": "1", "user_id": "test_user", "offset": 10, "limit": 5, "include_content": False}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["history"]["offset"], 10)
+        self.mock_tracker_instance.get_history_page.assert_called_once_with(
+            "1", offset=10, limit=5, newest_first=False, include_content=False
         )
     
+    def test_pitch_history_parses_string_flags(self):
+        """Test that "false" is read as false, and that other strings are rejected"""
+        self.mock_tracker_instance.get_history_page.return_value = {"iterations": [], "total": 0}
+        self.mock_tracker_instance.get_improvement_metrics.return_value = None
+        
+        response = self.client.post(
+            "/pitch_history",
+            json={"pitch_id": "1", "user_id": "test_user", "newest_first": "true", "include_content": "false"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.mock_tracker_instance.get_history_page.assert_called_once_with(
+            "1", offset=0, limit=20, newest_first=True, include_content=False
+        )
+        
+        response = self.client.post(
+            "/pitch_history",
+            json={"pitch_id": "1", "user_id": "test_user", "newest_first": "maybe"}
+        )
+        self.assertEqual(response.status_code, 422)
+    
+    def test_stage_metrics(self):
+        """Test that stage metrics are exposed"""
+        response = self.client.get("/metrics")
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("stages", response.json())
+        self.assertIn("cost", response.json()["totals"])
+    
+    def test_queue_metrics(self):
+        """Test that per-endpoint worker pool metrics are exposed"""
+        self.client.post(
+            "/analyze_pitch",
+            json={"pitch_content": "We're building an AI-powered resume optimizer.", "user_id": "test_user"}
+        )
+        
+        response = self.client.get("/queue_metrics")
+        
+        self.assertEqual(response.status_code, 200)
+        endpoint = response.json()["endpoints"]["analyze_pitch"]
+        self.assertEqual(endpoint["queued"], 0)
+        self.assertEqual(endpoint["running"], 0)
+        self.assertGreaterEqual(endpoint["completed"], 1)
+    
+    def test_cache_metrics(self):
+        """Test that feedback cache counters are exposed"""
+        response = self.client.get("/cache_metrics")
+        
+        self.assertEqual(response.status_code, 200)
+        for field in ("hits", "near_hits", "misses", "hit_rate", "estimated_saved_tokens"):
+            self.assertIn(field, response.json())
+        self.assertEqual(response.json()["prefetch"], {"sessions": 0, "hits": 0, "misses": 0})
+    
     def test_simulate_qa(self):
         """Test the simulate_qa endpoint"""
         response = self.client.post(
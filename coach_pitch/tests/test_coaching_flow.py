@@ -8,14 +8,16 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.coaching_flow import PitchCoachFlow
+from utils.response_cache import ResponseCache
+from utils.metrics import StageMetrics
 
 class TestPitchCoachFlow(unittest.TestCase):
     """Test cases for the PitchCoachFlow class"""
     
     def setUp(self):
         """Set up test fixtures"""
-        # Mock the ChatOpenAI instance
-        self.llm_patcher = patch('utils.coaching_flow.ChatOpenAI')
+        # Mock the shared LLM client
+        self.llm_patcher = patch('utils.coaching_flow.get_llm')
         self.mock_llm = self.llm_patcher.start()
         
         # Create a mock LLM response
@@ -27,12 +29,29 @@ class TestPitchCoachFlow(unittest.TestCase):
         self.mock_response.content = "This is a mock response from the LLM"
         self.mock_llm_instance.invoke.return_value = self.mock_response
         
+        # Give each test an empty feedback cache
+        self.cache_patcher = patch('utils.coaching_flow.get_response_cache', return_value=ResponseCache())
+        self.cache_patcher.start()
+        
+        # And empty stage metrics
+        self.metrics_patcher = patch('utils.coaching_flow.get_stage_metrics', return_value=StageMetrics())
+        self.metrics_patcher.start()
+        
         # Initialize the coaching flow
         self.coach = PitchCoachFlow()
     
     def tearDown(self):
         """Tear down test fixtures"""
         self.llm_patcher.stop()
+        self.cache_patcher.stop()
+        self.metrics_patcher.stop()
+    
+    def test_sessions_share_llm_client(self):
+        """Test that new sessions reuse the shared client unless one is supplied"""
+        self.assertIs(PitchCoachFlow().llm, self.coach.llm)
+        
+        custom_llm = MagicMock()
+        self.assertIs(PitchCoachFlow(llm=custom_llm).llm, custom_llm)
     
     def test_start_conversation(self):
         """Test that the conversation starts with a welcome message"""
@@ -42,30 +61,30 @@ class TestPitchCoachFlow(unittest.TestCase):
         self.assertEqual(len(self.coach.history), 1)
         self.assertEqual(self.coach.history[0]["speaker"], "coach")
     
-def test_process_response_one_liner(self):
-    """Test processing a response for the one-liner stage"""
-    # Start the conversation (which adds the first coach message to history)
-    self.coach.start_conversation()
+    def test_process_response_one_liner(self):
+        """Test processing a response for the one-liner stage"""
+        # Start the conversation (which adds the first coach message to history)
+        self.coach.start_conversation()
     
-    # Now the history should have one entry from the coach
-    self.assertEqual(len(self.coach.history), 1)
-    self.assertEqual(self.coach.history[0]["speaker"], "coach")
+        # Now the history should have one entry from the coach
+        self.assertEqual(len(self.coach.history), 1)
+        self.assertEqual(self.coach.history[0]["speaker"], "coach")
     
-    # Process the user's one-liner
-    response = self.coach.process_response("We're building an AI-powered resume optimizer.")
+        # Process the user's one-liner
+        response = self.coach.process_response("We're building an AI-powered resume optimizer.")
     
-    # Now the history should have two entries (coach, user)
-    self.assertEqual(len(self.coach.history), 3)  # Initial coach + user response + coach reply
-    self.assertEqual(self.coach.history[0]["speaker"], "coach")  # Initial welcome message
-    self.assertEqual(self.coach.history[1]["speaker"], "user")   # User's one-liner
-    self.assertEqual(self.coach.history[2]["speaker"], "coach")  # Coach's response
+        # Now the history should have two entries (coach, user)
+        self.assertEqual(len(self.coach.history), 3)  # Initial coach + user response + coach reply
+        self.assertEqual(self.coach.history[0]["speaker"], "coach")  # Initial welcome message
+        self.assertEqual(self.coach.history[1]["speaker"], "user")   # User's one-liner
+        self.assertEqual(self.coach.history[2]["speaker"], "coach")  # Coach's response
     
-    # Verify the one-liner was stored
-    self.assertEqual(self.coach.pitch_components["one_liner"], 
-                     "We're building an AI-powered resume optimizer.")
+        # Verify the one-liner was stored
+        self.assertEqual(self.coach.pitch_components["one_liner"], 
+                         "We're building an AI-powered resume optimizer.")
     
-    # Verify the next stage is set to problem
-    self.assertEqual(self.coach.current_stage, "problem")
+        # Verify the next stage is set to problem
+        self.assertEqual(self.coach.current_stage, "problem")
     
     def test_process_response_problem(self):
         """Test processing a response for the problem stage"""
@@ -86,6 +105,42 @@ def test_process_response_one_liner(self):
         # LLM should have been called to generate feedback
         self.mock_llm_instance.invoke.assert_called_once()
     
+    def test_repeated_answer_uses_cached_feedback(self):
+        """Test that the same answer for the same component is only sent to the LLM once"""
+        first = self.coach._generate_feedback("Job seekers struggle with ATS.", "problem statement", "clear")
+        second = self.coach._generate_feedback("  job seekers struggle with ATS ", "problem statement", "clear")
+        
+        self.assertEqual(first, second)
+        self.mock_llm_instance.invoke.assert_called_once()
+        self.assertEqual(self.coach.cache.stats()["hits"], 1)
+        
+        # A different component is a different cache entry
+        self.coach._generate_feedback("Job seekers struggle with ATS.", "solution description", "clear")
+        self.assertEqual(self.mock_llm_instance.invoke.call_count, 2)
+    
+    def test_stages_are_recorded(self):
+        """Test that LLM calls, cache hits and failures are recorded per stage and per session"""
+        self.mock_response.usage_metadata = {"input_tokens": 120, "output_tokens": 30}
+        self.coach._generate_feedback("Job seekers struggle with ATS.", "problem statement", "clear")
+        self.coach._generate_feedback("Job seekers struggle with ATS.", "problem statement", "clear")
+        self.mock_llm_instance.stream.side_effect = Exception("API down")
+        "".join(self.coach.stream_investor_questions())
+        
+        stages = self.coach.metrics.snapshot()["stages"]
+        feedback = stages["feedback:problem statement"]
+        self.assertEqual(feedback["count"], 2)
+        self.assertEqual(feedback["cache_hits"], 1)
+        self.assertEqual(feedback["prompt_tokens"], 120)
+        self.assertEqual(feedback["completion_tokens"], 30)
+        self.assertEqual(stages["investor_questions"]["errors"], 1)
+        
+        session = self.coach.get_stage_metrics()
+        self.assertEqual(session["feedback:problem statement"]["count"], 2)
+        self.assertEqual(session["investor_questions"]["errors"], 1)
+        # The session summary survives a snapshot round trip
+        restored = PitchCoachFlow.from_snapshot(json.loads(json.dumps(self.coach.to_snapshot())))
+        self.assertEqual(restored.get_stage_metrics(), session)
+    
     def test_generate_complete_pitch(self):
         """Test generating a complete pitch"""
         # Set up pitch components
@@ -109,6 +164,40 @@ def test_process_response_one_liner(self):
             if value and value.strip():
                 self.assertIn(value, pitch)
     
+    def test_complete_pitch_prepares_follow_ups(self):
+        """Test that one call returns the pitch, clarity feedback and investor questions"""
+        self.coach.pitch_components["one_liner"] = "We're building an AI-powered resume optimizer."
+        self.coach.pitch_components["problem"] = "Job seekers struggle to get past ATS systems."
+        self.mock_response.content = "```json\n" + json.dumps({
+            "pitch": "ResumeAI gets job seekers past ATS systems.",
+            "clarity_feedback": "Clarity & Simplicity: Clear.",
+            "investor_questions": ["1. Who pays?", "2. Why now?"]
+        }) + "\n```"
+        
+        self.assertEqual(self.coach._generate_complete_pitch(), "ResumeAI gets job seekers past ATS systems.")
+        self.assertEqual(self.coach._generate_complete_pitch(), "ResumeAI gets job seekers past ATS systems.")
+        self.assertEqual(self.coach.get_pitch_clarity_feedback(), "Clarity & Simplicity: Clear.")
+        self.assertEqual(self.coach.get_investor_questions(), "1. Who pays?\n2. Why now?")
+        self.assertEqual("".join(self.coach.stream_investor_questions()), "1. Who pays?\n2. Why now?")
+        self.mock_llm_instance.invoke.assert_called_once()
+        
+        # Regenerating, or changing the pitch, asks the LLM again
+        self.mock_response.content = "New questions"
+        self.assertEqual(self.coach.get_investor_questions(regenerate=True), "New questions")
+        self.coach.pitch_components["problem"] = "Recruiters ignore most applications."
+        self.assertEqual(self.coach.get_pitch_clarity_feedback(), "New questions")
+        self.assertEqual(self.mock_llm_instance.invoke.call_count, 3)
+    
+    def test_complete_pitch_falls_back_to_components(self):
+        """Test that an unusable summary reply falls back to the assembled components"""
+        self.coach.pitch_components["one_liner"] = "We're building an AI-powered resume optimizer."
+        self.mock_llm_instance.invoke.side_effect = Exception("API down")
+        
+        pitch = self.coach._generate_complete_pitch()
+        
+        self.assertIn("We're building an AI-powered resume optimizer.", pitch)
+        self.assertIn("first 100 customers", self.coach.get_investor_questions())
+    
     def test_get_investor_questions(self):
         """Test generating investor questions"""
         # Set up pitch components
@@ -130,6 +219,30 @@ def test_process_response_one_liner(self):
         self.assertEqual(questions, mock_questions)
         self.mock_llm_instance.invoke.assert_called_once()
 
+    def test_stream_response(self):
+        """Test that streamed feedback matches the blocking response and advances the stage"""
+        self.coach.current_stage = "problem"
+        self.mock_llm_instance.stream.return_value = iter([
+            MagicMock(content="This is a mock "),
+            MagicMock(content="response from the LLM")
+        ])
+        
+        chunks = list(self.coach.stream_response("Job seekers struggle to get past ATS systems."))
+        
+        self.assertIn("This is a mock ", chunks)
+        self.assertIn("This is a mock response from the LLM", "".join(chunks))
+        self.assertEqual(self.coach.history[-1]["message"], "".join(chunks))
+        self.assertEqual(self.coach.current_stage, "solution")
+        self.mock_llm_instance.invoke.assert_not_called()
+    
+    def test_stream_falls_back_when_llm_fails(self):
+        """Test that a failed stream yields the fallback questions"""
+        self.mock_llm_instance.stream.side_effect = Exception("API down")
+        
+        questions = "".join(self.coach.stream_investor_questions())
+        
+        self.assertIn("first 100 customers", questions)
+    
     def test_get_pitch_clarity_feedback(self):
         """Test generating pitch clarity feedback"""
         # Set up pitch components
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.crew_setup import PitchCoachCrew
+from utils.metrics import StageMetrics
+
+class TestPitchCoachCrew(unittest.TestCase):
+    """Test cases for the PitchCoachCrew analysis modes"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Mock the CrewAI Crew and task factory so no LLM is called
+        self.crew_patcher = patch('utils.crew_setup.Crew')
+        self.mock_crew = self.crew_patcher.start()
+        self.tasks_patcher = patch('utils.crew_setup.PitchCoachTasks')
+        self.mock_tasks = self.tasks_patcher.start()
+        
+        self.mock_tasks.create_structure_analysis_task.return_value = "structure_task"
+        self.mock_tasks.create_messaging_analysis_task.return_value = "messaging_task"
+        
+        def make_crew(agents, tasks, verbose):
+            crew = MagicMock()
+            def kickoff():
+                time.sleep(0.2)
+                return f"{tasks[-1]} result"
+            crew.kickoff.side_effect = kickoff
+            return crew
+        self.mock_crew.side_effect = make_crew
+        
+        self.metrics = StageMetrics()
+        self.crew = PitchCoachCrew(agents=MagicMock(), metrics=self.metrics)
+    
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.crew_patcher.stop()
+        self.tasks_patcher.stop()
+    
+    def test_sequential_mode_runs_one_crew(self):
+        """Test that the default mode runs both tasks in one sequential crew"""
+        result = self.crew.analyze_initial_pitch("Pitch", mode="sequential")
+        
+        self.assertEqual(result, "messaging_task result")
+        self.mock_crew.assert_called_once()
+        self.assertEqual(self.mock_crew.call_args.kwargs["tasks"], ["structure_task", "messaging_task"])
+    
+    def test_parallel_mode_runs_analyses_concurrently(self):
+        """Test that parallel mode overlaps both analyses and merges their results"""
+        start = time.perf_counter()
+        result = self.crew.analyze_initial_pitch("Pitch", mode="parallel")
+        elapsed = time.perf_counter() - start
+        
+        self.assertEqual(self.mock_crew.call_count, 2)
+        self.assertLess(elapsed, 0.35)
+        self.assertIn("structure_task result", result)
+        self.assertIn("messaging_task result", result)
+        self.assertLess(result.index("structure_task result"), result.index("messaging_task result"))
+    
+    def test_parallel_mode_uses_executor(self):
+        """Test that the second analysis of parallel mode is queued on the API executor, within its limits"""
+        from utils.executor import BoundedExecutor
+        executor = BoundedExecutor(limits={"analysis_subtask": 1})
+        self.addCleanup(executor.shutdown)
+        crew = PitchCoachCrew(agents=MagicMock(), metrics=self.metrics, executor=executor)
+        
+        start = time.perf_counter()
+        result = crew.analyze_initial_pitch("Pitch", mode="parallel")
+        
+        self.assertLess(time.perf_counter() - start, 0.35)
+        self.assertIn("messaging_task result", result)
+        self.assertEqual(executor.metrics()["analysis_subtask"]["completed"], 1)
+    
+    def test_kickoffs_are_recorded(self):
+        """Test that every crew kickoff is timed under its own stage"""
+        self.crew.analyze_initial_pitch("Pitch", mode="sequential")
+        self.crew.analyze_initial_pitch("Pitch", mode="parallel")
+        
+        stages = self.metrics.snapshot()["stages"]
+        # Both modes record the whole analysis; parallel mode also records each half
+        self.assertEqual(stages["crew:analyze_pitch"]["count"], 2)
+        self.assertEqual(stages["crew:structure_analysis"]["count"], 1)
+        self.assertEqual(stages["crew:messaging_analysis"]["count"], 1)
+        self.assertGreaterEqual(stages["crew:analyze_pitch"]["seconds"]["max"], 0.2)
+    
+    def test_unknown_mode(self):
+        """Test that an unknown mode is rejected"""
+        with self.assertRaises(ValueError):
+            self.crew.analyze_initial_pitch("Pitch", mode="turbo")
+
+
+
+class TestPitchCoachAgents(unittest.TestCase):
+    """Test cases for the shared agent definitions"""
+    
+    def test_agents_share_one_crewai_llm(self):
+        """Test that agents get a CrewAI LLM (not a LangChain model CrewAI would rebuild) sharing one client"""
+        from crewai.llms.base_llm import BaseLLM
+        from agents.pitch_coach import PitchCoachAgents
+        from utils.llm_client import get_crew_llm
+        
+        with patch.dict(os.environ, {"LLM_BACKEND": "openai", "OPENAI_API_KEY": "sk-test"}):
+            get_crew_llm.cache_clear()
+            self.addCleanup(get_crew_llm.cache_clear)
+            agents = PitchCoachAgents()
+            structure_coach = agents.create_structure_coach()
+            messaging_coach = agents.create_messaging_coach()
+        
+        self.assertIs(agents.llm, get_crew_llm())
+        self.assertIsInstance(structure_coach.llm, BaseLLM)
+        # Agent copies get shallow copies of the LLM, which keep its HTTP client (native OpenAI provider)
+        if hasattr(agents.llm, "_client"):
+            self.assertIs(structure_coach.llm._client, agents.llm._client)
+            self.assertIs(messaging_coach.llm._client, agents.llm._client)
+    
+    def test_fake_backend_runs_a_crew_offline(self):
+        """Test that LLM_BACKEND=fake gives the agents a CrewAI LLM and an analysis crew runs through it"""
+        from crewai.llms.base_llm import BaseLLM
+        from agents.pitch_coach import PitchCoachAgents
+        from utils.llm_client import get_crew_llm, get_llm
+        
+        fake_env = {"LLM_BACKEND": "fake", "FAKE_LLM_LATENCY": "0", "FAKE_LLM_TOKENS_PER_SECOND": "100000"}
+        with patch.dict(os.environ, fake_env):
+            get_llm.cache_clear()
+            get_crew_llm.cache_clear()
+            self.addCleanup(get_llm.cache_clear)
+            self.addCleanup(get_crew_llm.cache_clear)
+            agents = PitchCoachAgents()
+            metrics = StageMetrics()
+            crew = PitchCoachCrew(agents=agents, metrics=metrics)
+            result = crew.analyze_initial_pitch("We're building an AI-powered resume optimizer.", mode="sequential")
+        
+        self.assertIsInstance(agents.llm, BaseLLM)
+        self.assertEqual(len(str(result).split()), 80)
+        self.assertEqual(metrics.snapshot()["stages"]["crew:analyze_pitch"]["count"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.executor import BoundedExecutor
+
+class TestBoundedExecutor(unittest.TestCase):
+    """Test cases for the bounded worker pool used by the API"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.executor = BoundedExecutor(limits={"analyze_pitch": 2, "coaching": 1})
+        self.addCleanup(self.executor.shutdown)
+    
+    def test_run_returns_result_off_the_event_loop(self):
+        """Test that work runs in a worker thread and its result is returned"""
+        async def main():
+            return await self.executor.run("analyze_pitch", threading.current_thread)
+        
+        worker_thread = asyncio.run(main())
+        self.assertNotEqual(worker_thread, threading.current_thread())
+    
+    def test_concurrency_limit_and_queue_depth(self):
+        """Test that an endpoint never runs more than its limit and queued calls are counted"""
+        running = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_analysis():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+        
+        async def main():
+            tasks = [asyncio.create_task(self.executor.run("analyze_pitch", slow_analysis)) for _ in range(5)]
+            await asyncio.sleep(0.01)
+            snapshot = self.executor.metrics()["analyze_pitch"]
+            await asyncio.gather(*tasks)
+            return snapshot
+        
+        snapshot = asyncio.run(main())
+        
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(snapshot["running"], 2)
+        self.assertEqual(snapshot["queued"], 3)
+        self.assertEqual(self.executor.metrics()["analyze_pitch"]["completed"], 5)
+    
+    def test_failures_are_counted_and_raised(self):
+        """Test that exceptions propagate to the caller and free the slot"""
+        def broken():
+            raise ValueError("LLM error")
+        
+        async def main():
+            with self.assertRaises(ValueError):
+                await self.executor.run("simulate_qa", broken)
+        
+        asyncio.run(main())
+        metrics = self.executor.metrics()["simulate_qa"]
+        self.assertEqual(metrics["failed"], 1)
+        self.assertEqual(metrics["running"], 0)
+        self.assertEqual(metrics["limit"], 4)
+
+    
+    def test_endpoints_do_not_share_threads(self):
+        """Test that a saturated endpoint doesn't delay another, and threads match the summed limits"""
+        release = threading.Event()
+        
+        async def main():
+            blocked = [asyncio.create_task(self.executor.run("analyze_pitch", release.wait)) for _ in range(4)]
+            await asyncio.sleep(0.01)
+            start = time.perf_counter()
+            await self.executor.run("coaching", time.sleep, 0.01)
+            elapsed = time.perf_counter() - start
+            snapshot = self.executor.metrics()["analyze_pitch"]
+            release.set()
+            await asyncio.gather(*blocked)
+            return elapsed, snapshot
+        
+        elapsed, snapshot = asyncio.run(main())
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(snapshot["running"], 2)
+        self.assertEqual(snapshot["queued"], 2)
+        self.assertEqual(self.executor.max_workers, 3)
+    
+    def test_submit_from_worker_thread(self):
+        """Test that blocking code can queue work under an endpoint's limit and wait for it"""
+        future = self.executor.submit("analysis_subtask", lambda: "messaging")
+        self.assertEqual(future.result(timeout=1), "messaging")
+        self.assertEqual(self.executor.metrics()["analysis_subtask"]["completed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
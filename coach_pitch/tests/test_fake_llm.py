@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fake_llm import FakeChatModel
+from utils.llm_client import get_llm
+from utils.coaching_flow import PitchCoachFlow
+from utils.response_cache import ResponseCache
+from utils.metrics import StageMetrics
+
+class TestFakeChatModel(unittest.TestCase):
+    """Test cases for the offline LLM stand-in"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.llm = FakeChatModel(latency=0.01, tokens_per_second=1000, response_tokens=12)
+    
+    def test_replies_are_deterministic(self):
+        """Test that the same prompt gets the same reply and a different prompt another one"""
+        first = self.llm.invoke("Evaluate this pitch")
+        
+        self.assertEqual(first.content, self.llm.invoke("Evaluate this pitch").content)
+        self.assertNotEqual(first.content, self.llm.invoke("Something else").content)
+        self.assertEqual(len(first.content.split()), 12)
+        self.assertEqual(first.usage_metadata["output_tokens"], 12)
+    
+    def test_stream_matches_invoke(self):
+        """Test that streaming yields the same reply token by token"""
+        chunks = [chunk.content for chunk in self.llm.stream("Evaluate this pitch")]
+        
+        self.assertGreaterEqual(len(chunks), 12)
+        self.assertEqual("".join(chunks), self.llm.invoke("Evaluate this pitch").content)
+    
+    def test_pitch_summary_reply_is_parsed(self):
+        """Test that the pitch summary prompt gets a JSON reply the coaching flow can use"""
+        coach = PitchCoachFlow(llm=self.llm, cache=ResponseCache(), metrics=StageMetrics())
+        coach.pitch_components["one_liner"] = "We're building an AI-powered resume optimizer."
+        
+        parsed = coach._parse_pitch_summary(self.llm.invoke(coach._pitch_summary_prompt()).content)
+        
+        self.assertEqual(sorted(parsed), ["clarity_feedback", "investor_questions", "pitch"])
+        coach._generate_complete_pitch()
+        self.assertFalse(coach.follow_ups_pending())
+    
+    def test_latency_and_token_rate(self):
+        """Test that a reply takes the configured latency plus the time to produce its tokens"""
+        llm = FakeChatModel(latency=0.1, tokens_per_second=100, response_tokens=10)
+        start = time.perf_counter()
+        llm.invoke("Evaluate this pitch")
+        
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+    
+    def test_backend_is_selected_by_environment(self):
+        """Test that LLM_BACKEND=fake gives the coaching flow the fake model"""
+        get_llm.cache_clear()
+        self.addCleanup(get_llm.cache_clear)
+        with patch.dict(os.environ, {"LLM_BACKEND": "fake", "FAKE_LLM_LATENCY": "0", "FAKE_LLM_TOKENS_PER_SECOND": "10000"}):
+            coach = PitchCoachFlow(cache=ResponseCache(), metrics=StageMetrics())
+            
+            self.assertIsInstance(coach.llm, FakeChatModel)
+            self.assertEqual(len(coach.get_investor_questions().split()), 80)
+        
+        with patch.dict(os.environ, {"LLM_BACKEND": "unknown"}):
+            get_llm.cache_clear()
+            with self.assertRaises(ValueError):
+                get_llm()
+
+if __name__ == '__main__':
+    unittest.main()
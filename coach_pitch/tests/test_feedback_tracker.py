@@ -11,6 +11,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.feedback_tracker import FeedbackTracker
 
+def _append_iterations(directory, pitch_id, count):
+    """Append iterations to a pitch from a separate process, like another API worker"""
+    os.chdir(directory)
+    tracker = FeedbackTracker("test_user", storage="sqlite")
+    for i in range(count):
+        tracker.add_pitch_feedback(f"Pitch {i}", f"Feedback {i}", pitch_id)
+    tracker.storage.close()
+
 class TestFeedbackTracker(unittest.TestCase):
     """Test cases for the FeedbackTracker class"""
     
@@ -165,4 +173,161 @@ class TestFeedbackTracker(unittest.TestCase):
         # Get all pitches
         all_pitches = self.tracker.get_all_pitches()
         
-        # Check the result
\ No newline at end of file
+        # Check the result
+
+class TestSQLiteFeedbackStore(unittest.TestCase):
+    """Test cases for FeedbackTracker backed by the SQLite store"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Run inside a temporary directory so feedback_data/ is created there
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.original_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.addCleanup(os.chdir, self.original_cwd)
+        
+        self.test_pitch = "We're building an AI-powered resume optimizer."
+        self.test_feedback = "Great one-liner! Consider adding more specificity."
+    
+    def _tracker(self, user_id="test_user"):
+        tracker = FeedbackTracker(user_id, storage="sqlite")
+        self.addCleanup(tracker.storage.close)
+        return tracker
+    
+    def test_add_and_get_pitch(self):
+        """Test adding a new pitch and refining it"""
+        tracker = self._tracker()
+        pitch_id = tracker.add_pitch_feedback(self.test_pitch, self.test_feedback)
+        self.assertEqual(pitch_id, "1")
+        
+        tracker.add_pitch_feedback(self.test_pitch + " Refined.", "Much better!", pitch_id)
+        
+        pitch = tracker.get_pitch_history(pitch_id)
+        self.assertEqual(pitch["pitch_id"], "1")
+        self.assertEqual(len(pitch["iterations"]), 2)
+        self.assertEqual(pitch["iterations"][1]["pitch_content"], self.test_pitch + " Refined.")
+        self.assertEqual(pitch["iterations"][1]["feedback"], "Much better!")
+        self.assertIsNone(tracker.get_pitch_history("nonexistent_id"))
+    
+    def test_users_are_isolated(self):
+        """Test that pitches of different users sharing one database do not mix"""
+        first = self._tracker("first_user")
+        second = self._tracker("second_user")
+        first.add_pitch_feedback(self.test_pitch, self.test_feedback)
+        
+        self.assertEqual(len(first.get_all_pitches()), 1)
+        self.assertEqual(second.get_all_pitches(), [])
+        self.assertEqual(second.add_pitch_feedback(self.test_pitch, self.test_feedback), "1")
+    
+    def test_running_stats_and_metrics(self):
+        """Test that the stats follow every added iteration for both backends"""
+        for storage in ("sqlite", "json"):
+            tracker = FeedbackTracker(f"{storage}_user", storage=storage)
+            self.addCleanup(tracker.storage.close)
+            pitch_id = tracker.add_pitch_feedback("Short pitch.", self.test_feedback)
+            self.assertIsNone(tracker.get_improvement_metrics(pitch_id))
+            
+            tracker.add_pitch_feedback("A somewhat longer pitch.", "Better", pitch_id)
+            tracker.add_pitch_feedback("A pitch.", "Too short now", pitch_id)
+            
+            stats = tracker.get_pitch_stats(pitch_id)
+            self.assertEqual(stats["iterations_count"], 3)
+            self.assertEqual(stats["last_length_delta"], len("A pitch.") - len("A somewhat longer pitch."))
+            metrics = tracker.get_improvement_metrics(pitch_id)
+            self.assertEqual(metrics["iterations_count"], 3)
+            self.assertEqual(metrics["total_length_change"], len("A pitch.") - len("Short pitch."))
+            self.assertGreaterEqual(metrics["average_seconds_between_iterations"], 0)
+            self.assertIsNone(tracker.get_pitch_stats("nonexistent_id"))
+    
+    def test_history_page(self):
+        """Test paging through a pitch's iterations"""
+        tracker = self._tracker()
+        pitch_id = tracker.add_pitch_feedback("Pitch 0", "Feedback 0")
+        for i in range(1, 5):
+            tracker.add_pitch_feedback(f"Pitch {i}", f"Feedback {i}", pitch_id)
+        
+        page = tracker.get_history_page(pitch_id, offset=1, limit=2)
+        self.assertEqual([it["pitch_content"] for it in page["iterations"]], ["Pitch 1", "Pitch 2"])
+        self.assertEqual(page["total"], 5)
+        self.assertEqual(page["next_offset"], 3)
+        
+        latest = tracker.get_history_page(pitch_id, limit=1, newest_first=True, include_content=False)
+        self.assertEqual(latest["iterations"], [{
+            "timestamp": latest["iterations"][0]["timestamp"],
+            "pitch_length": len("Pitch 4"),
+            "feedback_length": len("Feedback 4")
+        }])
+        self.assertIsNone(tracker.get_history_page(pitch_id, offset=3, limit=5)["next_offset"])
+        self.assertIsNone(tracker.get_history_page("nonexistent_id"))
+    
+    def test_summaries_skip_iterations(self):
+        """Test that pitch summaries carry stats but no iteration text"""
+        tracker = self._tracker()
+        pitch_id = tracker.add_pitch_feedback(self.test_pitch, self.test_feedback)
+        
+        summaries = tracker.get_pitch_summaries()
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0]["pitch_id"], pitch_id)
+        self.assertNotIn("iterations", summaries[0])
+        self.assertEqual(summaries[0]["stats"]["iterations_count"], 1)
+    
+    def test_migrates_json_history(self):
+        """Test that an existing JSON history is imported on first use"""
+        json_tracker = FeedbackTracker("legacy_user", storage="json")
+        pitch_id = json_tracker.add_pitch_feedback(self.test_pitch, self.test_feedback)
+        json_tracker.add_pitch_feedback(self.test_pitch, "Second round", pitch_id)
+        
+        tracker = self._tracker("legacy_user")
+        self.assertEqual(tracker.get_all_pitches(), json_tracker.get_all_pitches())
+        
+        # Opening the user again must not import the JSON file twice
+        reopened = self._tracker("legacy_user")
+        self.assertEqual(len(reopened.get_pitch_history(pitch_id)["iterations"]), 2)
+        
+        # Stats of migrated pitches are rebuilt from their iterations and then kept up to date
+        self.assertEqual(reopened.get_pitch_stats(pitch_id)["iterations_count"], 2)
+        saved = reopened.storage.conn.execute(
+            "SELECT COUNT(*) FROM pitch_stats WHERE user_id = ? AND pitch_id = ?", ("legacy_user", pitch_id)
+        ).fetchone()[0]
+        self.assertEqual(saved, 1)
+        reopened.add_pitch_feedback(self.test_pitch, "Third round", pitch_id)
+        self.assertEqual(reopened.get_pitch_stats(pitch_id)["iterations_count"], 3)
+    
+    def test_concurrent_migrations_import_once(self):
+        """Test that stores opening the same legacy user at once import its JSON history only once"""
+        import threading
+        json_tracker = FeedbackTracker("legacy_user", storage="json")
+        pitch_id = json_tracker.add_pitch_feedback(self.test_pitch, self.test_feedback)
+        json_tracker.add_pitch_feedback(self.test_pitch, "Second round", pitch_id)
+        
+        trackers = []
+        def open_tracker():
+            trackers.append(self._tracker("legacy_user"))
+        threads = [threading.Thread(target=open_tracker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(trackers), 4)
+        self.assertEqual(len(self._tracker("legacy_user").get_pitch_history(pitch_id)["iterations"]), 2)
+    
+    def test_stats_survive_appends_from_several_processes(self):
+        """Test that stats count every iteration when several processes append to one pitch at once"""
+        import multiprocessing
+        tracker = self._tracker()
+        pitch_id = tracker.add_pitch_feedback(self.test_pitch, self.test_feedback)
+        
+        processes = [
+            multiprocessing.Process(target=_append_iterations, args=(self.test_dir, pitch_id, 50))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        
+        self.assertTrue(all(process.exitcode == 0 for process in processes))
+        self.assertEqual(len(tracker.get_pitch_history(pitch_id)["iterations"]), 201)
+        self.assertEqual(tracker.get_pitch_stats(pitch_id)["iterations_count"], 201)
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import StageMetrics, usage_from_response, usage_from_crew_output
+
+class TestStageMetrics(unittest.TestCase):
+    """Test cases for the per-stage latency and token metrics"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.metrics = StageMetrics(prompt_cost_per_1k=1.0, completion_cost_per_1k=2.0)
+    
+    def test_counters_and_cost(self):
+        """Test that calls, tokens, cache hits and errors add up"""
+        record = self.metrics.record("pitch_clarity", 1.5, prompt_tokens=1000, completion_tokens=500)
+        self.metrics.record("pitch_clarity", 0.01, cache_hit=True)
+        self.metrics.record("pitch_clarity", 3.0, error=True)
+        
+        self.assertEqual(record["cost"], 2.0)
+        stage = self.metrics.snapshot()["stages"]["pitch_clarity"]
+        self.assertEqual(stage["count"], 3)
+        self.assertEqual(stage["cache_hits"], 1)
+        self.assertEqual(stage["errors"], 1)
+        self.assertEqual(stage["prompt_tokens"], 1000)
+        self.assertEqual(stage["cost"], 2.0)
+        self.assertEqual(self.metrics.snapshot()["totals"]["calls"], 3)
+    
+    def test_histogram_and_percentiles(self):
+        """Test that latencies land in the right buckets and percentiles follow them"""
+        for seconds in [0.01] * 90 + [4.0] * 9 + [200.0]:
+            self.metrics.record("complete_pitch", seconds)
+        
+        stage = self.metrics.snapshot()["stages"]["complete_pitch"]
+        self.assertEqual(stage["histogram"]["le_0.05"], 90)
+        self.assertEqual(stage["histogram"]["le_5"], 9)
+        self.assertEqual(stage["histogram"]["+Inf"], 1)
+        self.assertEqual(stage["seconds"]["p50"], 0.01)
+        self.assertEqual(stage["seconds"]["p95"], 4.0)
+        self.assertEqual(stage["seconds"]["max"], 200.0)
+    
+    def test_usage_is_reported_or_estimated(self):
+        """Test token counts from provider usage, with an estimate when it is missing"""
+        response = MagicMock()
+        response.usage_metadata = {"input_tokens": 12, "output_tokens": 7}
+        self.assertEqual(usage_from_response(response, "prompt", "text"), (12, 7))
+        self.assertEqual(usage_from_response(MagicMock(), "x" * 40, "y" * 8), (10, 2))
+        
+        output = MagicMock()
+        output.token_usage.prompt_tokens = 300
+        output.token_usage.completion_tokens = 80
+        self.assertEqual(usage_from_crew_output(output), (300, 80))
+        self.assertEqual(usage_from_crew_output("a" * 20), (0, 5))
+
+if __name__ == '__main__':
+    unittest.main()
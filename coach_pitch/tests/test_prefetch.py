@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import threading
+from unittest.mock import MagicMock
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.prefetch import ActionPrefetcher
+
+class TestActionPrefetcher(unittest.TestCase):
+    """Test cases for background generation of session actions"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.prefetcher = ActionPrefetcher(max_workers=2)
+        self.coach = MagicMock()
+        self.coach._pitch_context.return_value = "Problem: ATS systems"
+        self.coach.get_investor_questions.return_value = "1. Who are your competitors?"
+        self.coach.get_pitch_clarity_feedback.return_value = "Clear and concise."
+    
+    def tearDown(self):
+        self.prefetcher.shutdown()
+    
+    def test_prefetched_results_are_served(self):
+        """Test that both actions are generated and returned"""
+        self.prefetcher.start("s1", self.coach)
+        
+        self.assertEqual(self.prefetcher.get("s1", "qa", self.coach).result(timeout=5), "1. Who are your competitors?")
+        self.assertEqual(self.prefetcher.get("s1", "feedback", self.coach).result(timeout=5), "Clear and concise.")
+        self.assertEqual(self.prefetcher.stats()["hits"], 2)
+    
+    def test_generations_hold_the_session_lock(self):
+        """Test that generations wait for the session's lock and save the session before releasing it"""
+        lock = threading.Lock()
+        lock_held = []
+        saved = []
+        self.coach.get_investor_questions.side_effect = lambda: lock_held.append(lock.locked()) or "1. Who?"
+        self.coach.get_pitch_clarity_feedback.side_effect = lambda: lock_held.append(lock.locked()) or "Clear."
+        
+        with lock:
+            # A request is still changing the session, so nothing is generated yet
+            self.prefetcher.start("s1", self.coach, lock=lock, save=lambda: saved.append(lock.locked()))
+            future = self.prefetcher.get("s1", "qa", self.coach)
+            self.assertFalse(future.done())
+            self.coach.get_investor_questions.assert_not_called()
+        
+        self.assertEqual(future.result(timeout=5), "1. Who?")
+        self.prefetcher.get("s1", "feedback", self.coach).result(timeout=5)
+        self.assertEqual(lock_held, [True, True])
+        self.assertEqual(saved, [True, True])
+    
+    def test_same_pitch_is_not_generated_twice(self):
+        """Test that starting again for an unchanged pitch reuses the running generation"""
+        self.prefetcher.start("s1", self.coach)
+        self.prefetcher.start("s1", self.coach)
+        self.prefetcher.get("s1", "qa", self.coach).result(timeout=5)
+        
+        self.coach.get_investor_questions.assert_called_once()
+    
+    def test_changed_pitch_misses(self):
+        """Test that results generated for another version of the pitch are not used"""
+        self.prefetcher.start("s1", self.coach)
+        self.coach._pitch_context.return_value = "Problem: hiring is slow"
+        
+        self.assertIsNone(self.prefetcher.get("s1", "qa", self.coach))
+        self.assertIsNone(self.prefetcher.get("unknown", "qa", self.coach))
+        self.assertEqual(self.prefetcher.stats()["misses"], 2)
+    
+    def test_cancel_drops_pending_generations(self):
+        """Test that cancelling a session drops work that hasn't started"""
+        release = threading.Event()
+        blocker = MagicMock()
+        blocker._pitch_context.return_value = "other pitch"
+        blocker.get_investor_questions.side_effect = lambda: release.wait(5)
+        blocker.get_pitch_clarity_feedback.side_effect = lambda: release.wait(5)
+        # Occupy both workers so the next session's generations stay queued
+        self.prefetcher.start("busy", blocker)
+        
+        self.prefetcher.start("s1", self.coach)
+        self.prefetcher.cancel("s1")
+        release.set()
+        
+        self.assertIsNone(self.prefetcher.get("s1", "qa", self.coach))
+        self.prefetcher.get("busy", "qa", blocker).result(timeout=5)
+        self.coach.get_investor_questions.assert_not_called()
+        self.assertEqual(self.prefetcher.stats()["sessions"], 1)
+    
+    def test_expired_results_miss(self):
+        """Test that results older than the TTL are not used"""
+        prefetcher = ActionPrefetcher(max_workers=1, ttl=0)
+        prefetcher.start("s1", self.coach)
+        prefetcher._entries["s1"]["started_at"] -= 1
+        
+        self.assertIsNone(prefetcher.get("s1", "qa", self.coach))
+        prefetcher.shutdown()
+
+    def test_sweep_drops_evicted_sessions(self):
+        """Test that entries of sessions gone from the session store are cancelled by the sweep"""
+        sessions = {"s1", "s2"}
+        prefetcher = ActionPrefetcher(max_workers=1, session_exists=lambda session_id: session_id in sessions)
+        prefetcher.start("s1", self.coach)
+        prefetcher.start("s2", self.coach)
+        
+        sessions.discard("s1")
+        prefetcher.sweep()
+        
+        self.assertIsNone(prefetcher.get("s1", "qa", self.coach))
+        self.assertIsNotNone(prefetcher.get("s2", "qa", self.coach))
+        self.assertEqual(prefetcher.stats()["sessions"], 1)
+        prefetcher.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
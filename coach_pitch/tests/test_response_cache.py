@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.response_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the component feedback cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache = ResponseCache(max_entries=2)
+        self.answer = "Job seekers struggle to get past ATS systems."
+    
+    def test_hit_after_normalization(self):
+        """Test that case, whitespace and trailing punctuation don't change the key"""
+        self.cache.put("1", "problem statement", self.answer, "Great point!")
+        
+        self.assertEqual(self.cache.get("1", "problem statement", "job seekers  struggle to get past ATS systems"), "Great point!")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+    
+    def test_key_includes_component_and_prompt_version(self):
+        """Test that other components and prompt versions miss"""
+        self.cache.put("1", "problem statement", self.answer, "Great point!")
+        
+        self.assertIsNone(self.cache.get("1", "solution description", self.answer))
+        self.assertIsNone(self.cache.get("2", "problem statement", self.answer))
+        self.assertEqual(self.cache.stats()["misses"], 2)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full"""
+        self.cache.put("1", "problem statement", "first", "A")
+        self.cache.put("1", "problem statement", "second", "B")
+        self.cache.get("1", "problem statement", "first")
+        self.cache.put("1", "problem statement", "third", "C")
+        
+        self.assertEqual(self.cache.get("1", "problem statement", "first"), "A")
+        self.assertIsNone(self.cache.get("1", "problem statement", "second"))
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        cache = ResponseCache(ttl=0.05)
+        cache.put("1", "problem statement", self.answer, "Great point!")
+        time.sleep(0.1)
+        
+        self.assertIsNone(cache.get("1", "problem statement", self.answer))
+    
+    def test_near_duplicate_matching(self):
+        """Test that near-identical answers hit only when near-duplicate matching is on"""
+        typo = "Job seekers struggle to get pass ATS systems."
+        self.cache.put("1", "problem statement", self.answer, "Great point!", prompt="x" * 400, latency=1.5)
+        self.assertIsNone(self.cache.get("1", "problem statement", typo))
+        
+        near_cache = ResponseCache(near_duplicates=True)
+        near_cache.put("1", "problem statement", self.answer, "Great point!", prompt="x" * 400, latency=1.5)
+        self.assertEqual(near_cache.get("1", "problem statement", typo), "Great point!")
+        self.assertIsNone(near_cache.get("1", "problem statement", "Our market is every student in Europe."))
+        
+        stats = near_cache.stats()
+        self.assertEqual(stats["near_hits"], 1)
+        self.assertEqual(stats["saved_seconds"], 1.5)
+        self.assertGreater(stats["estimated_saved_tokens"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
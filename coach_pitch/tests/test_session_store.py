@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import tempfile
+import shutil
+import time
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.session_store import MemorySessionStore, SQLiteSessionStore, SessionConflictError
+from utils.coaching_flow import PitchCoachFlow
+
+class TestSessionStores(unittest.TestCase):
+    """Test cases for the coaching session stores"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Mock the shared LLM client
+        self.llm_patcher = patch('utils.coaching_flow.get_llm')
+        self.llm_patcher.start()
+        
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.db_path = os.path.join(self.test_dir, "sessions.db")
+    
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.llm_patcher.stop()
+    
+    def _session(self):
+        coach = PitchCoachFlow()
+        coach.start_conversation()
+        return {"coach": coach, "user_id": "test_user", "created_at": time.time()}
+    
+    def _sqlite_store(self, **kwargs):
+        store = SQLiteSessionStore(self.db_path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+    
+    def test_flow_snapshot_round_trip(self):
+        """Test that a coaching flow can be rebuilt from its snapshot"""
+        coach = PitchCoachFlow()
+        coach.start_conversation()
+        coach.process_response("We're building an AI-powered resume optimizer.")
+        
+        restored = PitchCoachFlow.from_snapshot(coach.to_snapshot())
+        
+        self.assertEqual(restored.current_stage, "problem")
+        self.assertEqual(restored.pitch_components, coach.pitch_components)
+        self.assertEqual(restored.history, coach.history)
+    
+    def test_memory_store_evicts_idle_sessions(self):
+        """Test idle-TTL eviction in the in-memory store"""
+        store = MemorySessionStore(ttl=0.05)
+        store["session"] = self._session()
+        self.assertIn("session", store)
+        
+        time.sleep(0.1)
+        self.assertNotIn("session", store)
+        self.assertEqual(len(store), 0)
+    
+    def test_memory_store_max_sessions(self):
+        """Test that the least recently used session is dropped when the store is full"""
+        store = MemorySessionStore(max_sessions=2)
+        store["first"] = self._session()
+        store["second"] = self._session()
+        store["first"]  # touch, so "second" becomes the oldest
+        store["third"] = self._session()
+        
+        self.assertEqual(sorted(store), ["first", "third"])
+    
+    def test_sqlite_store_shares_sessions_between_workers(self):
+        """Test that two stores on one database see each other's updates"""
+        worker_a = self._sqlite_store()
+        worker_b = self._sqlite_store()
+        
+        worker_a["session"] = self._session()
+        session = worker_b["session"]
+        session["coach"].process_response("We're building an AI-powered resume optimizer.")
+        worker_b["session"] = session
+        
+        updated = worker_a["session"]["coach"]
+        self.assertEqual(updated.current_stage, "problem")
+        self.assertEqual(updated.pitch_components["one_liner"], "We're building an AI-powered resume optimizer.")
+    
+    def test_sqlite_store_reuses_loaded_session(self):
+        """Test that an unchanged session is not rebuilt on every read"""
+        store = self._sqlite_store()
+        store["session"] = self._session()
+        self.assertIs(store["session"], store["session"])
+    
+    def test_sqlite_store_rejects_stale_writes(self):
+        """Test that a worker can't overwrite a session saved by another worker since it was loaded"""
+        worker_a = self._sqlite_store()
+        worker_b = self._sqlite_store()
+        
+        worker_a["session"] = self._session()
+        stale = worker_a["session"]
+        fresh = worker_b["session"]
+        worker_b["session"] = fresh
+        
+        with self.assertRaises(SessionConflictError):
+            worker_a["session"] = stale
+        self.assertEqual(worker_a["session"]["version"], 2)
+    
+    def test_sqlite_store_evicts_idle_sessions(self):
+        """Test idle-TTL eviction in the SQLite store"""
+        store = self._sqlite_store(ttl=0.05)
+        store["session"] = self._session()
+        
+        time.sleep(0.1)
+        self.assertNotIn("session", store)
+        with self.assertRaises(KeyError):
+            store["session"]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import shutil
+import threading
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tracker_registry import TrackerRegistry
+
+class TestTrackerRegistry(unittest.TestCase):
+    """Test cases for the shared FeedbackTracker registry"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Run inside a temporary directory so feedback_data/ is created there
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.original_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.addCleanup(os.chdir, self.original_cwd)
+        
+        # A long interval keeps the background flusher out of the way; tests flush explicitly
+        self.registry = TrackerRegistry(max_trackers=2, flush_interval=3600, storage="json")
+        self.addCleanup(self.registry.close)
+    
+    def _read_file(self, user_id):
+        with open(f"feedback_data/{user_id}_feedback.json") as f:
+            return json.load(f)
+    
+    def test_get_returns_cached_tracker(self):
+        """Test that the same tracker instance is reused for a user"""
+        with self.registry.use("test_user") as first, self.registry.use("test_user") as second:
+            self.assertIs(first, second)
+        with self.registry.use("test_user") as third:
+            self.assertIs(first, third)
+    
+    def test_writes_are_deferred_until_flush(self):
+        """Test write-behind: the file only changes when the registry flushes"""
+        with self.registry.use("test_user") as tracker:
+            tracker.add_pitch_feedback("Pitch", "Feedback")
+        
+        self.assertTrue(tracker.dirty)
+        self.assertFalse(os.path.exists("feedback_data/test_user_feedback.json"))
+        
+        self.registry.flush()
+        self.assertFalse(tracker.dirty)
+        self.assertEqual(len(self._read_file("test_user")["pitches"]), 1)
+    
+    def test_eviction_flushes_least_recently_used(self):
+        """Test that evicted trackers are written out before being dropped"""
+        with self.registry.use("first_user") as tracker:
+            tracker.add_pitch_feedback("Pitch", "Feedback")
+        with self.registry.use("second_user"):
+            pass
+        with self.registry.use("third_user"):
+            pass
+        
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(len(self._read_file("first_user")["pitches"]), 1)
+    
+    def test_fsync_mode_saves_every_write(self):
+        """Test that fsync mode persists each write immediately"""
+        registry = TrackerRegistry(fsync=True, storage="json")
+        self.addCleanup(registry.close)
+        
+        with registry.use("test_user") as tracker:
+            tracker.add_pitch_feedback("Pitch", "Feedback")
+        self.assertEqual(len(self._read_file("test_user")["pitches"]), 1)
+    
+    def test_concurrent_writes_are_not_lost(self):
+        """Test that concurrent refinements of the same pitch all land in the history"""
+        with self.registry.use("test_user") as tracker:
+            pitch_id = tracker.add_pitch_feedback("Pitch", "Feedback")
+        
+        def refine(i):
+            with self.registry.use("test_user") as tracker:
+                tracker.add_pitch_feedback(f"Pitch v{i}", "Feedback", pitch_id)
+        
+        threads = [threading.Thread(target=refine, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.registry.flush()
+        pitch = self._read_file("test_user")["pitches"][0]
+        self.assertEqual(len(pitch["iterations"]), 21)
+
+    
+    def test_tracker_in_use_is_not_evicted(self):
+        """Test that a tracker is kept while a request holds it, so no second copy overwrites its writes"""
+        with self.registry.use("first_user") as held:
+            held.add_pitch_feedback("Pitch", "Feedback")
+            # Two other users fill the cache while the first request is still running
+            for user_id in ("second_user", "third_user"):
+                with self.registry.use(user_id):
+                    pass
+            held.add_pitch_feedback("Pitch 2", "Feedback")
+        
+        # Released, so the cache shrinks back to its limit, writing the held tracker out
+        self.assertEqual(len(self.registry), 2)
+        with self.registry.use("first_user") as tracker:
+            tracker.add_pitch_feedback("Pitch 3", "Feedback")
+        self.registry.flush()
+        self.assertEqual(len(self._read_file("first_user")["pitches"]), 3)
+    
+    def test_eviction_closes_sqlite_connections(self):
+        """Test that an evicted SQLite tracker has its connection closed"""
+        import sqlite3
+        registry = TrackerRegistry(max_trackers=1, flush_interval=3600, storage="sqlite")
+        self.addCleanup(registry.close)
+        with registry.use("first_user") as evicted:
+            evicted.add_pitch_feedback("Pitch", "Feedback")
+        with registry.use("second_user"):
+            pass
+        
+        with self.assertRaises(sqlite3.ProgrammingError):
+            evicted.storage.conn.execute("SELECT 1")
+    
+    def test_uncached_registry_writes_through(self):
+        """Test that without the cache every use loads the tracker fresh and saves before returning"""
+        registry = TrackerRegistry(storage="json", cache=False)
+        self.addCleanup(registry.close)
+        with registry.use("test_user") as first:
+            pitch_id = first.add_pitch_feedback("Pitch", "Feedback")
+        self.assertEqual(len(self._read_file("test_user")["pitches"]), 1)
+        
+        # Another process appends to the same file; the next use sees its write
+        other = TrackerRegistry(storage="json", cache=False)
+        with other.use("test_user") as tracker:
+            tracker.add_pitch_feedback("Pitch 2", "Feedback", pitch_id)
+        with registry.use("test_user") as second:
+            self.assertIsNot(first, second)
+            self.assertEqual(len(second.get_pitch_history(pitch_id)["iterations"]), 2)
+        self.assertEqual(len(registry), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
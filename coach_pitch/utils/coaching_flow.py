@@ -1,14 +1,41 @@
-from langchain_openai import ChatOpenAI
-import os
-from dotenv import load_dotenv
+import json
+import time
+from utils.llm_client import get_llm
+from utils.response_cache import get_response_cache
+from utils.metrics import get_stage_metrics, usage_from_response, estimate_tokens
 
-# Load environment variables
-load_dotenv()
+# Bump when the component feedback prompt changes, so cached feedback from the old prompt is not reused
+FEEDBACK_PROMPT_VERSION = "1"
+
+# Instructions shared by the pitch summary prompt and the separate follow-up prompts
+CLARITY_INSTRUCTIONS = """Provide constructive feedback in these categories:
+        1. Clarity & Simplicity: How clearly are complex concepts explained?
+        2. Persuasiveness: How compelling is the overall narrative?
+        3. Logical Flow: How well do the pieces connect?
+        4. Memorability: What will investors remember?
+        5. Improvement Areas: What specific changes would make this pitch stronger?
+        
+        Keep each category to 1-2 sentences with specific, actionable advice. Maintain a supportive, coaching tone."""
+
+INVESTOR_QUESTIONS_INSTRUCTIONS = """Generate 5 challenging but realistic investor questions that probe potential weaknesses or areas needing clarification. For each question, provide a brief tip on how to answer effectively.
+        
+        Format as:
+        1. [Question 1]
+           Tip: [Answering guidance]
+        2. [Question 2]
+           Tip: [Answering guidance]
+        ...and so on"""
 
 #This file manages the conversational coaching flow:
 class PitchCoachFlow:
-    def __init__(self):
-        self.llm = ChatOpenAI(temperature=0.7, api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, llm=None, cache=None, metrics=None):
+        # Sessions share the process-wide client (and its connection pool) by default
+        self.llm = llm or get_llm()
+        # Feedback for identical answers is served from the shared cache instead of a new LLM call
+        self.cache = cache if cache is not None else get_response_cache()
+        # Every stage is timed into the process-wide metrics and summarized per session in stage_metrics
+        self.metrics = metrics if metrics is not None else get_stage_metrics()
+        self.stage_metrics = {}
         self.pitch_components = {
             "one_liner": None,
             "problem": None,
@@ -22,6 +49,8 @@ class PitchCoachFlow:
         }
         self.current_stage = "intro"
         self.history = []
+        # Pitch, clarity feedback and investor questions from the single end-of-session call
+        self.summary = None
         
     def start_conversation(self):
         """Start the coaching conversation"""
@@ -37,6 +66,13 @@ class PitchCoachFlow:
     
     def process_response(self, user_message):
         """Process the user's response based on the current stage"""
+        return "".join(self._respond(user_message, stream=False))
+    
+    def stream_response(self, user_message):
+        """Process the user's response, yielding the coach's reply as the LLM produces it"""
+        return self._respond(user_message, stream=True)
+    
+    def _respond(self, user_message, stream):
         self.add_to_history("user", user_message)
         
         # Store the user's response in the appropriate component
@@ -44,13 +80,15 @@ class PitchCoachFlow:
             self.pitch_components[self.current_stage] = user_message
         
         # Generate the next prompt based on the current stage
-        next_prompt = self._get_next_prompt(self.current_stage, user_message)
+        chunks = []
+        for chunk in self._next_prompt_chunks(self.current_stage, user_message, stream):
+            chunks.append(chunk)
+            yield chunk
+        next_prompt = "".join(chunks)
         self.add_to_history("coach", next_prompt)
         
         # Move to the next stage
         self.current_stage = self._get_next_stage(self.current_stage)
-        
-        return next_prompt
     
     def _get_next_stage(self, current_stage):
         """Determine the next stage in the conversation flow"""
@@ -71,11 +109,15 @@ class PitchCoachFlow:
     
     def _get_next_prompt(self, current_stage, user_message):
         """Generate the next prompt based on the current stage and user message"""
+        return "".join(self._next_prompt_chunks(current_stage, user_message, stream=False))
+    
+    def _next_prompt_chunks(self, current_stage, user_message, stream):
+        """Yield the next prompt in pieces; with stream=True the LLM feedback arrives token by token"""
         if current_stage == "intro":
-            return "Let's work on your startup pitch! Can you summarize your startup in one sentence?"
+            yield "Let's work on your startup pitch! Can you summarize your startup in one sentence?"
             
         elif current_stage == "one_liner":
-            return f"""
+            yield f"""
             That's a great start! Now, what's the core problem your {self._extract_product_type(user_message)} solves for users?
             
             Try to articulate this problem in a way that investors would immediately understand its significance.
@@ -83,115 +125,131 @@ class PitchCoachFlow:
             
         elif current_stage == "problem":
             # Provide feedback on the problem statement
-            problem_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "problem statement",
-                "clear, concise, and highlighting a significant pain point that customers face"
+                "clear, concise, and highlighting a significant pain point that customers face",
+                stream
             )
             
-            return f"""
-            {problem_feedback}
+            yield """
             
             Now, tell me more about your solution. How does your product or service solve this problem?
             """
             
         elif current_stage == "solution":
             # Provide feedback on the solution
-            solution_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "solution description",
-                "specific, differentiated, and clearly addressing the problem you identified"
+                "specific, differentiated, and clearly addressing the problem you identified",
+                stream
             )
             
-            return f"""
-            {solution_feedback}
+            yield """
             
             Let's talk about your target market. Who are your primary customers, and how large is this market?
             """
             
         elif current_stage == "market":
             # Provide feedback on the market description
-            market_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "market description",
-                "specific, sizeable, and showing good growth potential"
+                "specific, sizeable, and showing good growth potential",
+                stream
             )
             
-            return f"""
-            {market_feedback}
+            yield """
             
             Great! Now, explain your business model. How do you make money?
             """
             
         elif current_stage == "business_model":
             # Provide feedback on the business model
-            model_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "business model",
-                "clear, scalable, and demonstrating strong unit economics"
+                "clear, scalable, and demonstrating strong unit economics",
+                stream
             )
             
-            return f"""
-            {model_feedback}
+            yield """
             
             What makes your approach unique? What's your unique value proposition or competitive advantage?
             """
             
         elif current_stage == "unique_value":
             # Provide feedback on the unique value proposition
-            uvp_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "unique value proposition",
-                "compelling, defensible, and clearly differentiating you from competitors"
+                "compelling, defensible, and clearly differentiating you from competitors",
+                stream
             )
             
-            return f"""
-            {uvp_feedback}
+            yield """
             
             Do you have any traction or early validation? (e.g., customers, revenue, partnerships, pilot programs)
             """
             
         elif current_stage == "traction":
             # Provide feedback on the traction
-            traction_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "traction description",
-                "specific, showing momentum, and validating market interest"
+                "specific, showing momentum, and validating market interest",
+                stream
             )
             
-            return f"""
-            {traction_feedback}
+            yield """
             
             Tell me briefly about your team. What makes your team uniquely qualified to execute on this vision?
             """
             
         elif current_stage == "team":
             # Provide feedback on the team
-            team_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "team description",
-                "highlighting relevant expertise, domain knowledge, and prior successes"
+                "highlighting relevant expertise, domain knowledge, and prior successes",
+                stream
             )
             
-            return f"""
-            {team_feedback}
+            yield """
             
             Finally, what are you asking for? (Investment amount, specific help, partnerships, etc.)
             """
             
         elif current_stage == "ask":
             # Provide feedback on the ask
-            ask_feedback = self._generate_feedback(
+            yield """
+            """
+            yield from self._feedback_chunks(
                 user_message, 
                 "ask",
-                "clear, specific, and appropriate for your stage"
+                "clear, specific, and appropriate for your stage",
+                stream
             )
             
             # Generate the complete pitch
             complete_pitch = self._generate_complete_pitch()
             
-            return f"""
-            {ask_feedback}
+            yield f"""
             
             Fantastic! We've now covered all the key elements of a compelling pitch. Here's a synthesized version of your pitch based on everything you've shared:
             
@@ -204,13 +262,28 @@ class PitchCoachFlow:
             """
             
         else:  # summary or unknown stage
-            return """
+            yield """
             Is there any specific part of your pitch you'd like to refine further? 
             Or would you like to practice answering potential investor questions?
             """
     
-    def _generate_feedback(self, user_input, component_name, ideal_characteristics):
-        """Generate constructive feedback on a pitch component"""
+    def _feedback_prompt(self, user_input, component_name, ideal_characteristics):
+        """Build the LLM prompt for feedback on a pitch component"""
+        return f"""
+        Analyze this {component_name} for a startup pitch:
+        "{user_input}"
+        
+        A great {component_name} should be {ideal_characteristics}.
+        
+        Provide constructive feedback with:
+        1. A specific positive aspect of what was shared (using a warm, encouraging tone)
+        2. One specific, actionable suggestion to make it stronger (be specific, not generic)
+        
+        Keep your response under 3 sentences and maintain a supportive, coaching tone.
+        """
+    
+    def _fallback_feedback(self, ideal_characteristics):
+        """Canned feedback used when the LLM call fails"""
         positive_phrases = [
             "That's excellent!",
             "Really strong!",
@@ -230,30 +303,99 @@ class PitchCoachFlow:
             "One suggestion would be to"
         ]
         
-        # Use the LLM to generate actual feedback based on the content
-        prompt = f"""
-        Analyze this {component_name} for a startup pitch:
-        "{user_input}"
+        import random
+        positive = random.choice(positive_phrases)
+        constructive = random.choice(constructive_phrases)
+        return f"{positive} {constructive} making it more {ideal_characteristics.split(' and ')[0]}."
+    
+    def _record_stage(self, stage, start, prompt_tokens=0, completion_tokens=0, cache_hit=False, error=False):
+        """Record a finished stage in the shared metrics and in this session's summary"""
+        record = self.metrics.record(stage, time.perf_counter() - start, prompt_tokens, completion_tokens,
+                                     cache_hit=cache_hit, error=error)
+        summary = self.stage_metrics.setdefault(stage, {
+            "count": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+            "cost": 0.0, "cache_hits": 0, "errors": 0
+        })
+        summary["count"] += 1
+        summary["seconds"] += record["seconds"]
+        summary["prompt_tokens"] += prompt_tokens
+        summary["completion_tokens"] += completion_tokens
+        summary["cost"] += record["cost"]
+        summary["cache_hits"] += int(cache_hit)
+        summary["errors"] += int(error)
+    
+    def _invoke_llm(self, stage, prompt, fallback):
+        """Call the LLM once, recording the stage; returns the fallback text if the call fails"""
+        start = time.perf_counter()
+        try:
+            response = self.llm.invoke(prompt)
+        except Exception:
+            self._record_stage(stage, start, error=True)
+            return fallback(), start, False
+        text = response.content
+        self._record_stage(stage, start, *usage_from_response(response, prompt, text))
+        return text, start, True
+    
+    def _generate_feedback(self, user_input, component_name, ideal_characteristics):
+        """Generate constructive feedback on a pitch component"""
+        stage = f"feedback:{component_name}"
+        start = time.perf_counter()
+        cached = self.cache.get(FEEDBACK_PROMPT_VERSION, component_name, user_input)
+        if cached is not None:
+            self._record_stage(stage, start, cache_hit=True)
+            return cached
         
-        A great {component_name} should be {ideal_characteristics}.
+        # Use the LLM to generate actual feedback based on the content, with a fallback if the call fails
+        prompt = self._feedback_prompt(user_input, component_name, ideal_characteristics)
+        feedback, start, ok = self._invoke_llm(stage, prompt, lambda: self._fallback_feedback(ideal_characteristics))
+        if ok:
+            self.cache.put(FEEDBACK_PROMPT_VERSION, component_name, user_input, feedback,
+                           prompt=prompt, latency=time.perf_counter() - start)
+        return feedback
+    
+    def _feedback_chunks(self, user_input, component_name, ideal_characteristics, stream):
+        """Yield feedback on a pitch component, token by token when streaming"""
+        if not stream:
+            yield self._generate_feedback(user_input, component_name, ideal_characteristics)
+            return
         
-        Provide constructive feedback with:
-        1. A specific positive aspect of what was shared (using a warm, encouraging tone)
-        2. One specific, actionable suggestion to make it stronger (be specific, not generic)
+        stage = f"feedback:{component_name}"
+        start = time.perf_counter()
+        cached = self.cache.get(FEEDBACK_PROMPT_VERSION, component_name, user_input)
+        if cached is not None:
+            self._record_stage(stage, start, cache_hit=True)
+            yield cached
+            return
         
-        Keep your response under 3 sentences and maintain a supportive, coaching tone.
-        """
+        prompt = self._feedback_prompt(user_input, component_name, ideal_characteristics)
         
+        def store(feedback):
+            self.cache.put(FEEDBACK_PROMPT_VERSION, component_name, user_input, feedback,
+                           prompt=prompt, latency=time.perf_counter() - start)
+        
+        yield from self._stream_llm(stage, prompt, lambda: self._fallback_feedback(ideal_characteristics), on_complete=store)
+    
+    def _stream_llm(self, stage, prompt, fallback, on_complete=None):
+        """Yield the LLM's answer as it is generated, or the fallback text if the call fails before any output"""
+        start = time.perf_counter()
+        parts = []
         try:
-            response = self.llm.invoke(prompt)
-            feedback = response.content
-            return feedback
+            for chunk in self.llm.stream(prompt):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
         except Exception as e:
-            # Fallback if LLM call fails
-            import random
-            positive = random.choice(positive_phrases)
-            constructive = random.choice(constructive_phrases)
-            return f"{positive} {constructive} making it more {ideal_characteristics.split(' and ')[0]}."
+            self._record_stage(stage, start, estimate_tokens(prompt), estimate_tokens("".join(parts)), error=True)
+            # Once tokens have been sent the reply can't be replaced, so only fall back on an early failure
+            if not parts:
+                yield fallback()
+            return
+        
+        # Streamed chunks carry no usage report, so tokens are estimated
+        text = "".join(parts)
+        self._record_stage(stage, start, estimate_tokens(prompt), estimate_tokens(text))
+        if on_complete is not None:
+            on_complete(text)
     
     def _extract_product_type(self, one_liner):
         """Extract the product type from the one-liner description"""
@@ -268,9 +410,8 @@ class PitchCoachFlow:
         else:
             return "solution"
     
-    def _generate_complete_pitch(self):
-        """Generate a complete pitch based on all components"""
-        # Combine all pitch components into a coherent pitch
+    def _assemble_pitch(self):
+        """Combine all pitch components into a pitch without calling the LLM"""
         components = self.pitch_components
         
         pitch = f"""
@@ -299,90 +440,165 @@ class PitchCoachFlow:
         
         return pitch
     
-    def get_investor_questions(self):
-        """Generate potential investor questions based on the pitch"""
-        # Combine pitch components for context
-        pitch_context = "\n".join([
+    def _generate_complete_pitch(self):
+        """Generate a complete pitch based on all components"""
+        # One LLM call returns the pitch together with the clarity feedback and investor questions,
+        # which the follow-up actions then serve without sending the pitch again
+        pitch_context = self._pitch_context()
+        if self.summary is not None and self.summary["pitch_context"] == pitch_context:
+            return self.summary["pitch"]
+        
+        text, _, ok = self._invoke_llm("complete_pitch", self._pitch_summary_prompt(), lambda: "")
+        parsed = self._parse_pitch_summary(text) if ok else {}
+        self.summary = {
+            "pitch_context": pitch_context,
+            # The assembled components stand in if the LLM fails or returns something unusable
+            "pitch": parsed.get("pitch") or self._assemble_pitch(),
+            "clarity_feedback": parsed.get("clarity_feedback"),
+            "investor_questions": parsed.get("investor_questions")
+        }
+        return self.summary["pitch"]
+    
+    def _parse_pitch_summary(self, text):
+        """Read the JSON object returned for the pitch summary prompt; missing or invalid fields are left out"""
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            text = text[text.find("\n") + 1:] if text.lower().startswith("json") else text
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        
+        parsed = {}
+        for key in ("pitch", "clarity_feedback", "investor_questions"):
+            value = data.get(key)
+            if isinstance(value, list):
+                value = "\n".join(str(item) for item in value)
+            if isinstance(value, str) and value.strip():
+                parsed[key] = value
+        return parsed
+    
+    def _summary_field(self, field):
+        """A follow-up result from the pitch summary, if it was generated for the current pitch"""
+        if self.summary is None or self.summary["pitch_context"] != self._pitch_context():
+            return None
+        return self.summary.get(field)
+    
+    def follow_ups_pending(self):
+        """Whether the follow-up actions still need LLM calls of their own (the summary didn't include them)"""
+        return not (self._summary_field("clarity_feedback") and self._summary_field("investor_questions"))
+    
+    def _pitch_context(self):
+        """Combine pitch components for context"""
+        return "\n".join([
             f"{k}: {v}" for k, v in self.pitch_components.items() 
             if v and v.strip()
         ])
+    
+    def _pitch_prompt_prefix(self):
+        # Every end-of-session prompt starts with the same text, so the provider can reuse its cached prefix
+        return f"""
+        You are an experienced startup pitch coach. This is the founder's startup pitch:
         
-        prompt = f"""
-        Based on this startup pitch:
+        {self._pitch_context()}
+        """
+    
+    def _pitch_summary_prompt(self):
+        return self._pitch_prompt_prefix() + f"""
+        Respond with a JSON object only, with these three string fields:
         
-        {pitch_context}
+        "pitch": The complete pitch written as a short, coherent narrative that keeps the founder's facts and figures.
         
-        Generate 5 challenging but realistic investor questions that probe potential weaknesses or areas needing clarification. For each question, provide a brief tip on how to answer effectively.
+        "clarity_feedback": {CLARITY_INSTRUCTIONS}
         
-        Format as:
-        1. [Question 1]
-           Tip: [Answering guidance]
-        2. [Question 2]
-           Tip: [Answering guidance]
-        ...and so on
+        "investor_questions": {INVESTOR_QUESTIONS_INSTRUCTIONS}
         """
+    
+    def _investor_questions_prompt(self):
+        return self._pitch_prompt_prefix() + f"""
+        {INVESTOR_QUESTIONS_INSTRUCTIONS}
+        """
+    
+    def _fallback_investor_questions(self):
+        """Fallback questions if LLM call fails"""
+        return """
+        1. How do you plan to acquire your first 100 customers?
+           Tip: Be specific about your go-to-market strategy and early traction channels.
+           
+        2. What happens if a larger competitor copies your solution?
+           Tip: Focus on your unique advantages, speed of execution, and barriers to entry.
+           
+        3. How did you arrive at your market size estimate?
+           Tip: Show your calculation methodology and cite credible sources.
+           
+        4. What are your unit economics and path to profitability?
+           Tip: Demonstrate understanding of your costs, pricing strategy, and timeline to breakeven.
+           
+        5. Why is now the right time for this solution?
+           Tip: Highlight market timing factors, technology enablers, or regulatory changes that make this the perfect moment.
+        """
+    
+    def get_investor_questions(self, regenerate=False):
+        """Generate potential investor questions based on the pitch"""
+        if not regenerate:
+            questions = self._summary_field("investor_questions")
+            if questions:
+                return questions
         
-        try:
-            response = self.llm.invoke(prompt)
-            return response.content
-        except Exception as e:
-            # Fallback questions if LLM call fails
-            return """
-            1. How do you plan to acquire your first 100 customers?
-               Tip: Be specific about your go-to-market strategy and early traction channels.
-               
-            2. What happens if a larger competitor copies your solution?
-               Tip: Focus on your unique advantages, speed of execution, and barriers to entry.
-               
-            3. How did you arrive at your market size estimate?
-               Tip: Show your calculation methodology and cite credible sources.
-               
-            4. What are your unit economics and path to profitability?
-               Tip: Demonstrate understanding of your costs, pricing strategy, and timeline to breakeven.
-               
-            5. Why is now the right time for this solution?
-               Tip: Highlight market timing factors, technology enablers, or regulatory changes that make this the perfect moment.
-            """
+        # Fallback questions if LLM call fails
+        questions, _, _ = self._invoke_llm(
+            "investor_questions", self._investor_questions_prompt(), self._fallback_investor_questions
+        )
+        return questions
     
-    def get_pitch_clarity_feedback(self):
-        """Generate feedback on the overall pitch clarity and persuasiveness"""
-        # Combine pitch components for context
-        pitch_context = "\n".join([
-            f"{k}: {v}" for k, v in self.pitch_components.items() 
-            if v and v.strip()
-        ])
+    def stream_investor_questions(self, regenerate=False):
+        """Yield investor questions as the LLM generates them"""
+        questions = None if regenerate else self._summary_field("investor_questions")
+        if questions:
+            return iter([questions])
+        return self._stream_llm("investor_questions", self._investor_questions_prompt(), self._fallback_investor_questions)
+    
+    def _pitch_clarity_prompt(self):
+        return self._pitch_prompt_prefix() + f"""
+        Evaluate this pitch for clarity, persuasiveness, and investor appeal. {CLARITY_INSTRUCTIONS}
+        """
+    
+    def _fallback_pitch_clarity_feedback(self):
+        """Fallback feedback if LLM call fails"""
+        return """
+        1. Clarity & Simplicity: The pitch explains the concept well, but try using more concrete examples to illustrate how your solution works in practice.
         
-        prompt = f"""
-        Evaluate this startup pitch for clarity, persuasiveness, and investor appeal:
+        2. Persuasiveness: You've outlined a compelling opportunity, though strengthening the urgency factor would help investors feel the need to act now.
         
-        {pitch_context}
+        3. Logical Flow: The narrative flows naturally from problem to solution, but explicitly connecting your team's expertise to the specific challenges would strengthen the story.
         
-        Provide constructive feedback in these categories:
-        1. Clarity & Simplicity: How clearly are complex concepts explained?
-        2. Persuasiveness: How compelling is the overall narrative?
-        3. Logical Flow: How well do the pieces connect?
-        4. Memorability: What will investors remember?
-        5. Improvement Areas: What specific changes would make this pitch stronger?
+        4. Memorability: Your unique value proposition stands out, though creating a simple one-line tagline could make it even more memorable.
         
-        Keep each category to 1-2 sentences with specific, actionable advice. Maintain a supportive, coaching tone.
+        5. Improvement Areas: Quantify your claims more specifically with metrics and data points. Also, clarify exactly how you'll use the investment funds with specific milestones.
         """
+    
+    def get_pitch_clarity_feedback(self, regenerate=False):
+        """Generate feedback on the overall pitch clarity and persuasiveness"""
+        if not regenerate:
+            feedback = self._summary_field("clarity_feedback")
+            if feedback:
+                return feedback
         
-        try:
-            response = self.llm.invoke(prompt)
-            return response.content
-        except Exception as e:
-            # Fallback feedback if LLM call fails
-            return """
-            1. Clarity & Simplicity: The pitch explains the concept well, but try using more concrete examples to illustrate how your solution works in practice.
-            
-            2. Persuasiveness: You've outlined a compelling opportunity, though strengthening the urgency factor would help investors feel the need to act now.
-            
-            3. Logical Flow: The narrative flows naturally from problem to solution, but explicitly connecting your team's expertise to the specific challenges would strengthen the story.
-            
-            4. Memorability: Your unique value proposition stands out, though creating a simple one-line tagline could make it even more memorable.
-            
-            5. Improvement Areas: Quantify your claims more specifically with metrics and data points. Also, clarify exactly how you'll use the investment funds with specific milestones.
-            """
+        # Fallback feedback if LLM call fails
+        feedback, _, _ = self._invoke_llm(
+            "pitch_clarity", self._pitch_clarity_prompt(), self._fallback_pitch_clarity_feedback
+        )
+        return feedback
+    
+    def stream_pitch_clarity_feedback(self, regenerate=False):
+        """Yield pitch clarity feedback as the LLM generates it"""
+        feedback = None if regenerate else self._summary_field("clarity_feedback")
+        if feedback:
+            return iter([feedback])
+        return self._stream_llm("pitch_clarity", self._pitch_clarity_prompt(), self._fallback_pitch_clarity_feedback)
     
     def add_to_history(self, speaker, message):
         """Add a message to the conversation history"""
@@ -393,4 +609,29 @@ class PitchCoachFlow:
     
     def get_history(self):
         """Get the complete conversation history"""
-        return self.history
\ No newline at end of file
+        return self.history
+    
+    def get_stage_metrics(self):
+        """Per-stage calls, seconds, tokens and cost of this session"""
+        return self.stage_metrics
+    
+    def to_snapshot(self):
+        """Return the session state as JSON-serializable data"""
+        return {
+            "current_stage": self.current_stage,
+            "pitch_components": dict(self.pitch_components),
+            "history": list(self.history),
+            "stage_metrics": dict(self.stage_metrics),
+            "summary": self.summary
+        }
+    
+    @classmethod
+    def from_snapshot(cls, snapshot, llm=None):
+        """Rebuild a coaching flow from a snapshot created by to_snapshot"""
+        flow = cls(llm=llm)
+        flow.current_stage = snapshot["current_stage"]
+        flow.pitch_components.update(snapshot["pitch_components"])
+        flow.history = list(snapshot["history"])
+        flow.stage_metrics = dict(snapshot.get("stage_metrics", {}))
+        flow.summary = snapshot.get("summary")
+        return flow
\ No newline at end of file
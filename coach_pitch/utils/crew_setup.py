@@ -1,13 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
 from crewai import Crew
 from agents.pitch_coach import PitchCoachAgents
 from utils.tasks import PitchCoachTasks
+from utils.metrics import get_stage_metrics, usage_from_crew_output
 
 #This class ties together the agent definitions and task definitions using CrewAI
 class PitchCoachCrew:
-    def __init__(self):
-        self.agents = PitchCoachAgents()
+    def __init__(self, agents=None, metrics=None, executor=None):
+        # Agent definitions are shared across requests unless a caller supplies its own
+        self.agents = agents or PitchCoachAgents.shared()
+        self.metrics = metrics if metrics is not None else get_stage_metrics()
+        # The API's BoundedExecutor, which runs the second analysis of parallel mode within its limits;
+        # without one (CLI, scripts) a short-lived thread is used
+        self.executor = executor
     
-    def analyze_initial_pitch(self, pitch_content):
+    def _kickoff(self, stage, crew):
+        """Run a crew, recording its duration and token usage under `stage`"""
+        start = time.perf_counter()
+        try:
+            result = crew.kickoff()
+        except Exception:
+            self.metrics.record(stage, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.record(stage, time.perf_counter() - start, *usage_from_crew_output(result))
+        return result
+    
+    def analyze_initial_pitch(self, pitch_content, mode=None):
+        # "parallel" runs the structure and messaging analyses at the same time;
+        # the default comes from PITCH_ANALYSIS_MODE and is "sequential"
+        mode = mode or os.getenv("PITCH_ANALYSIS_MODE", "sequential")
+        if mode == "parallel":
+            return self._analyze_initial_pitch_parallel(pitch_content)
+        if mode != "sequential":
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        
         # Create agents
         structure_coach = self.agents.create_structure_coach()
         messaging_coach = self.agents.create_messaging_coach()
@@ -27,9 +55,57 @@ class PitchCoachCrew:
             verbose=True
         )
         
-        result = crew.kickoff()
+        result = self._kickoff("crew:analyze_pitch", crew)
         return result
     
+    def _run_single_task(self, stage, agent, task):
+        crew = Crew(agents=[agent], tasks=[task], verbose=True)
+        return self._kickoff(stage, crew)
+    
+    def _analyze_initial_pitch_parallel(self, pitch_content):
+        # The two analyses don't depend on each other, so each runs in its own crew
+        structure_coach = self.agents.create_structure_coach()
+        messaging_coach = self.agents.create_messaging_coach()
+        structure_task = PitchCoachTasks.create_structure_analysis_task(
+            structure_coach, pitch_content
+        )
+        messaging_task = PitchCoachTasks.create_messaging_analysis_task(
+            messaging_coach, pitch_content
+        )
+        
+        # The messaging analysis runs on another thread while this one runs the structure analysis
+        start = time.perf_counter()
+        args = ("crew:messaging_analysis", messaging_coach, messaging_task)
+        if self.executor is not None:
+            messaging_future = self.executor.submit("analysis_subtask", self._run_single_task, *args)
+        else:
+            pool = ThreadPoolExecutor(max_workers=1)
+            messaging_future = pool.submit(self._run_single_task, *args)
+            pool.shutdown(wait=False)
+        try:
+            structure_result = self._run_single_task("crew:structure_analysis", structure_coach, structure_task)
+        except BaseException:
+            messaging_future.cancel()
+            self.metrics.record("crew:analyze_pitch", time.perf_counter() - start, error=True)
+            raise
+        try:
+            messaging_result = messaging_future.result()
+        except BaseException:
+            self.metrics.record("crew:analyze_pitch", time.perf_counter() - start, error=True)
+            raise
+        # The whole analysis is timed under the same stage as sequential mode; its tokens are already
+        # counted by the two sub-stages, so they aren't recorded twice
+        self.metrics.record("crew:analyze_pitch", time.perf_counter() - start)
+        
+        # Merge both analyses into the single text the API returns
+        return f"""## Pitch Structure
+
+{structure_result}
+
+## Messaging & Clarity
+
+{messaging_result}"""
+    
     def simulate_investor_qa(self, pitch_content, industry, funding_stage):
         # Create agent
         qa_coach = self.agents.create_qa_simulation_coach()
@@ -46,5 +122,5 @@ class PitchCoachCrew:
             verbose=True
         )
         
-        result = crew.kickoff()
+        result = self._kickoff("crew:simulate_qa", crew)
         return result
\ No newline at end of file
@@ -0,0 +1,73 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+#This class runs blocking work (CrewAI kickoffs, LLM calls) off the FastAPI event loop
+#Every endpoint gets its own threads, as many as its concurrency limit, so one slow kind of request can't
+#take workers from another; queue depth is tracked per endpoint so it can be monitored
+class BoundedExecutor:
+    def __init__(self, limits=None, default_limit=4):
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self._pools = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self):
+        """Threads reserved across all endpoints"""
+        with self._lock:
+            return sum(self.limits.values())
+
+    def _endpoint(self, name):
+        with self._lock:
+            if name not in self._pools:
+                limit = self.limits.setdefault(name, self.default_limit)
+                self._pools[name] = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"pitch-{name}")
+                self._stats[name] = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+            return self._pools[name], self._stats[name]
+
+    def _update(self, stats, **changes):
+        with self._lock:
+            for key, delta in changes.items():
+                stats[key] += delta
+
+    def submit(self, name, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) on the threads of endpoint `name` and return its concurrent Future"""
+        pool, stats = self._endpoint(name)
+
+        def call():
+            # Counted as running only once a thread of the endpoint actually picks it up
+            self._update(stats, queued=-1, running=1)
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                self._update(stats, running=-1, failed=1)
+                raise
+            self._update(stats, running=-1, completed=1)
+            return result
+
+        self._update(stats, queued=1)
+        future = pool.submit(call)
+        # A call cancelled while still queued never starts, so it leaves the queue here
+        future.add_done_callback(lambda f: f.cancelled() and self._update(stats, queued=-1))
+        return future
+
+    async def run(self, name, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the threads of endpoint `name`, waiting for a free one"""
+        # Cancelling the await (e.g., a client disconnect) also cancels the call if it hasn't started
+        return await asyncio.wrap_future(self.submit(name, fn, *args, **kwargs))
+
+    def metrics(self):
+        """Current queue depth and counters for each endpoint"""
+        with self._lock:
+            return {
+                name: dict(stats, limit=self.limits[name])
+                for name, stats in self._stats.items()
+            }
+
+    def shutdown(self):
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Iterator, List, Optional
+from crewai.llms.base_llm import BaseLLM
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+VOCABULARY = (
+    "your pitch investors market customers problem solution traction team clear "
+    "specific compelling growth revenue metrics story value early focus strong "
+    "consider adding numbers example differentiation timing ask milestones"
+).split()
+
+#This class is an offline stand-in for ChatOpenAI, selected with LLM_BACKEND=fake
+#It waits `latency` seconds before the first token and then produces `tokens_per_second` tokens,
+#so load tests see realistic timings without calling OpenAI. Replies are derived from the prompt,
+#so the same prompt always gets the same reply
+#Prompts that ask for a JSON object (like the pitch summary) get one, with every "field": named in the prompt
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.5
+    tokens_per_second: float = 50.0
+    response_tokens: int = 80
+    temperature: float = 0.7
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-pitch-coach"
+
+    def _prompt_text(self, messages: List[BaseMessage]) -> str:
+        return "\n".join(str(message.content) for message in messages)
+
+    def _words(self, prompt: str) -> List[str]:
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16], 16)
+        rng = random.Random(seed)
+        words = [rng.choice(VOCABULARY) for _ in range(self.response_tokens)]
+
+        fields = list(dict.fromkeys(re.findall(r'"(\w+)":', prompt))) if "JSON object" in prompt else []
+        if not fields:
+            return words
+        # The words are shared out between the fields, and the JSON text is split back into words
+        size = max(len(words) // len(fields), 1)
+        reply = {field: " ".join(words[i * size:(i + 1) * size]) for i, field in enumerate(fields)}
+        return json.dumps(reply).split(" ")
+
+    def _usage(self, prompt: str, output_tokens: int) -> dict:
+        input_tokens = len(prompt) // 4
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        prompt = self._prompt_text(messages)
+        words = self._words(prompt)
+        time.sleep(self.latency + len(words) / self.tokens_per_second)
+        message = AIMessage(content=" ".join(words), usage_metadata=self._usage(prompt, len(words)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        prompt = self._prompt_text(messages)
+        time.sleep(self.latency)
+        for index, word in enumerate(self._words(prompt)):
+            time.sleep(1 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if index == 0 else f" {word}"))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+#This class hands the fake model to CrewAI agents, which only accept a model name or a crewai BaseLLM
+#Replies are written as a final answer, the format agents without tools expect, so offline crews finish
+#in one call per task
+class FakeCrewLLM(BaseLLM):
+    llm_type: str = "fake-pitch-coach"
+    chat_model: FakeChatModel
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        if isinstance(messages, str):
+            prompt = messages
+        else:
+            prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        reply = self.chat_model.invoke(prompt)
+        self._track_token_usage_internal({
+            "prompt_tokens": reply.usage_metadata["input_tokens"],
+            "completion_tokens": reply.usage_metadata["output_tokens"],
+            "total_tokens": reply.usage_metadata["total_tokens"]
+        })
+        return f"Thought: I now know the final answer\nFinal Answer: {reply.content}"
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        return self.call(messages, tools, callbacks, available_functions, from_task, from_agent, response_model)
+
+    def supports_function_calling(self) -> bool:
+        return False
@@ -0,0 +1,356 @@
+from datetime import datetime
+import json
+import os
+import sqlite3
+import threading
+
+#Storage backends for FeedbackTracker
+#Both backends store the same shape of data: a user has pitches, and each pitch has a list of iterations
+#  - JSONFeedbackStore keeps the original {user_id}_feedback.json layout and rewrites the file on every save
+#  - SQLiteFeedbackStore appends one row per iteration and looks pitches up through an index on pitch_id
+#Each pitch also has running stats (see update_pitch_stats) that are updated as iterations are added,
+#so metrics and history pages never have to scan every past iteration
+
+
+def empty_pitch_stats():
+    return {
+        "iterations_count": 0,
+        "first_timestamp": None,
+        "last_timestamp": None,
+        "first_length": 0,
+        "last_length": 0,
+        "last_length_delta": 0,
+        "last_interval_seconds": None,
+        "total_interval_seconds": 0.0
+    }
+
+
+def update_pitch_stats(stats, iteration):
+    """Fold one more iteration into a pitch's running stats"""
+    length = len(iteration.get("pitch_content") or "")
+    timestamp = iteration["timestamp"]
+    if stats["iterations_count"] == 0:
+        stats["first_timestamp"] = timestamp
+        stats["first_length"] = length
+    else:
+        interval = (datetime.fromisoformat(timestamp) - datetime.fromisoformat(stats["last_timestamp"])).total_seconds()
+        stats["last_interval_seconds"] = interval
+        stats["total_interval_seconds"] += interval
+        stats["last_length_delta"] = length - stats["last_length"]
+    stats["iterations_count"] += 1
+    stats["last_timestamp"] = timestamp
+    stats["last_length"] = length
+    return stats
+
+
+class JSONFeedbackStore:
+    """Original storage: the whole history is held in memory and rewritten as one JSON document"""
+
+    def __init__(self, feedback_dir, user_id):
+        self.user_id = user_id
+        self.feedback_file = f"{feedback_dir}/{user_id}_feedback.json"
+        self.load()
+
+    def load(self):
+        # Stats are derived data, so they are kept in memory only and rebuilt on demand after a load
+        self._stats = {}
+        if os.path.exists(self.feedback_file):
+            with open(self.feedback_file, 'r') as f:
+                self.feedback_history = json.load(f)
+        else:
+            self.feedback_history = {
+                "user_id": self.user_id,
+                "pitches": []
+            }
+
+    def save(self, fsync=False):
+        # Write to a temporary file and swap it in, so a crash mid-write never leaves a truncated history
+        tmp_file = f"{self.feedback_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.feedback_history, f, indent=2)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, self.feedback_file)
+
+    def next_pitch_id(self):
+        return str(len(self.feedback_history["pitches"]) + 1)
+
+    def add_iteration(self, pitch_id, created_at, iteration):
+        """Append an iteration to a pitch, creating the pitch if it does not exist yet"""
+        pitch = self.get_pitch(pitch_id)
+        if pitch is None:
+            self.feedback_history["pitches"].append({
+                "pitch_id": pitch_id,
+                "created_at": created_at,
+                "iterations": [iteration]
+            })
+        else:
+            pitch["iterations"].append(iteration)
+
+    def get_pitch(self, pitch_id):
+        for pitch in self.feedback_history["pitches"]:
+            if pitch["pitch_id"] == pitch_id:
+                return pitch
+        return None
+
+    def get_all_pitches(self):
+        return self.feedback_history["pitches"]
+
+    def list_pitches(self):
+        return [{"pitch_id": p["pitch_id"], "created_at": p["created_at"]} for p in self.feedback_history["pitches"]]
+
+    def get_pitch_stats(self, pitch_id):
+        pitch = self.get_pitch(pitch_id)
+        if pitch is None:
+            return None
+        # Only iterations added since the stats were last read are folded in
+        stats = self._stats.setdefault(pitch_id, empty_pitch_stats())
+        for iteration in pitch["iterations"][stats["iterations_count"]:]:
+            update_pitch_stats(stats, iteration)
+        return dict(stats, created_at=pitch["created_at"])
+
+    def get_iterations(self, pitch_id, offset=0, limit=None, newest_first=False):
+        pitch = self.get_pitch(pitch_id)
+        if pitch is None:
+            return []
+        iterations = pitch["iterations"][::-1] if newest_first else pitch["iterations"]
+        end = None if limit is None else offset + limit
+        return iterations[offset:end]
+
+    def snapshot(self):
+        return self.feedback_history
+
+    def close(self):
+        pass
+
+
+class SQLiteFeedbackStore:
+    """Append-only storage: every iteration is one INSERT, pitches are looked up through the primary key index"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS pitches (
+        user_id TEXT NOT NULL,
+        pitch_id TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, pitch_id)
+    );
+    CREATE TABLE IF NOT EXISTS iterations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        pitch_id TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        pitch_content TEXT,
+        feedback TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_iterations_pitch ON iterations (user_id, pitch_id, id);
+    CREATE TABLE IF NOT EXISTS json_migrations (
+        user_id TEXT PRIMARY KEY,
+        migrated_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS pitch_stats (
+        user_id TEXT NOT NULL,
+        pitch_id TEXT NOT NULL,
+        stats TEXT NOT NULL,
+        PRIMARY KEY (user_id, pitch_id)
+    );
+    """
+
+    def __init__(self, feedback_dir, user_id, db_file="feedback.db"):
+        self.user_id = user_id
+        self.feedback_dir = feedback_dir
+        self.db_path = os.path.join(feedback_dir, db_file)
+        self.json_file = f"{feedback_dir}/{user_id}_feedback.json"
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets readers run while an iteration is being appended
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.migrate_json_history()
+
+    def migrate_json_history(self):
+        """Import the user's legacy JSON history the first time the user is opened with this backend"""
+        if not os.path.exists(self.json_file):
+            return 0
+        with self._lock:
+            # BEGIN IMMEDIATE takes the database write lock before the marker is checked, so when several
+            # stores (or processes) open the same user at once only the first imports and the others see its marker
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = self.conn.execute(
+                    "SELECT 1 FROM json_migrations WHERE user_id = ? "
+                    "UNION ALL SELECT 1 FROM pitches WHERE user_id = ? LIMIT 1",
+                    (self.user_id, self.user_id)
+                ).fetchone()
+                if done is not None:
+                    self.conn.rollback()
+                    return 0
+
+                with open(self.json_file, 'r') as f:
+                    history = json.load(f)
+
+                migrated = 0
+                for pitch in history.get("pitches", []):
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO pitches (user_id, pitch_id, created_at) VALUES (?, ?, ?)",
+                        (self.user_id, pitch["pitch_id"], pitch["created_at"])
+                    )
+                    self.conn.executemany(
+                        "INSERT INTO iterations (user_id, pitch_id, timestamp, pitch_content, feedback) VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (self.user_id, pitch["pitch_id"], it["timestamp"], it.get("pitch_content"), it.get("feedback"))
+                            for it in pitch.get("iterations", [])
+                        ]
+                    )
+                    migrated += 1
+                self.conn.execute(
+                    "INSERT INTO json_migrations (user_id, migrated_at) VALUES (?, ?)",
+                    (self.user_id, datetime.now().isoformat())
+                )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            return migrated
+
+    def load(self):
+        pass
+
+    def save(self, fsync=False):
+        # Every write is committed as it happens; a checkpoint also syncs the WAL into the database file
+        if fsync:
+            with self._lock:
+                self.conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def next_pitch_id(self):
+        with self._lock:
+            count = self.conn.execute(
+                "SELECT COUNT(*) FROM pitches WHERE user_id = ?", (self.user_id,)
+            ).fetchone()[0]
+        return str(count + 1)
+
+    def add_iteration(self, pitch_id, created_at, iteration):
+        """Append an iteration to a pitch, creating the pitch if it does not exist yet"""
+        with self._lock, self.conn:
+            # BEGIN IMMEDIATE takes the database write lock before the stats are read; a plain SELECT opens no
+            # transaction, so two processes appending at once would both update the same stats and lose a write
+            self.conn.execute("BEGIN IMMEDIATE")
+            # Read the stats before the INSERT so a pitch without a stats row is rebuilt without it
+            stats = update_pitch_stats(self._load_stats(pitch_id), iteration)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO pitches (user_id, pitch_id, created_at) VALUES (?, ?, ?)",
+                (self.user_id, pitch_id, created_at)
+            )
+            self.conn.execute(
+                "INSERT INTO iterations (user_id, pitch_id, timestamp, pitch_content, feedback) VALUES (?, ?, ?, ?, ?)",
+                (self.user_id, pitch_id, iteration["timestamp"], iteration["pitch_content"], iteration["feedback"])
+            )
+            self._save_stats(pitch_id, stats)
+
+    def _load_stats(self, pitch_id):
+        row = self.conn.execute(
+            "SELECT stats FROM pitch_stats WHERE user_id = ? AND pitch_id = ?", (self.user_id, pitch_id)
+        ).fetchone()
+        if row is not None:
+            return json.loads(row["stats"])
+        # Pitches migrated from JSON or written before stats existed are rebuilt once and saved;
+        # OR IGNORE keeps stats another process may have saved since the iterations were read
+        stats = empty_pitch_stats()
+        for iteration in self._load_iterations(pitch_id):
+            update_pitch_stats(stats, iteration)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO pitch_stats (user_id, pitch_id, stats) VALUES (?, ?, ?)",
+            (self.user_id, pitch_id, json.dumps(stats))
+        )
+        return stats
+
+    def _save_stats(self, pitch_id, stats):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pitch_stats (user_id, pitch_id, stats) VALUES (?, ?, ?)",
+            (self.user_id, pitch_id, json.dumps(stats))
+        )
+
+    def _load_iterations(self, pitch_id, offset=0, limit=None, newest_first=False):
+        order = "DESC" if newest_first else "ASC"
+        rows = self.conn.execute(
+            "SELECT timestamp, pitch_content, feedback FROM iterations WHERE user_id = ? AND pitch_id = ? "
+            f"ORDER BY id {order} LIMIT ? OFFSET ?",
+            (self.user_id, pitch_id, -1 if limit is None else limit, offset)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_pitches(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT pitch_id, created_at FROM pitches WHERE user_id = ? ORDER BY rowid",
+                (self.user_id,)
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+    def get_pitch_stats(self, pitch_id):
+        # A transaction, since stats rebuilt by _load_stats are saved
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT created_at FROM pitches WHERE user_id = ? AND pitch_id = ?", (self.user_id, pitch_id)
+            ).fetchone()
+            if row is None:
+                return None
+            return dict(self._load_stats(pitch_id), created_at=row["created_at"])
+
+    def get_iterations(self, pitch_id, offset=0, limit=None, newest_first=False):
+        with self._lock:
+            return self._load_iterations(pitch_id, offset, limit, newest_first)
+
+    def get_pitch(self, pitch_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT pitch_id, created_at FROM pitches WHERE user_id = ? AND pitch_id = ?",
+                (self.user_id, pitch_id)
+            ).fetchone()
+            if row is None:
+                return None
+            return {
+                "pitch_id": row["pitch_id"],
+                "created_at": row["created_at"],
+                "iterations": self._load_iterations(pitch_id)
+            }
+
+    def get_all_pitches(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT pitch_id, created_at FROM pitches WHERE user_id = ? ORDER BY rowid",
+                (self.user_id,)
+            ).fetchall()
+            return [
+                {
+                    "pitch_id": row["pitch_id"],
+                    "created_at": row["created_at"],
+                    "iterations": self._load_iterations(row["pitch_id"])
+                }
+                for row in rows
+            ]
+
+    def snapshot(self):
+        return {
+            "user_id": self.user_id,
+            "pitches": self.get_all_pitches()
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+STORAGE_BACKENDS = {
+    "json": JSONFeedbackStore,
+    "sqlite": SQLiteFeedbackStore,
+}
+
+
+def create_feedback_store(backend, feedback_dir, user_id):
+    """Build the storage backend named by `backend` (or FEEDBACK_STORAGE when None)"""
+    backend = backend or os.getenv("FEEDBACK_STORAGE", "json")
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown feedback storage backend: {backend}")
+    return STORAGE_BACKENDS[backend](feedback_dir, user_id)
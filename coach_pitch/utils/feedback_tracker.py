@@ -1,30 +1,48 @@
 from datetime import datetime
-import json
 import os
+import threading
+from utils.feedback_storage import create_feedback_store
 
 #This class manages the persistence of pitch feedback history
 #Tracks pitch iterations over time, allowing for progress tracking
 class FeedbackTracker:
-    def __init__(self, user_id="default"):
+    def __init__(self, user_id="default", storage=None, write_behind=False, fsync=False):
         self.user_id = user_id
         self.feedback_dir = "feedback_data"
         os.makedirs(self.feedback_dir, exist_ok=True)
         self.feedback_file = f"{self.feedback_dir}/{user_id}_feedback.json"
-        self.load_feedback_history()
+        # storage is a backend name ("json" or "sqlite") or a ready-made store; defaults to FEEDBACK_STORAGE
+        if storage is None or isinstance(storage, str):
+            storage = create_feedback_store(storage, self.feedback_dir, user_id)
+        self.storage = storage
+        # With write_behind, writes only mark the tracker dirty and flush() persists them later
+        self.write_behind = write_behind
+        self.fsync = fsync
+        self.dirty = False
+        self.lock = threading.RLock()
+    
+    @property
+    def feedback_history(self):
+        return self.storage.snapshot()
     
     def load_feedback_history(self):
-        if os.path.exists(self.feedback_file):
-            with open(self.feedback_file, 'r') as f:
-                self.feedback_history = json.load(f)
-        else:
-            self.feedback_history = {
-                "user_id": self.user_id,
-                "pitches": []
-            }
+        self.storage.load()
+    
+    def save_feedback_history(self, fsync=False):
+        self.storage.save(fsync=fsync)
     
-    def save_feedback_history(self):
-        with open(self.feedback_file, 'w') as f:
-            json.dump(self.feedback_history, f, indent=2)
+    def flush(self, fsync=False):
+        """Persist pending write-behind changes"""
+        with self.lock:
+            if self.dirty:
+                self.save_feedback_history(fsync=fsync)
+                self.dirty = False
+    
+    def close(self):
+        """Persist pending changes and release the storage backend (e.g., the SQLite connection)"""
+        with self.lock:
+            self.flush(fsync=self.fsync)
+            self.storage.close()
     
     def _serialize_crew_output(self, output):
         """Convert CrewOutput to a serializable format"""
@@ -47,64 +65,89 @@ class FeedbackTracker:
         # Ensure feedback is serializable
         serialized_feedback = self._serialize_crew_output(feedback)
         
-        if pitch_id is None:
-            # New pitch
-            pitch_entry = {
-                "pitch_id": str(len(self.feedback_history["pitches"]) + 1),
-                "created_at": timestamp,
-                "iterations": [{
-                    "timestamp": timestamp,
-                    "pitch_content": pitch_content,
-                    "feedback": serialized_feedback
-                }]
-            }
-            self.feedback_history["pitches"].append(pitch_entry)
-        else:
-            # Update existing pitch
-            pitch_found = False
-            for pitch in self.feedback_history["pitches"]:
-                if pitch["pitch_id"] == pitch_id:
-                    pitch["iterations"].append({
-                        "timestamp": timestamp,
-                        "pitch_content": pitch_content,
-                        "feedback": serialized_feedback
-                    })
-                    pitch_found = True
-                    break
+        # Hold the lock across ID allocation and the append so concurrent requests can't lose updates
+        with self.lock:
+            if pitch_id is None:
+                pitch_id = self.storage.next_pitch_id()
             
-            # If pitch_id not found, create a new entry
-            if not pitch_found:
-                pitch_entry = {
-                    "pitch_id": pitch_id,
-                    "created_at": timestamp,
-                    "iterations": [{
-                        "timestamp": timestamp,
-                        "pitch_content": pitch_content,
-                        "feedback": serialized_feedback
-                    }]
-                }
-                self.feedback_history["pitches"].append(pitch_entry)
-        
-        self.save_feedback_history()
-        return pitch_id or pitch_entry["pitch_id"]
+            # The backend creates the pitch entry if pitch_id is not known yet
+            self.storage.add_iteration(pitch_id, timestamp, {
+                "timestamp": timestamp,
+                "pitch_content": pitch_content,
+                "feedback": serialized_feedback
+            })
+            
+            if self.write_behind:
+                self.dirty = True
+            else:
+                self.save_feedback_history(fsync=self.fsync)
+        return pitch_id
     
     def get_pitch_history(self, pitch_id):
-        for pitch in self.feedback_history["pitches"]:
-            if pitch["pitch_id"] == pitch_id:
-                return pitch
-        return None
+        with self.lock:
+            return self.storage.get_pitch(pitch_id)
     
     def get_all_pitches(self):
-        return self.feedback_history["pitches"]
+        with self.lock:
+            return self.storage.get_all_pitches()
+    
+    def get_pitch_stats(self, pitch_id):
+        """Running stats of a pitch (iteration count, lengths, time between iterations), or None"""
+        with self.lock:
+            return self.storage.get_pitch_stats(pitch_id)
+    
+    def get_pitch_summaries(self):
+        """Every pitch with its stats, without loading any iteration"""
+        with self.lock:
+            return [
+                dict(pitch, stats=self.storage.get_pitch_stats(pitch["pitch_id"]))
+                for pitch in self.storage.list_pitches()
+            ]
+    
+    def get_history_page(self, pitch_id, offset=0, limit=20, newest_first=False, include_content=True):
+        """Return one page of a pitch's iterations, or None if the pitch doesn't exist"""
+        with self.lock:
+            stats = self.storage.get_pitch_stats(pitch_id)
+            if stats is None:
+                return None
+            iterations = self.storage.get_iterations(pitch_id, offset, limit, newest_first)
+        
+        if not include_content:
+            # Lengths only, for dashboards that chart progress without showing the text
+            iterations = [
+                {
+                    "timestamp": iteration["timestamp"],
+                    "pitch_length": len(iteration.get("pitch_content") or ""),
+                    "feedback_length": len(iteration.get("feedback") or "")
+                }
+                for iteration in iterations
+            ]
+        
+        total = stats["iterations_count"]
+        next_offset = offset + len(iterations)
+        return {
+            "pitch_id": pitch_id,
+            "created_at": stats["created_at"],
+            "iterations": iterations,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": next_offset if next_offset < total else None
+        }
     
     def get_improvement_metrics(self, pitch_id):
-        pitch = self.get_pitch_history(pitch_id)
-        if not pitch or len(pitch["iterations"]) < 2:
+        stats = self.get_pitch_stats(pitch_id)
+        if not stats or stats["iterations_count"] < 2:
             return None
         
-        # This would be more sophisticated in a real implementation
-        # For now, just return the number of iterations as a simple metric
+        count = stats["iterations_count"]
         return {
-            "iterations_count": len(pitch["iterations"]),
-            "last_updated": pitch["iterations"][-1]["timestamp"]
+            "iterations_count": count,
+            "last_updated": stats["last_timestamp"],
+            "first_length": stats["first_length"],
+            "current_length": stats["last_length"],
+            "total_length_change": stats["last_length"] - stats["first_length"],
+            "last_length_change": stats["last_length_delta"],
+            "average_seconds_between_iterations": stats["total_interval_seconds"] / (count - 1),
+            "last_seconds_between_iterations": stats["last_interval_seconds"]
         }
\ No newline at end of file
@@ -0,0 +1,70 @@
+from functools import lru_cache
+import os
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+# Load environment variables
+load_dotenv()
+
+#This file provides the process-wide LLM clients: get_llm() for the coaching flow and get_crew_llm() for the
+#CrewAI agents. One client means one HTTP connection pool, so requests reuse open TLS connections instead of
+#setting up new ones for every session and crew
+#LLM_BACKEND=fake swaps in an offline model with configurable latency for load tests (see utils/fake_llm.py)
+@lru_cache(maxsize=None)
+def get_llm(temperature=0.7):
+    """Return the shared chat model for the given temperature"""
+    backend = os.getenv("LLM_BACKEND", "openai")
+    if backend == "fake":
+        from utils.fake_llm import FakeChatModel
+        return FakeChatModel(
+            temperature=temperature,
+            latency=float(os.getenv("FAKE_LLM_LATENCY", "0.5")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "50")),
+            response_tokens=int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "80"))
+        )
+    if backend != "openai":
+        raise ValueError(f"Unknown LLM backend: {backend}")
+    
+    http_client, http_async_client = _http_clients()
+    return ChatOpenAI(
+        temperature=temperature,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=http_client,
+        http_async_client=http_async_client
+    )
+
+@lru_cache(maxsize=None)
+def _http_clients():
+    """The pooled HTTP clients behind every OpenAI request of this process"""
+    max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections
+    )
+    return httpx.Client(limits=limits), httpx.AsyncClient(limits=limits)
+
+@lru_cache(maxsize=None)
+def get_crew_llm(temperature=0.7):
+    """Return the shared CrewAI LLM used by the crew agents"""
+    backend = os.getenv("LLM_BACKEND", "openai")
+    if backend == "fake":
+        # Agents only accept crewai LLMs, so the fake chat model is wrapped in one
+        from utils.fake_llm import FakeCrewLLM
+        return FakeCrewLLM(model="fake-pitch-coach", temperature=temperature, chat_model=get_llm(temperature))
+    if backend != "openai":
+        raise ValueError(f"Unknown LLM backend: {backend}")
+    # CrewAI does not call LangChain models: a ChatOpenAI given to an Agent is rebuilt as a new crewai.LLM with
+    # its own client. One crewai.LLM is built here instead and handed to every agent, so all crews share its client
+    from crewai import LLM
+    try:
+        # CrewAI versions that send requests through litellm use these module-wide sessions
+        import litellm
+        litellm.client_session, litellm.aclient_session = _http_clients()
+    except ImportError:
+        pass
+    return LLM(
+        model=get_llm(temperature).model_name,
+        temperature=temperature,
+        api_key=os.getenv("OPENAI_API_KEY")
+    )
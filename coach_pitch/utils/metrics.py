@@ -0,0 +1,143 @@
+from collections import deque
+from functools import lru_cache
+import bisect
+import os
+import threading
+
+# Upper bounds (in seconds) of the latency histogram buckets; slower calls land in "+Inf"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def estimate_tokens(text):
+    """Rough token count for text whose usage the provider didn't report (about 4 characters per token)"""
+    return len(text or "") // 4
+
+
+def usage_from_response(response, prompt, text):
+    """(prompt_tokens, completion_tokens) reported on a LangChain message, or estimated from the text"""
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and isinstance(usage.get("input_tokens"), int):
+        return usage["input_tokens"], usage.get("output_tokens", 0)
+    return estimate_tokens(prompt), estimate_tokens(text)
+
+
+def usage_from_crew_output(output):
+    """(prompt_tokens, completion_tokens) of a CrewAI kickoff, estimated from the output if not reported"""
+    usage = getattr(output, "token_usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if isinstance(prompt_tokens, int) and isinstance(completion_tokens, int):
+        return prompt_tokens, completion_tokens
+    return 0, estimate_tokens(str(output))
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+#This class collects latency, token and cost counters for every coaching stage
+#(component feedback, complete pitch, investor questions, crew kickoffs, ...)
+#Latencies go into a fixed-bucket histogram plus a window of recent samples for percentiles
+class StageMetrics:
+    def __init__(self, prompt_cost_per_1k=0.0, completion_cost_per_1k=0.0, window=1024):
+        self.prompt_cost_per_1k = prompt_cost_per_1k
+        self.completion_cost_per_1k = completion_cost_per_1k
+        self.window = window
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def cost(self, prompt_tokens, completion_tokens):
+        return (prompt_tokens * self.prompt_cost_per_1k + completion_tokens * self.completion_cost_per_1k) / 1000
+
+    def _stage(self, stage):
+        if stage not in self._stages:
+            self._stages[stage] = {
+                "count": 0,
+                "errors": 0,
+                "cache_hits": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                "recent": deque(maxlen=self.window),
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost": 0.0
+            }
+        return self._stages[stage]
+
+    def record(self, stage, seconds, prompt_tokens=0, completion_tokens=0, cache_hit=False, error=False):
+        """Record one call of a stage and return it as a dict"""
+        cost = self.cost(prompt_tokens, completion_tokens)
+        with self._lock:
+            stats = self._stage(stage)
+            stats["count"] += 1
+            stats["errors"] += int(error)
+            stats["cache_hits"] += int(cache_hit)
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats["recent"].append(seconds)
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost"] += cost
+        return {
+            "stage": stage,
+            "seconds": seconds,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost": cost,
+            "cache_hit": cache_hit,
+            "error": error
+        }
+
+    def snapshot(self):
+        """Counters, latency percentiles and histogram of every stage, plus totals"""
+        with self._lock:
+            stages = {}
+            for stage, stats in self._stages.items():
+                recent = sorted(stats["recent"])
+                labels = [f"le_{bound}" for bound in LATENCY_BUCKETS] + ["+Inf"]
+                stages[stage] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "cache_hits": stats["cache_hits"],
+                    "seconds": {
+                        "total": round(stats["total_seconds"], 6),
+                        "mean": stats["total_seconds"] / stats["count"],
+                        "p50": _percentile(recent, 0.50),
+                        "p95": _percentile(recent, 0.95),
+                        "p99": _percentile(recent, 0.99),
+                        "max": stats["max_seconds"]
+                    },
+                    "histogram": dict(zip(labels, stats["buckets"])),
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "completion_tokens": stats["completion_tokens"],
+                    "cost": round(stats["cost"], 6)
+                }
+        return {
+            "stages": stages,
+            "totals": {
+                "calls": sum(s["count"] for s in stages.values()),
+                "errors": sum(s["errors"] for s in stages.values()),
+                "cache_hits": sum(s["cache_hits"] for s in stages.values()),
+                "prompt_tokens": sum(s["prompt_tokens"] for s in stages.values()),
+                "completion_tokens": sum(s["completion_tokens"] for s in stages.values()),
+                "cost": round(sum(s["cost"] for s in stages.values()), 6)
+            }
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+@lru_cache(maxsize=None)
+def get_stage_metrics():
+    """Return the process-wide stage metrics, priced with LLM_PROMPT_COST_PER_1K and LLM_COMPLETION_COST_PER_1K"""
+    return StageMetrics(
+        prompt_cost_per_1k=float(os.getenv("LLM_PROMPT_COST_PER_1K", "0.0005")),
+        completion_cost_per_1k=float(os.getenv("LLM_COMPLETION_COST_PER_1K", "0.0015"))
+    )
@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import threading
+import time
+
+#This class generates the follow-up actions ("qa" and "feedback") of a session in the background
+#as soon as the pitch is complete, so the user's next click is served from a finished (or already
+#running) generation instead of starting a new LLM call
+#Results are tied to the pitch they were generated from and discarded if the pitch changes
+#A background thread drops entries older than `ttl`, and entries of sessions the session store no longer
+#has (checked with `session_exists`), so sessions evicted from the store don't keep their generations
+#Generating caches the result in the coach, so each generation holds the session's lock (if given) and calls
+#`save` before releasing it, like a request changing the session would
+class ActionPrefetcher:
+    ACTIONS = {
+        "qa": "get_investor_questions",
+        "feedback": "get_pitch_clarity_feedback"
+    }
+
+    def __init__(self, max_workers=4, ttl=3600, session_exists=None, sweep_interval=None):
+        self.ttl = ttl
+        self.session_exists = session_exists
+        self.sweep_interval = sweep_interval if sweep_interval is not None else min(ttl, 60)
+        # A separate pool, so speculative work never takes workers away from real requests
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pitch-prefetch")
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._stop_event = threading.Event()
+        self._sweeper = None
+
+    def _expire(self, now):
+        for session_id in [sid for sid, entry in self._entries.items() if now - entry["started_at"] > self.ttl]:
+            self._cancel_entry(self._entries.pop(session_id))
+
+    def _cancel_entry(self, entry):
+        # Generations that haven't started are dropped; running ones finish but their result is discarded
+        for future in entry["futures"].values():
+            future.cancel()
+
+    def _generate(self, coach, method, lock, save):
+        with lock if lock is not None else nullcontext():
+            result = getattr(coach, method)()
+            if save is not None:
+                save()
+        return result
+
+    def start(self, session_id, coach, lock=None, save=None):
+        """Start generating every follow-up action for a completed pitch"""
+        pitch_context = coach._pitch_context()
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            entry = self._entries.get(session_id)
+            if entry is not None and entry["pitch_context"] == pitch_context:
+                return
+            if entry is not None:
+                self._cancel_entry(entry)
+            self._entries[session_id] = {
+                "pitch_context": pitch_context,
+                "started_at": now,
+                "futures": {
+                    action: self._pool.submit(self._generate, coach, method, lock, save)
+                    for action, method in self.ACTIONS.items()
+                }
+            }
+        self._ensure_sweeper()
+
+    def get(self, session_id, action, coach):
+        """Return the future of a prefetched action, or None if there is no usable one"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            future = entry["futures"].get(action) if entry is not None else None
+            usable = (
+                future is not None
+                and not future.cancelled()
+                and entry["pitch_context"] == coach._pitch_context()
+                and time.time() - entry["started_at"] <= self.ttl
+            )
+            if usable:
+                self.hits += 1
+                return future
+            self.misses += 1
+            return None
+
+    def cancel(self, session_id):
+        """Cancel and forget everything prefetched for a session"""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._cancel_entry(entry)
+
+    def sweep(self):
+        """Drop expired entries and those of sessions that are gone from the session store"""
+        with self._lock:
+            self._expire(time.time())
+            session_ids = list(self._entries)
+        if self.session_exists is None:
+            return
+        # Checked outside the lock: the session store may have to query its database
+        for session_id in [sid for sid in session_ids if not self.session_exists(sid)]:
+            self.cancel(session_id)
+
+    def _ensure_sweeper(self):
+        with self._lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._stop_event.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="prefetch-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Failed to sweep prefetched actions: {str(e)}")
+
+    def stats(self):
+        """Sessions with prefetched actions, and how many action requests could (hits) or couldn't use them"""
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def shutdown(self):
+        self._stop_event.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from functools import lru_cache
+import os
+import re
+import threading
+import time
+
+#This class caches LLM feedback for pitch components
+#Entries are keyed on the prompt version, the component name and the normalized user input,
+#and expire after `ttl` seconds or when the cache is full (least recently used first)
+#With near_duplicates=True, inputs that are almost identical to a cached one also count as a hit
+class ResponseCache:
+    def __init__(self, max_entries=1024, ttl=86400, near_duplicates=False, similarity_threshold=0.92):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.near_duplicates = near_duplicates
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        # Estimated savings; tokens are approximated as 4 characters each
+        self.saved_tokens = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def normalize(text):
+        """Lowercase, collapse whitespace and drop surrounding punctuation"""
+        text = re.sub(r"\s+", " ", text or "").strip().lower()
+        return text.strip(" .!?,;:\"'")
+
+    def _key(self, prompt_version, component_name, normalized):
+        return (prompt_version, component_name, normalized)
+
+    def _expired(self, entry, now):
+        return now - entry["created_at"] > self.ttl
+
+    def _find_near_duplicate(self, prompt_version, component_name, normalized, now):
+        best_key, best_ratio = None, self.similarity_threshold
+        for key, entry in self._entries.items():
+            if key[0] != prompt_version or key[1] != component_name or self._expired(entry, now):
+                continue
+            matcher = SequenceMatcher(None, normalized, key[2])
+            # quick_ratio is an upper bound of ratio, so most candidates are rejected cheaply
+            if matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best_key, best_ratio = key, ratio
+        return best_key
+
+    def _record_hit(self, entry):
+        self.saved_tokens += entry["tokens"]
+        self.saved_seconds += entry["latency"]
+
+    def get(self, prompt_version, component_name, user_input):
+        """Return the cached response for this input, or None"""
+        if self.max_entries <= 0:
+            return None
+        normalized = self.normalize(user_input)
+        key = self._key(prompt_version, component_name, normalized)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._record_hit(entry)
+                return entry["response"]
+
+            if self.near_duplicates:
+                near_key = self._find_near_duplicate(prompt_version, component_name, normalized, now)
+                if near_key is not None:
+                    entry = self._entries[near_key]
+                    self._entries.move_to_end(near_key)
+                    self.near_hits += 1
+                    self._record_hit(entry)
+                    return entry["response"]
+
+            self.misses += 1
+            return None
+
+    def put(self, prompt_version, component_name, user_input, response, prompt="", latency=0.0):
+        """Store a response; `prompt` and `latency` are only used to estimate the savings of later hits"""
+        if self.max_entries <= 0:
+            return
+        key = self._key(prompt_version, component_name, self.normalize(user_input))
+        with self._lock:
+            self._entries[key] = {
+                "response": response,
+                "created_at": time.time(),
+                "latency": latency,
+                "tokens": (len(prompt) + len(response)) // 4
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+                "estimated_saved_tokens": self.saved_tokens,
+                "saved_seconds": round(self.saved_seconds, 3)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache(maxsize=None)
+def get_response_cache():
+    """Return the process-wide feedback cache configured from the environment"""
+    return ResponseCache(
+        max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("RESPONSE_CACHE_TTL", "86400")),
+        near_duplicates=os.getenv("RESPONSE_CACHE_NEAR_DUPLICATES", "false").lower() == "true",
+        similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+    )
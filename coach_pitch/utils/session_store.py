@@ -0,0 +1,241 @@
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import json
+import os
+import sqlite3
+import threading
+import time
+from utils.coaching_flow import PitchCoachFlow
+
+#Stores for active coaching sessions
+#Both stores behave like the dict the API used before: sessions are read with store[session_id]
+#and persisted by assigning them back (store[session_id] = session) after the coach has changed
+#  - MemorySessionStore keeps sessions in this process only
+#  - SQLiteSessionStore saves a snapshot of every session so several workers can share them
+#Sessions idle for longer than `ttl` seconds are evicted, and at most `max_sessions` are kept
+
+
+class SessionConflictError(Exception):
+    """Raised by SQLiteSessionStore when a session is saved over a newer version saved by another worker"""
+
+
+def serialize_session(session):
+    """Convert a session into JSON-safe data; the coach is stored as a snapshot"""
+    return {
+        "coach": session["coach"].to_snapshot(),
+        "user_id": session["user_id"],
+        "created_at": session["created_at"]
+    }
+
+
+def deserialize_session(data):
+    return {
+        "coach": PitchCoachFlow.from_snapshot(data["coach"]),
+        "user_id": data["user_id"],
+        "created_at": data["created_at"],
+        "lock": threading.Lock()
+    }
+
+
+class MemorySessionStore(MutableMapping):
+    """In-process sessions, kept in least-recently-used order"""
+
+    def __init__(self, ttl=3600, max_sessions=1000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._last_access = {}
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        # The oldest entries come first, so expired sessions are always at the front
+        while self._sessions:
+            session_id = next(iter(self._sessions))
+            if now - self._last_access[session_id] <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+            del self._last_access[session_id]
+
+    def __getitem__(self, session_id):
+        with self._lock:
+            now = time.time()
+            self._evict(now)
+            session = self._sessions[session_id]
+            self._sessions.move_to_end(session_id)
+            self._last_access[session_id] = now
+            return session
+
+    def __setitem__(self, session_id, session):
+        with self._lock:
+            now = time.time()
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            self._last_access[session_id] = now
+            self._evict(now)
+
+    def __delitem__(self, session_id):
+        with self._lock:
+            del self._sessions[session_id]
+            del self._last_access[session_id]
+
+    def __contains__(self, session_id):
+        with self._lock:
+            self._evict(time.time())
+            return session_id in self._sessions
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._sessions))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionStore(MutableMapping):
+    """Sessions persisted as JSON snapshots in SQLite, shared by every worker using the same file"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access);
+    """
+
+    def __init__(self, db_path="session_data/sessions.db", ttl=3600, max_sessions=1000, touch_interval=None):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        # How stale last_access may get before a read refreshes it (idle sessions may expire this much early)
+        self.touch_interval = touch_interval if touch_interval is not None else min(ttl / 10, 60)
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+        # Sessions this worker has already loaded: session_id -> (version, session, last_access), LRU order
+        self._cache = OrderedDict()
+        self._next_eviction = 0
+
+    def _remember(self, session_id, version, session, now):
+        self._cache[session_id] = (version, session, now)
+        self._cache.move_to_end(session_id)
+        while self._cache:
+            oldest_id, (_, _, last_access) = next(iter(self._cache.items()))
+            if now - last_access <= self.ttl and len(self._cache) <= self.max_sessions:
+                break
+            del self._cache[oldest_id]
+
+    def _evict(self, now):
+        # Pruning the table is shared work for all workers, so it runs at most once a minute per worker
+        if now < self._next_eviction:
+            return
+        self._next_eviction = now + min(self.ttl, 60)
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE last_access < ?", (now - self.ttl,))
+            count = self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            if count > self.max_sessions:
+                self.conn.execute(
+                    "DELETE FROM sessions WHERE session_id IN "
+                    "(SELECT session_id FROM sessions ORDER BY last_access LIMIT ?)",
+                    (count - self.max_sessions,)
+                )
+
+    def __getitem__(self, session_id):
+        with self._lock:
+            now = time.time()
+            row = self.conn.execute(
+                "SELECT data, version, last_access FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                self._cache.pop(session_id, None)
+                raise KeyError(session_id)
+
+            data, version, last_access = row
+            # Reads only write the access time once it is older than touch_interval, so busy sessions
+            # don't turn every read into a write transaction
+            if now - last_access > self.touch_interval:
+                with self.conn:
+                    self.conn.execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+
+            # Reuse the loaded session unless another worker has saved a newer version
+            cached = self._cache.get(session_id)
+            if cached is not None and cached[0] == version:
+                session = cached[1]
+            else:
+                session = deserialize_session(json.loads(data))
+                session["version"] = version
+            self._remember(session_id, version, session, now)
+            return session
+
+    def __setitem__(self, session_id, session):
+        with self._lock:
+            now = time.time()
+            data = json.dumps(serialize_session(session))
+            expected = session.get("version")
+            with self.conn:
+                row = None
+                if expected is not None:
+                    # Only saved over the version this session was loaded from, so a worker holding a stale
+                    # copy can't overwrite what another worker saved in the meantime
+                    row = self.conn.execute(
+                        "UPDATE sessions SET data = ?, version = version + 1, last_access = ? "
+                        "WHERE session_id = ? AND version = ? RETURNING version",
+                        (data, now, session_id, expected)
+                    ).fetchone()
+                if row is None:
+                    # A new session, or one evicted while it was in use
+                    row = self.conn.execute(
+                        "INSERT INTO sessions (session_id, data, version, last_access) VALUES (?, ?, 1, ?) "
+                        "ON CONFLICT(session_id) DO NOTHING RETURNING version",
+                        (session_id, data, now)
+                    ).fetchone()
+            if row is None:
+                self._cache.pop(session_id, None)
+                raise SessionConflictError(f"Session {session_id} was changed by another worker")
+            session["version"] = row[0]
+            self._remember(session_id, row[0], session, now)
+            self._evict(now)
+
+    def __delitem__(self, session_id):
+        with self._lock:
+            with self.conn:
+                deleted = self.conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            self._cache.pop(session_id, None)
+            if not deleted:
+                raise KeyError(session_id)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_access FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            return row is not None and time.time() - row[0] <= self.ttl
+
+    def __iter__(self):
+        with self._lock:
+            return iter([row[0] for row in self.conn.execute("SELECT session_id FROM sessions")])
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def create_session_store(backend=None, ttl=None, max_sessions=None):
+    """Build the session store configured by SESSION_STORE, SESSION_TTL_SECONDS and MAX_SESSIONS"""
+    backend = backend or os.getenv("SESSION_STORE", "memory")
+    ttl = ttl if ttl is not None else float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    max_sessions = max_sessions if max_sessions is not None else int(os.getenv("MAX_SESSIONS", "1000"))
+
+    if backend == "memory":
+        return MemorySessionStore(ttl=ttl, max_sessions=max_sessions)
+    if backend == "sqlite":
+        db_path = os.getenv("SESSION_DB_PATH", "session_data/sessions.db")
+        return SQLiteSessionStore(db_path, ttl=ttl, max_sessions=max_sessions)
+    raise ValueError(f"Unknown session store: {backend}")
@@ -0,0 +1,144 @@
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+import threading
+from utils.feedback_tracker import FeedbackTracker
+
+#This class keeps loaded FeedbackTrackers in memory so API requests don't re-read history files
+#Trackers are kept in LRU order and written to disk by a background thread (write-behind)
+#Set fsync=True to save and fsync on every write instead of batching
+#Set cache=False when several API processes share the feedback files: every use then loads the tracker,
+#saves each write straight away and closes it again (write-through), so no process keeps a stale copy
+class TrackerRegistry:
+    # Loads and evictions of one user are serialized on one of these locks (users are spread over them by hash)
+    USER_LOCKS = 64
+
+    def __init__(self, max_trackers=256, flush_interval=2.0, fsync=False, storage=None,
+                 tracker_factory=FeedbackTracker, cache=True):
+        self.max_trackers = max_trackers
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.storage = storage
+        self.tracker_factory = tracker_factory
+        self.cache = cache
+        self._trackers = OrderedDict()
+        # Number of requests currently using each cached tracker; pinned trackers are never evicted
+        self._pins = Counter()
+        self._lock = threading.Lock()
+        self._user_locks = [threading.Lock() for _ in range(self.USER_LOCKS)]
+        self._stop_event = threading.Event()
+        self._flusher = None
+
+    def _user_lock(self, user_id):
+        return self._user_locks[hash(user_id) % self.USER_LOCKS]
+
+    def _load(self, user_id):
+        write_behind = self.cache and not self.fsync
+        return self.tracker_factory(
+            user_id,
+            storage=self.storage,
+            write_behind=write_behind,
+            fsync=self.fsync
+        )
+
+    @contextmanager
+    def use(self, user_id="default"):
+        """Lend the tracker of a user for the duration of a with block, loading it on first use"""
+        tracker = self.acquire(user_id)
+        try:
+            yield tracker
+        finally:
+            self.release(user_id, tracker)
+
+    def acquire(self, user_id="default"):
+        """Return the tracker of a user, pinned in the cache until release() is called"""
+        if not self.cache:
+            return self._load(user_id)
+
+        tracker = self._pin_cached(user_id)
+        if tracker is None:
+            # Reading the history happens outside the registry lock, so other users are not held up.
+            # The user's lock stops two requests from loading two copies, and makes a load wait for an
+            # eviction of the same user to finish writing
+            with self._user_lock(user_id):
+                tracker = self._pin_cached(user_id)
+                if tracker is None:
+                    tracker = self._load(user_id)
+                    with self._lock:
+                        self._trackers[user_id] = tracker
+                        self._pins[user_id] += 1
+            self._evict_overflow()
+
+        if not self.fsync:
+            self._ensure_flusher()
+        return tracker
+
+    def _pin_cached(self, user_id):
+        with self._lock:
+            tracker = self._trackers.get(user_id)
+            if tracker is not None:
+                self._trackers.move_to_end(user_id)
+                self._pins[user_id] += 1
+            return tracker
+
+    def release(self, user_id, tracker):
+        """Give back a tracker returned by acquire()"""
+        if not self.cache:
+            tracker.close()
+            return
+        with self._lock:
+            self._pins[user_id] -= 1
+            if self._pins[user_id] <= 0:
+                del self._pins[user_id]
+        # Trackers pinned while the cache was full are evicted once they are released
+        self._evict_overflow()
+
+    def _evict_overflow(self):
+        """Evict least recently used, unpinned trackers until the cache fits, writing out anything pending"""
+        with self._lock:
+            overflow = len(self._trackers) - self.max_trackers
+            candidates = [user_id for user_id in self._trackers if user_id not in self._pins][:max(overflow, 0)]
+        for user_id in candidates:
+            with self._user_lock(user_id):
+                with self._lock:
+                    # Checked again: the tracker may have been pinned or evicted since the scan
+                    if (user_id not in self._trackers or user_id in self._pins
+                            or len(self._trackers) <= self.max_trackers):
+                        continue
+                    tracker = self._trackers.pop(user_id)
+                # Still under the user's lock, so the user can't be reloaded from disk before this write lands
+                tracker.close()
+
+    def flush(self):
+        """Write every tracker with pending changes to disk"""
+        with self._lock:
+            trackers = list(self._trackers.values())
+        for tracker in trackers:
+            tracker.flush(fsync=self.fsync)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._stop_event.clear()
+            self._flusher = threading.Thread(target=self._flush_loop, name="feedback-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush feedback history: {str(e)}")
+
+    def close(self):
+        """Stop the background flusher and write out all pending changes"""
+        self._stop_event.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def __len__(self):
+        return len(self._trackers)